@@ -0,0 +1,485 @@
+"""benchmarks.bench_config_io - benchmarks for processor_tools.config_io
+
+Run from the repository root with ``python -m benchmarks.bench_config_io``.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import yaml
+import zipfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from configparser import RawConfigParser
+from processor_tools.utils.dict_tools import get_value
+from processor_tools.config_io import (
+    build_configdir,
+    find_config,
+    ConfigIOFactory,
+    ConfigReader,
+    read_config,
+    write_config,
+    get_value_stream,
+    clear_config_cache,
+    YAMLReader,
+    YAMLWriter,
+)
+
+
+__author__ = "Sam Hunt <sam.hunt@npl.co.uk>"
+
+
+def write_cfg_files(directory, n_files, n_keys=50):
+    """
+    Writes set of .cfg files to directory
+
+    :param directory: directory to write files to
+    :param n_files: number of files to write
+    :param n_keys: number of keys per section
+    :return: file paths
+    """
+
+    paths = []
+    for i in range(n_files):
+        config = RawConfigParser()
+        config["section"] = {
+            "key" + str(j): ["1", "1.5", "true", "value", "data.txt"][j % 5]
+            for j in range(n_keys)
+        }
+
+        path = os.path.join(directory, "file" + str(i) + ".cfg")
+        with open(path, "w") as f:
+            config.write(f)
+        paths.append(path)
+
+    open(os.path.join(directory, "data.txt"), "w").close()
+
+    return paths
+
+
+def bench_threaded_cfg_read(n_files=500, n_workers=(1, 4, 8)):
+    """
+    Measures time to read set of .cfg files from a thread pool
+
+    :param n_files: number of files to read
+    :param n_workers: numbers of threads to benchmark
+    """
+
+    directory = tempfile.mkdtemp()
+    paths = write_cfg_files(directory, n_files)
+
+    print("threaded .cfg read ({} files)".format(n_files))
+
+    for n in n_workers:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            list(executor.map(lambda p: read_config(p, use_cache=False), paths))
+        elapsed = time.perf_counter() - t0
+
+        print("  {:>2} threads: {:.3f}s".format(n, elapsed))
+
+    shutil.rmtree(directory)
+
+
+def bench_cached_read(n_files=50, n_repeats=20):
+    """
+    Measures time to repeatedly read set of .cfg files, with and without the read cache
+
+    :param n_files: number of files to read
+    :param n_repeats: number of times each file is read
+    """
+
+    directory = tempfile.mkdtemp()
+    paths = write_cfg_files(directory, n_files)
+
+    print("repeated .cfg read ({} files x {})".format(n_files, n_repeats))
+
+    for use_cache in (False, True):
+        clear_config_cache()
+        t0 = time.perf_counter()
+        for _ in range(n_repeats):
+            for path in paths:
+                read_config(path, use_cache=use_cache)
+        elapsed = time.perf_counter() - t0
+
+        print("  cache {:<5}: {:.3f}s".format(str(use_cache), elapsed))
+
+    shutil.rmtree(directory)
+
+
+def make_yaml_config(n_sections, n_keys=20):
+    """
+    Returns representative configuration values dictionary, to write to yaml
+
+    :param n_sections: number of sections
+    :param n_keys: number of entries per section
+    :return: configuration values dictionary
+    """
+
+    return {
+        "section"
+        + str(i): {
+            "key"
+            + str(j): [
+                1,
+                1.5,
+                True,
+                "value string",
+                None,
+                [1.0, 2.0, 3.0],
+                {"nested": "value", "n": j},
+            ][j % 7]
+            for j in range(n_keys)
+        }
+        for i in range(n_sections)
+    }
+
+
+def bench_yaml_read_write(n_sections=(10, 100, 1000)):
+    """
+    Measures time to read/write yaml files with the pure-python and libyaml-based (C) implementations, checking that
+    both produce equivalent output
+
+    :param n_sections: numbers of configuration sections to benchmark
+    """
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "config.yaml")
+
+    print("yaml read/write (libyaml available: {})".format(yaml.__with_libyaml__))
+
+    for n in n_sections:
+        config_dict = make_yaml_config(n)
+
+        t0 = time.perf_counter()
+        py_text = yaml.dump(config_dict, Dumper=yaml.Dumper, default_flow_style=False)
+        t_py_write = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        YAMLWriter().write(path, config_dict)
+        t_write = time.perf_counter() - t0
+
+        with open(path, "r") as f:
+            assert f.read() == py_text, "yaml writer output differs"
+
+        t0 = time.perf_counter()
+        py_values = yaml.load(py_text, Loader=yaml.SafeLoader)
+        t_py_read = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        values = YAMLReader().read(path)
+        t_read = time.perf_counter() - t0
+
+        assert values == py_values == config_dict, "yaml reader output differs"
+
+        print(
+            "  {:>5} sections: read {:.3f}s (python {:.3f}s), write {:.3f}s (python {:.3f}s)".format(
+                n, t_read, t_py_read, t_write, t_py_write
+            )
+        )
+
+    shutil.rmtree(directory)
+
+
+def bench_format_read(n_sections=1000, formats=("yaml", "json", "toml", "msgpack")):
+    """
+    Measures time to read the same configuration values from each supported config file format
+
+    :param n_sections: number of configuration sections
+    :param formats: file extensions of formats to benchmark (skipped if not available)
+    """
+
+    directory = tempfile.mkdtemp()
+    config_dict = make_yaml_config(n_sections)
+
+    # toml cannot represent None
+    for section in config_dict.values():
+        for key, value in section.items():
+            if value is None:
+                section[key] = ""
+
+    print("config read by format ({} sections)".format(n_sections))
+
+    for ext in formats:
+        if ext not in ConfigIOFactory.WRITER_BY_EXT:
+            print("  {:>8}: not available".format(ext))
+            continue
+
+        path = os.path.join(directory, "config." + ext)
+        write_config(path, config_dict)
+
+        t0 = time.perf_counter()
+        values = read_config(path, use_cache=False)
+        elapsed = time.perf_counter() - t0
+
+        assert values == config_dict, ext + " read output differs"
+
+        print("  {:>8}: {:.3f}s".format(ext, elapsed))
+
+    shutil.rmtree(directory)
+
+
+class LegacyConfigReader(ConfigReader):
+    """
+    Config reader with the previous implementation of type inference/conversion, for comparison - tries int()/float()
+    conversion, re-parses with configparser and stats every string value
+    """
+
+    def read(self, path):
+        config_values = dict()
+        path = os.path.abspath(path)
+        config_directory = os.path.dirname(path)
+
+        config = RawConfigParser()
+        config.read(path)
+
+        for section in config.sections():
+            config_values[section] = dict()
+            for key in config[section].keys():
+                val = config.get(section, key, fallback=None)
+
+                if (val.lower() == "true") or (val.lower() == "false"):
+                    val = config.getboolean(section, key)
+                else:
+                    for dtype, getter in (
+                        (int, config.getint),
+                        (float, config.getfloat),
+                    ):
+                        try:
+                            dtype(val)
+                        except ValueError:
+                            continue
+                        val = getter(section, key)
+                        break
+                    else:
+                        path_val = os.path.join(config_directory, val)
+                        if Path(path_val).exists():
+                            val = os.path.abspath(path_val)
+
+                config_values[section][key] = val
+
+        return config_values
+
+
+def bench_large_cfg_read(n_sections=100, n_keys=1000):
+    """
+    Measures time to read a large .cfg file, comparing type inference implementations
+
+    :param n_sections: number of sections
+    :param n_keys: number of entries per section
+    """
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "large.cfg")
+
+    config = RawConfigParser()
+    for i in range(n_sections):
+        config["section" + str(i)] = {
+            "key" + str(j): ["1", "1.5", "true", "value string", "data.txt"][j % 5]
+            for j in range(n_keys)
+        }
+    with open(path, "w") as f:
+        config.write(f)
+    open(os.path.join(directory, "data.txt"), "w").close()
+
+    print("large .cfg read ({} keys)".format(n_sections * n_keys))
+
+    path_keys = ["key" + str(j) for j in range(4, n_keys, 5)]
+    readers = [
+        ("legacy", LegacyConfigReader()),
+        ("default", ConfigReader()),
+        ("path_keys", ConfigReader(path_keys=path_keys)),
+    ]
+
+    results = []
+    for name, reader in readers:
+        t0 = time.perf_counter()
+        results.append(reader.read(path))
+        elapsed = time.perf_counter() - t0
+
+        print("  {:>9}: {:.3f}s".format(name, elapsed))
+
+    assert results[0] == results[1] == results[2], ".cfg read output differs"
+
+    shutil.rmtree(directory)
+
+
+def bench_lazy_cfg_read(n_sections=100, n_keys=1000):
+    """
+    Measures time to read one section of a large .cfg file, with eager and lazy (section-indexed) reading
+
+    :param n_sections: number of sections
+    :param n_keys: number of entries per section
+    """
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "large.cfg")
+
+    config = RawConfigParser()
+    for i in range(n_sections):
+        config["section" + str(i)] = {
+            "key" + str(j): ["1", "1.5", "true", "value string"][j % 4]
+            for j in range(n_keys)
+        }
+    with open(path, "w") as f:
+        config.write(f)
+
+    print("large .cfg single section read ({} sections)".format(n_sections))
+
+    results = []
+    for name, reader in [("eager", ConfigReader()), ("lazy", ConfigReader(lazy=True))]:
+        t0 = time.perf_counter()
+        results.append(dict(reader.read(path)["section0"]))
+        elapsed = time.perf_counter() - t0
+
+        print("  {:>5}: {:.3f}s".format(name, elapsed))
+
+    assert results[0] == results[1], "lazy .cfg read output differs"
+
+    shutil.rmtree(directory)
+
+
+def bench_archive_read(n_files=1000):
+    """
+    Measures time to find and read a set of .cfg files from a zip archive, compared to extracting the archive and
+    reading the files
+
+    :param n_files: number of files
+    """
+
+    directory = tempfile.mkdtemp()
+    src_dir = os.path.join(directory, "src")
+    os.makedirs(src_dir)
+    paths = write_cfg_files(src_dir, n_files, n_keys=10)
+
+    archive = os.path.join(directory, "bundle.zip")
+    with zipfile.ZipFile(archive, "w") as zf:
+        for path in paths:
+            zf.write(path, "configs/" + os.path.basename(path))
+
+    print("archive .cfg read ({} files)".format(n_files))
+
+    extract_dir = os.path.join(directory, "extract")
+    t0 = time.perf_counter()
+    with zipfile.ZipFile(archive) as zf:
+        zf.extractall(extract_dir)
+    extracted = [
+        read_config(p, use_cache=False)
+        for p in find_config(os.path.join(extract_dir, "configs"))
+    ]
+    print("  extract and read: {:.3f}s".format(time.perf_counter() - t0))
+
+    clear_config_cache()
+    t0 = time.perf_counter()
+    archived = [
+        read_config(p, use_cache=False) for p in find_config(archive + "::configs")
+    ]
+    print("  read from archive: {:.3f}s".format(time.perf_counter() - t0))
+
+    assert len(extracted) == len(archived) == n_files
+
+    clear_config_cache()
+    shutil.rmtree(directory)
+
+
+def bench_build_configdir(n_files=500):
+    """
+    Measures time to build, then rebuild, a configuration directory - with the default and incremental modes
+
+    :param n_files: number of configuration files
+    """
+
+    directory = tempfile.mkdtemp()
+    src_dir = os.path.join(directory, "src")
+    os.makedirs(src_dir)
+    src_paths = write_cfg_files(src_dir, n_files // 2)
+
+    configs = {os.path.basename(p): p for p in src_paths}
+    configs.update(
+        {
+            "config" + str(i) + ".yaml": make_yaml_config(5)
+            for i in range(n_files - len(configs))
+        }
+    )
+
+    print("build_configdir ({} files)".format(n_files))
+
+    for incremental in (False, True):
+        configdir = os.path.join(directory, "configdir" + str(incremental))
+        for label in ("build", "rebuild"):
+            t0 = time.perf_counter()
+            build_configdir(configdir, configs, incremental=incremental)
+            elapsed = time.perf_counter() - t0
+
+            print(
+                "  {:<11} {:<7}: {:.3f}s".format(
+                    "incremental" if incremental else "default", label, elapsed
+                )
+            )
+
+    shutil.rmtree(directory)
+
+
+def bench_get_value_stream(n_sections=5000, formats=("json", "yaml")):
+    """
+    Measures time and peak traced memory to find a key in a large configuration file with read_config and get_value, and
+    with get_value_stream
+
+    :param n_sections: number of configuration sections
+    :param formats: file extensions of formats to benchmark
+    """
+
+    directory = tempfile.mkdtemp()
+    config_dict = make_yaml_config(n_sections)
+    config_dict["section" + str(n_sections // 2)]["target"] = "found"
+
+    def read_get_value(path):
+        return get_value(read_config(path, use_cache=False), "target", multiple=True)
+
+    def stream_get_value(path):
+        return list(get_value_stream(path, "target"))
+
+    print("get_value_stream ({} sections)".format(n_sections))
+
+    for ext in formats:
+        path = os.path.join(directory, "config." + ext)
+        write_config(path, config_dict)
+
+        results = []
+        for func in (read_get_value, stream_get_value):
+            t0 = time.perf_counter()
+            values = func(path)
+            elapsed = time.perf_counter() - t0
+
+            # memory traced separately, as tracing slows execution
+            tracemalloc.start()
+            func(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results.append((values, elapsed, peak / 1e6))
+
+        assert results[0][0] == results[1][0], ext + " streamed values differ"
+
+        print(
+            (
+                "  {:>5} ({:.1f} MB): read_config + get_value {:.3f}s (peak {:.1f} MB),"
+                " get_value_stream {:.3f}s (peak {:.1f} MB)"
+            ).format(ext, os.path.getsize(path) / 1e6, *results[0][1:], *results[1][1:])
+        )
+
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    bench_threaded_cfg_read()
+    bench_cached_read()
+    bench_large_cfg_read()
+    bench_lazy_cfg_read()
+    bench_archive_read()
+    bench_build_configdir()
+    bench_yaml_read_write()
+    bench_format_read()
+    bench_get_value_stream()
@@ -0,0 +1,139 @@
+"""benchmarks.bench_context - benchmarks for processor_tools.context
+
+Run from the repository root with ``python -m benchmarks.bench_context``.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+from processor_tools import Context, write_config
+from processor_tools.config_io import YAMLReader
+
+
+__author__ = "Sam Hunt <sam.hunt@npl.co.uk>"
+
+
+def bench_threaded_read_throughput(n_threads=(1, 2, 4, 8), n_reads=20000):
+    """
+    Measures read throughput of a context shared between threads, with one concurrent writer
+
+    :param n_threads: numbers of reader threads to benchmark
+    :param n_reads: number of reads per reader thread
+    """
+
+    print("threaded read throughput ({} reads/thread, 1 writer)".format(n_reads))
+
+    for n in n_threads:
+        context = Context({"section" + str(i): {"val": i} for i in range(100)})
+        stop = threading.Event()
+
+        def reader():
+            for i in range(n_reads):
+                context.get("section1")
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                context.set("written", i)
+                i += 1
+
+        readers = [threading.Thread(target=reader) for i in range(n)]
+        writer_thread = threading.Thread(target=writer)
+
+        writer_thread.start()
+        t0 = time.perf_counter()
+        for thread in readers:
+            thread.start()
+        for thread in readers:
+            thread.join()
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        writer_thread.join()
+
+        print("  {:>2} threads: {:>12,.0f} reads/s".format(n, n * n_reads / elapsed))
+
+
+def bench_batch_updates(n_updates=(1000, 5000, 20000)):
+    """
+    Compares populating a context with a sequence of updates, with and without batching
+
+    :param n_updates: numbers of updates to benchmark
+    """
+
+    print("sequential vs batched updates")
+
+    for n in n_updates:
+        updates = [{"section" + str(i % 5): {"val" + str(i): i}} for i in range(n)]
+
+        context = Context()
+        t0 = time.perf_counter()
+        for update in updates:
+            context.update(update)
+        sequential = time.perf_counter() - t0
+
+        context = Context()
+        t0 = time.perf_counter()
+        with context.batch():
+            for update in updates:
+                context.update(update)
+        batched = time.perf_counter() - t0
+
+        print(
+            "  {:>5} updates: sequential {:.4f}s, batched {:.4f}s ({:.1f}x)".format(
+                n, sequential, batched, sequential / batched
+            )
+        )
+
+
+def bench_configdir_read(n_files=200, latencies=(0.0, 0.005)):
+    """
+    Compares building a context from a directory of configuration files, read sequentially and in parallel
+
+    :param n_files: number of configuration files in directory
+    :param latencies: simulated file access latencies (s) to benchmark, e.g. to emulate network filesystems
+    """
+
+    directory = tempfile.mkdtemp()
+    for i in range(n_files):
+        write_config(
+            os.path.join(directory, "file" + str(i) + ".yaml"),
+            {"section" + str(i): {"val" + str(j): j for j in range(20)}},
+        )
+
+    print("context from config directory ({} files)".format(n_files))
+
+    yaml_read = YAMLReader.read
+
+    for latency in latencies:
+
+        def read(self, path):
+            time.sleep(latency)
+            return yaml_read(self, path)
+
+        with patch.object(YAMLReader, "read", read):
+            Context.parallel_read_threshold = None
+            t0 = time.perf_counter()
+            Context(directory)
+            sequential = time.perf_counter() - t0
+
+            Context.parallel_read_threshold = 8
+            t0 = time.perf_counter()
+            Context(directory)
+            parallel = time.perf_counter() - t0
+
+        print(
+            "  latency {:.3f}s: sequential {:.3f}s, parallel {:.3f}s ({:.1f}x)".format(
+                latency, sequential, parallel, sequential / parallel
+            )
+        )
+
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    bench_threaded_read_throughput()
+    bench_batch_updates()
+    bench_configdir_read()
@@ -0,0 +1,156 @@
+"""benchmarks.bench_dict_tools - benchmarks for processor_tools.utils.dict_tools
+
+Run from the repository root with ``python -m benchmarks.bench_dict_tools``.
+"""
+
+import time
+from processor_tools.utils.dict_tools import (
+    get_value,
+    get_value_gen,
+    get_values,
+    KeyIndex,
+    select,
+)
+
+
+__author__ = "Sam Hunt <sam.hunt@npl.co.uk>"
+
+
+def make_metadata_dict(n_groups=2000, n_items=50):
+    """
+    Returns nested metadata dictionary, with groups of items (some in lists of dictionaries) within a top-level group
+
+    :param n_groups: number of groups
+    :param n_items: number of items per group
+    :return: metadata dictionary
+    """
+
+    groups = {}
+    for i in range(n_groups):
+        group = {
+            "ITEM_{}".format(j): "value_{}_{}".format(i, j) for j in range(n_items)
+        }
+        group["BANDS"] = [
+            {"BAND_ID": b, "RADIANCE_MULT": 0.01 * b, "GROUP_ID": i} for b in range(4)
+        ]
+        groups["GROUP_{}".format(i)] = group
+
+    return {"METADATA_FILE": groups}
+
+
+def bench_key_index(n_groups=(200, 2000), n_queries=100):
+    """
+    Measures time to look up many keys in a large nested dictionary with get_value_gen and KeyIndex
+
+    :param n_groups: numbers of groups (of 54 items each) of dictionaries to benchmark
+    :param n_queries: number of keys to look up
+    """
+
+    print("KeyIndex ({} queries)".format(n_queries))
+
+    for n in n_groups:
+        d = make_metadata_dict(n)
+        keys = ["ITEM_{}".format(j % 50) for j in range(n_queries - 2)]
+        keys += ["RADIANCE_MULT", "GROUP_{}".format(n - 1)]
+
+        t0 = time.perf_counter()
+        expected = [list(get_value_gen(d, key)) for key in keys]
+        t_gen = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = KeyIndex(d)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        results = [index.items(key) for key in keys]
+        t_lookup = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index.update(("METADATA_FILE", "GROUP_0"))
+        t_update = time.perf_counter() - t0
+
+        assert results == expected
+
+        print(
+            (
+                "  {:>6} groups: get_value_gen {:.3f}s, KeyIndex build {:.3f}s + lookups {:.3f}s"
+                " (group update {:.4f}s)"
+            ).format(n, t_gen, t_build, t_lookup, t_update)
+        )
+
+
+def bench_get_values(n_groups=(200, 2000), n_queries=100):
+    """
+    Measures time to look up many keys in a large nested dictionary with get_value per key and get_values
+
+    :param n_groups: numbers of groups (of 54 items each) of dictionaries to benchmark
+    :param n_queries: number of keys to look up
+    """
+
+    print("get_values ({} keys)".format(n_queries))
+
+    for n in n_groups:
+        d = make_metadata_dict(n)
+        keys = ["GROUP_{}".format(i) for i in range(n_queries - 1)] + ["BAND_ID"]
+
+        t0 = time.perf_counter()
+        expected = {key: get_value(d, key, multiple=True) for key in keys}
+        t_get_value = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        results_copy = get_values(d, keys, multiple=True, copy=True)
+        t_copy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        results = get_values(d, keys, multiple=True)
+        t_no_copy = time.perf_counter() - t0
+
+        assert results == expected
+        assert results_copy == expected
+
+        print(
+            "  {:>6} groups: get_value {:.3f}s, get_values {:.3f}s (copy=True {:.3f}s)".format(
+                n, t_get_value, t_no_copy, t_copy
+            )
+        )
+
+
+def bench_select(n_groups=(100, 400)):
+    """
+    Measures time to query a value from every group of a large nested dictionary with repeated get_value calls and
+    select
+
+    :param n_groups: numbers of groups (of 54 items each) of dictionaries to benchmark
+    """
+
+    query = "METADATA_FILE.GROUP_*.BANDS[*].RADIANCE_MULT"
+    print("select ({!r})".format(query))
+
+    for n in n_groups:
+        d = make_metadata_dict(n)
+
+        t0 = time.perf_counter()
+        expected = [
+            band["RADIANCE_MULT"]
+            for group_key in get_value(d, "METADATA_FILE")
+            for band in get_value(d, group_key)["BANDS"]
+        ]
+        t_get_value = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        results = list(select(d, query))
+        t_select = time.perf_counter() - t0
+
+        assert results == expected
+
+        print(
+            "  {:>6} groups: get_value {:.3f}s, select {:.4f}s".format(
+                n, t_get_value, t_select
+            )
+        )
+
+
+if __name__ == "__main__":
+    bench_key_index()
+    bench_get_values()
+    bench_select()
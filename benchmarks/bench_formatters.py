@@ -0,0 +1,427 @@
+"""benchmarks.bench_formatters - benchmarks for processor_tools.utils.formatters
+
+Run from the repository root with ``python -m benchmarks.bench_formatters``.
+"""
+
+import os
+import time
+import datetime as dt
+import tempfile
+import numpy as np
+from processor_tools.utils.formatters import (
+    convert_datetime,
+    datetime_from_yearday,
+    is_datetime,
+    is_number,
+    str2datetime,
+    str2datetime_many,
+    txt_to_dict,
+    txt_to_dict_many,
+    IngestStats,
+    val_format,
+    val_format_many,
+)
+
+
+__author__ = "Sam Hunt <sam.hunt@npl.co.uk>"
+
+
+def bench_convert_datetime_array(n_values=(10**4, 10**5, 10**6)):
+    """
+    Measures time to convert arrays of timestamps with convert_datetime, to datetime objects and datetime64 values
+
+    :param n_values: array sizes to benchmark
+    """
+
+    print("convert_datetime arrays")
+
+    for n in n_values:
+        epoch = 1655251800 + np.arange(n, dtype=np.float64) * 0.2500013
+        arrays = {
+            "datetime64": epoch.astype("int64").astype("datetime64[s]"),
+            "epoch": epoch,
+            "iso str": np.datetime_as_string(
+                (epoch * 1e6).astype("int64").astype("datetime64[us]")
+            ),
+        }
+
+        for name, array in arrays.items():
+            t0 = time.perf_counter()
+            converted = convert_datetime(array)
+            t_object = time.perf_counter() - t0
+
+            if name == "epoch":
+                # equal to the scalar path (checked on a sample, as it is slow)
+                sample = array[:: max(1, n // 1000)]
+                assert list(convert_datetime(sample)) == [
+                    convert_datetime(v) for v in sample.tolist()
+                ], "converted datetimes differ from scalar conversion"
+
+            t0 = time.perf_counter()
+            convert_datetime(array, as_datetime64=True)
+            t_datetime64 = time.perf_counter() - t0
+
+            print(
+                "  {:>8} {:<10}: objects {:.3f}s, datetime64 {:.3f}s".format(
+                    n, name, t_object, t_datetime64
+                )
+            )
+
+
+def bench_str2datetime_many(n_values=(10**4, 10**5), repeat_fraction=0.5):
+    """
+    Measures time to parse lists of timestamp strings of common formats, with str2datetime per value and
+    str2datetime_many
+
+    :param n_values: number of timestamps to benchmark
+    :param repeat_fraction: fraction of values that repeat an earlier value
+    """
+
+    print("str2datetime_many ({:.0%} repeated values)".format(repeat_fraction))
+
+    formats = {
+        "iso": "%Y-%m-%dT%H:%M:%S.%fZ",
+        "iso ns": "%Y-%m-%dT%H:%M:%S.%f123Z",
+        "time": "%H:%M:%S.%f123Z",
+        "slashes": "%d/%m/%Y %H:%M:%S",
+        "month name": "%d %b %Y %H:%M",
+    }
+
+    rng = np.random.default_rng(0)
+    start = dt.datetime(2022, 6, 15)
+
+    for n in n_values:
+        n_unique = max(1, int(n * (1 - repeat_fraction)))
+        offsets = rng.integers(0, n_unique, n) * 0.37
+        for name, fmt in formats.items():
+            values = [
+                (start + dt.timedelta(seconds=float(s))).strftime(fmt) for s in offsets
+            ]
+
+            t0 = time.perf_counter()
+            expected = [str2datetime(v) for v in values]
+            t_single = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            vals = str2datetime_many(values)
+            t_many = time.perf_counter() - t0
+
+            assert vals == expected
+
+            print(
+                "  {:>8} {:<11}: str2datetime {:.3f}s, str2datetime_many {:.3f}s".format(
+                    n, name, t_single, t_many
+                )
+            )
+
+
+def legacy_val_format(s):
+    """
+    Previous implementation of val_format, for comparison - tries int(), float() and a full dateutil parse for every
+    token
+    """
+    if type(s) is str:
+        v = s.split(";")
+        if len(v) == 1:
+            v = v[0].split(" ")
+        if len(v) == 1:
+            try:
+                val = int(v[0])
+            except ValueError:
+                if is_number(v[0]):
+                    val = float(v[0])
+                elif is_datetime(v[0]):
+                    val = str2datetime(v[0])
+                else:
+                    val = v[0]
+        else:
+            val = [0] * len(v)
+            for i, vi in enumerate(v):
+                try:
+                    val[i] = int(v[i])
+                except ValueError:
+                    if is_number(vi):
+                        val[i] = float(vi)
+                    elif is_datetime(vi):
+                        val[i] = str2datetime(vi)
+                    else:
+                        val[i] = vi
+            if type(val[0]) is str:
+                if "=" not in val[0]:
+                    val = " ".join([str(k) for k in val])
+                else:
+                    val = {}
+                    for vi in v:
+                        k, vv = vi.split("=")
+                        val[k] = legacy_val_format(vv)
+    else:
+        val = s
+    return val
+
+
+def make_metadata_values(n):
+    """
+    Returns list of metadata value strings, typical of MTL/ODL files
+
+    :param n: number of values
+    :return: metadata values
+    """
+
+    rng = np.random.default_rng(0)
+    templates = [
+        lambda i: "LANDSAT_8",
+        lambda i: "OLI_TIRS",
+        lambda i: "LC08_L1TP_{:06d}_20220615_20220627_02_T1_B{}.TIF".format(i, i % 11),
+        lambda i: "GEOTIFF",
+        lambda i: "UPPER LEFT CORNER",
+        lambda i: str(int(rng.integers(0, 10000))),
+        lambda i: "{:.5f}".format(rng.normal(0, 100)),
+        lambda i: "{:.6e}".format(rng.normal(0, 1)),
+        lambda i: "2022-06-{:02d}".format(1 + i % 28),
+        lambda i: "10:{:02d}:{:02d}.{:07d}Z".format(i % 60, (i // 60) % 60, i),
+        lambda i: "2022-06-15T10:{:02d}:{:02d}Z".format(i % 60, (i // 60) % 60),
+        lambda i: ";".join("{:.4f}".format(v) for v in rng.normal(0, 1, 16)),
+    ]
+
+    return [templates[i % len(templates)](i) for i in range(n)]
+
+
+def bench_val_format(n_values=(10**4, 10**5)):
+    """
+    Measures time to convert metadata value strings with the previous implementation of val_format, val_format and
+    val_format_many
+
+    :param n_values: number of values to benchmark
+    """
+
+    print("val_format")
+
+    for n in n_values:
+        values = make_metadata_values(n)
+
+        t0 = time.perf_counter()
+        [legacy_val_format(v) for v in values]
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        [val_format(v) for v in values]
+        t_val_format = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        val_format_many(values)
+        t_many = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        val_format_many(values, as_array=True)
+        t_many_array = time.perf_counter() - t0
+
+        print(
+            "  {:>8}: legacy {:.3f}s, val_format {:.3f}s, val_format_many {:.3f}s, as_array {:.3f}s".format(
+                n, t_legacy, t_val_format, t_many, t_many_array
+            )
+        )
+
+
+def legacy_list_to_dict(test_list, key=None):
+    """
+    Previous implementation of list_to_dict, for comparison - recurses on a copy of the remaining list for every group
+    """
+    d = {}
+    for i, e in enumerate(test_list):
+        if e[0] == "GROUP":
+            key = e[1]
+            values = [list(j.keys()) for k, j in enumerate(list(d.values())) if k == 0]
+            if len(values) == 0 or key not in values[0]:
+                d[key] = legacy_list_to_dict(test_list[i + 1 :], key)
+            key = None
+        elif e[0] == "END_GROUP" and e[1] == key:
+            return d
+        elif key is not None:
+            d.update({e[0]: e[1]})
+        else:
+            pass
+    return d
+
+
+def legacy_txt_to_dict(txt_filepath):
+    """
+    Previous implementation of txt_to_dict, for comparison - reads all lines of the file at once
+    """
+    with open(txt_filepath) as mtl:
+        lines = mtl.readlines()
+
+    elements = [
+        (j[0].strip().strip('""'), j[1].strip().strip('""'))
+        for j in [i.strip().split("\n")[0].split("=") for i in lines]
+        if len(j) == 2
+    ]
+
+    return legacy_list_to_dict(elements)
+
+
+def write_mtl_file(path, n_groups, n_items=20):
+    """
+    Writes MTL file (as distributed with Landsat products), with groups of metadata nested within a single top-level
+    group
+
+    :param path: file path
+    :param n_groups: number of groups of metadata
+    :param n_items: number of items per group
+    """
+
+    lines = ["GROUP = LANDSAT_METADATA_FILE"]
+    for i in range(n_groups):
+        lines.append("  GROUP = GROUP_{}".format(i))
+        for j in range(n_items):
+            if j % 4 == 0:
+                value = '"LC08_L1TP_{:06d}_20220615_20220627_02_T1"'.format(j)
+            elif j % 4 == 1:
+                value = "{:.5f}".format(i * 0.37 + j)
+            elif j % 4 == 2:
+                value = "2022-06-15"
+            else:
+                value = '"10:{:02d}:{:02d}.5510010Z"'.format(i % 60, j % 60)
+            lines.append("    ITEM_{} = {}".format(j, value))
+        lines.append("  END_GROUP = GROUP_{}".format(i))
+    lines += ["END_GROUP = LANDSAT_METADATA_FILE", "END"]
+
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def bench_txt_to_dict(n_groups=(10, 100, 1000, 4000)):
+    """
+    Measures time to read MTL files of increasing size with the previous implementation of txt_to_dict and txt_to_dict
+
+    :param n_groups: numbers of groups (of 20 items each) of MTL files to benchmark
+    """
+
+    print("txt_to_dict")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n in n_groups:
+            path = os.path.join(tmp_dir, "MTL_{}.txt".format(n))
+            write_mtl_file(path, n)
+
+            t0 = time.perf_counter()
+            expected = legacy_txt_to_dict(path)
+            t_legacy = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            d = txt_to_dict(path)
+            t_stream = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            d_mmap = txt_to_dict(path, use_mmap=True)
+            t_mmap = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            txt_to_dict(path, convert=True)
+            t_convert = time.perf_counter() - t0
+
+            assert d == expected
+            assert d_mmap == expected
+
+            print(
+                "  {:>6} lines: legacy {:.3f}s, txt_to_dict {:.3f}s, use_mmap {:.3f}s, convert {:.3f}s".format(
+                    n * 22 + 3, t_legacy, t_stream, t_mmap, t_convert
+                )
+            )
+
+
+def bench_txt_to_dict_many(n_files=2000, n_groups=20):
+    """
+    Measures throughput of reading many MTL files, one at a time with txt_to_dict, with txt_to_dict_many and re-reading
+    them from cache with txt_to_dict_many
+
+    :param n_files: number of MTL files
+    :param n_groups: number of groups (of 20 items each) per MTL file
+    """
+
+    print("txt_to_dict_many ({} files)".format(n_files))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, "MTL_{}.txt".format(i)) for i in range(n_files)]
+        for path in paths:
+            write_mtl_file(path, n_groups)
+        cache_path = os.path.join(tmp_dir, "cache.sqlite")
+
+        t0 = time.perf_counter()
+        for path in paths:
+            txt_to_dict(path, convert=True)
+        print(
+            "  {:<22}: {:.1f} files/s".format(
+                "txt_to_dict", n_files / (time.perf_counter() - t0)
+            )
+        )
+
+        for name, kwargs in [
+            ("txt_to_dict_many", {}),
+            ("  + cache (cold)", {"cache_path": cache_path}),
+            ("  + cache (warm)", {"cache_path": cache_path}),
+        ]:
+            stats = IngestStats()
+            for _ in txt_to_dict_many(paths, convert=True, stats=stats, **kwargs):
+                pass
+            print("  {:<22}: {}".format(name, stats))
+
+
+def bench_datetime_from_yearday(n_values=(10**4, 10**5, 10**6)):
+    """
+    Measures time to compute datetimes from arrays of year, day of year and HHMM time values, element by element and in
+    bulk
+
+    :param n_values: array sizes to benchmark
+    """
+
+    print("datetime_from_yearday")
+
+    rng = np.random.default_rng(0)
+    for n in n_values:
+        years = rng.integers(2000, 2030, n)
+        doys = rng.integers(1, 366, n)
+        utcs = {
+            "HHMM float": (
+                rng.integers(10, 24, n) * 100 + rng.integers(0, 60, n)
+            ).astype(np.float64),
+        }
+        utcs["HH:MM str"] = np.char.add(
+            np.char.zfill((utcs["HHMM float"] // 100).astype(int).astype(str), 2),
+            np.char.add(
+                ":",
+                np.char.zfill((utcs["HHMM float"] % 100).astype(int).astype(str), 2),
+            ),
+        )
+
+        for name, utc in utcs.items():
+            t_elementwise = None
+            if n <= 10**5:
+                t0 = time.perf_counter()
+                [
+                    datetime_from_yearday(y, d, u)
+                    for y, d, u in zip(years.tolist(), doys.tolist(), utc.tolist())
+                ]
+                t_elementwise = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            datetime_from_yearday(years, doys, utc)
+            t_array = time.perf_counter() - t0
+
+            print(
+                "  {:>8} {:<10}: element-wise {}, array {:.3f}s".format(
+                    n,
+                    name,
+                    "-" if t_elementwise is None else "{:.3f}s".format(t_elementwise),
+                    t_array,
+                )
+            )
+
+
+if __name__ == "__main__":
+    bench_convert_datetime_array()
+    bench_str2datetime_many()
+    bench_str2datetime_many(repeat_fraction=0.0)
+    bench_val_format()
+    bench_txt_to_dict()
+    bench_txt_to_dict_many()
+    bench_datetime_from_yearday()
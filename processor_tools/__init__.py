@@ -6,13 +6,21 @@ __all__ = [
     "ProcessorFactory",
     "NullProcessor",
     "read_config",
+    "read_configs",
+    "read_config_stream",
+    "get_value_stream",
     "write_config",
     "build_configdir",
     "Context",
+    "ContextSection",
+    "ContextBroadcast",
     "set_global_supercontext",
     "clear_global_supercontext",
     "CustomCmdClassUtils",
     "find_config",
+    "register_config_format",
+    "clear_config_cache",
+    "config_cache_info",
 ]
 
 from typing import List, Tuple, Union
@@ -23,12 +31,20 @@ from ._version import get_versions
 from processor_tools.processor import BaseProcessor, ProcessorFactory, NullProcessor
 from processor_tools.config_io import (
     read_config,
+    read_configs,
+    read_config_stream,
+    get_value_stream,
     write_config,
     build_configdir,
     find_config,
+    register_config_format,
+    clear_config_cache,
+    config_cache_info,
 )
 from processor_tools.context import (
     Context,
+    ContextSection,
+    ContextBroadcast,
     set_global_supercontext,
     clear_global_supercontext,
 )
@@ -1,16 +1,840 @@
 """processor_tools.config_io - reading/writing config files"""
 
+import errno
+import hashlib
+import importlib
 import os
+import posixpath
+import re
 import shutil
+import struct
+import tarfile
+import threading
+import uuid
+import zipfile
 import yaml
+import numpy as np
 from abc import ABC, abstractmethod
-from pathlib import Path
-from typing import Any, Dict, Optional, Union, List
+from collections import OrderedDict, deque, namedtuple
+from collections.abc import Mapping
+from copy import deepcopy
+from itertools import chain
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    Union,
+    List,
+    Hashable,
+    Iterable,
+    Iterator,
+    IO,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    cast,
+)
 import configparser
+import io
+import json
+import locale
+import functools
+import math
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _import_optional(*names: str) -> Optional[ModuleType]:
+    """
+    Returns first of modules that can be imported, for optional dependencies
+
+    :param names: module names, in order of preference
+    :return: imported module - or None if none are installed
+    """
+
+    for name in names:
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+
+    return None
+
+
+def _require(module: Optional[ModuleType], package: str) -> ModuleType:
+    """
+    Returns optional dependency module, if installed
+
+    :param module: optional dependency module, or None if not installed
+    :param package: name of package to install, for error message
+    :return: module
+    """
+
+    if module is None:
+        raise ImportError(
+            "optional dependency '{}' is required for this file format".format(package)
+        )
+
+    return module
+
+
+# optional dependencies for faster/additional config file formats
+orjson = _import_optional("orjson")
+tomllib = _import_optional("tomllib", "tomli")
+tomli_w = _import_optional("tomli_w")
+msgpack = _import_optional("msgpack")
+fcntl = _import_optional("fcntl")
 
 
 __author__ = "Sam Hunt <sam.hunt@npl.co.uk>"
-__all__ = ["read_config", "write_config", "build_configdir", "find_config"]
+__all__ = [
+    "read_config",
+    "read_configs",
+    "read_config_stream",
+    "get_value_stream",
+    "write_config",
+    "build_configdir",
+    "find_config",
+    "register_config_format",
+    "clear_config_cache",
+    "config_cache_info",
+]
+
+
+# separator of archive path and member path, e.g. "bundle.zip::configs/config.yaml"
+ARCHIVE_SEPARATOR = "::"
+_ARCHIVE_EXTS = (
+    ".zip",
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+)
+
+
+def _split_archive_path(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns archive path and member path, for paths within `.zip`/`.tar` archives (e.g.
+    `"bundle.zip::configs/config.yaml"`)
+
+    :param path: file path
+    :return: `(archive path, member path)` - or None if not an archive path
+    """
+
+    if ARCHIVE_SEPARATOR not in path:
+        return None
+
+    archive, member = path.split(ARCHIVE_SEPARATOR, 1)
+    if not archive.lower().endswith(_ARCHIVE_EXTS):
+        return None
+
+    member = posixpath.normpath(member.replace("\\", "/")).strip("/")
+    return archive, "" if member == "." else member
+
+
+class _ConfigArchive:
+    """
+    Index of `.zip`/`.tar` archive members, for reading members without extraction
+
+    :param path: archive path
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._files: Dict[str, Union[zipfile.ZipInfo, tarfile.TarInfo]] = {}
+        self._dirs: Dict[str, Set[str]] = {"": set()}
+
+        if zipfile.is_zipfile(path):
+            self._archive: Union[zipfile.ZipFile, tarfile.TarFile] = zipfile.ZipFile(
+                path
+            )
+            for zip_info in self._archive.infolist():
+                self._add(zip_info.filename, zip_info, zip_info.is_dir())
+
+        else:
+            self._archive = tarfile.open(path)
+            for tar_info in self._archive.getmembers():
+                if tar_info.isfile() or tar_info.isdir():
+                    self._add(tar_info.name, tar_info, tar_info.isdir())
+
+    def _add(
+        self, name: str, info: Union[zipfile.ZipInfo, tarfile.TarInfo], is_dir: bool
+    ) -> None:
+        name = posixpath.normpath(name).strip("/")
+        if name in ("", "."):
+            return
+
+        if is_dir:
+            self._dirs.setdefault(name, set())
+        else:
+            self._files[name] = info
+
+        # register member in each of its parent directories
+        while name != "":
+            parent = posixpath.dirname(name)
+            self._dirs.setdefault(parent, set()).add(posixpath.basename(name))
+            name = parent
+
+    def exists(self, member: str) -> bool:
+        return (member in self._files) or (member in self._dirs)
+
+    def isdir(self, member: str) -> bool:
+        return member in self._dirs
+
+    def listdir(self, member: str) -> List[str]:
+        return sorted(self._dirs[member])
+
+    def read(self, member: str) -> bytes:
+        if member not in self._files:
+            raise FileNotFoundError(
+                errno.ENOENT,
+                "no such archive member",
+                self.path + ARCHIVE_SEPARATOR + member,
+            )
+
+        info = self._files[member]
+
+        # archive file handles are shared, so reads are serialised
+        with self._lock:
+            if isinstance(self._archive, zipfile.ZipFile) and isinstance(
+                info, zipfile.ZipInfo
+            ):
+                return self._archive.read(info)
+
+            if isinstance(self._archive, tarfile.TarFile) and isinstance(
+                info, tarfile.TarInfo
+            ):
+                # only regular file members are indexed, which can always be extracted
+                f = self._archive.extractfile(info)
+                if f is not None:
+                    return f.read()
+
+        raise FileNotFoundError(
+            errno.ENOENT,
+            "archive member cannot be read",
+            self.path + ARCHIVE_SEPARATOR + member,
+        )
+
+    def close(self) -> None:
+        # waits for any read in progress
+        with self._lock:
+            self._archive.close()
+
+
+# indexes of most recently used archives, by path - with the archive's modification time and size when indexed
+_ARCHIVES: "OrderedDict[str, Tuple[int, int, _ConfigArchive]]" = OrderedDict()
+_ARCHIVES_MAXSIZE = 32
+_ARCHIVES_LOCK = threading.Lock()
+
+
+def _get_archive(path: str) -> _ConfigArchive:
+    """
+    Returns index of archive - cached, until the archive file is modified or the archive is evicted as least recently
+    used (see :py:func:`clear_config_cache <processor_tools.config_io.clear_config_cache>`)
+
+    :param path: archive path
+    :return: archive index
+    """
+
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    with _ARCHIVES_LOCK:
+        cached = _ARCHIVES.get(path)
+        if (cached is not None) and (cached[:2] == (stat.st_mtime_ns, stat.st_size)):
+            _ARCHIVES.move_to_end(path)
+            return cached[2]
+
+        # archive modified since indexed
+        if cached is not None:
+            cached[2].close()
+
+        archive = _ConfigArchive(path)
+        _ARCHIVES[path] = (stat.st_mtime_ns, stat.st_size, archive)
+        _ARCHIVES.move_to_end(path)
+
+        while len(_ARCHIVES) > _ARCHIVES_MAXSIZE:
+            _, (_, _, evicted) = _ARCHIVES.popitem(last=False)
+            evicted.close()
+
+    return archive
+
+
+def _open_config(path: str) -> IO[bytes]:
+    """
+    Returns binary file object of configuration file, which may be within a `.zip`/`.tar` archive (e.g.
+    `"bundle.zip::configs/config.yaml"`)
+
+    :param path: configuration file path
+    :return: file object
+    """
+
+    archive_path = _split_archive_path(path)
+    if archive_path is None:
+        return open(path, "rb")
+
+    archive, member = archive_path
+    return io.BytesIO(_get_archive(archive).read(member))
+
+
+def config_path_exists(path: str) -> bool:
+    """
+    Returns whether configuration file or directory path exists - as :py:func:`os.path.exists`, but also supporting
+    paths within `.zip`/`.tar` archives (e.g. `"bundle.zip::configs/config.yaml"`)
+
+    :param path: configuration file/directory path
+    :return: exists flag
+    """
+
+    archive_path = _split_archive_path(path)
+    if archive_path is None:
+        return os.path.exists(path)
+
+    archive, member = archive_path
+    return os.path.isfile(archive) and _get_archive(archive).exists(member)
+
+
+def config_path_isdir(path: str) -> bool:
+    """
+    Returns whether path is configuration directory - as :py:func:`os.path.isdir`, but also supporting paths within
+    `.zip`/`.tar` archives (e.g. `"bundle.zip::configs/"`)
+
+    :param path: path
+    :return: directory flag
+    """
+
+    archive_path = _split_archive_path(path)
+    if archive_path is None:
+        return os.path.isdir(path)
+
+    archive, member = archive_path
+    return os.path.isfile(archive) and _get_archive(archive).isdir(member)
+
+
+def _config_directory(path: str) -> str:
+    """
+    Returns absolute path of directory of configuration file, which relative paths in the file are resolved against -
+    for files within archives, the directory within the archive (e.g. `"/data/bundle.zip::configs"`)
+
+    :param path: configuration file path
+    :return: configuration directory path
+    """
+
+    archive_path = _split_archive_path(path)
+    if archive_path is None:
+        return os.path.dirname(os.path.abspath(path))
+
+    archive, member = archive_path
+    return os.path.abspath(archive) + ARCHIVE_SEPARATOR + posixpath.dirname(member)
+
+
+def _join_config_path(config_directory: str, path: str) -> str:
+    """
+    Returns path resolved against configuration directory - as :py:func:`os.path.join`, but resolving relative paths
+    within archive directories to archive members
+
+    :param config_directory: configuration directory path, as returned by :py:func:`_config_directory`
+    :param path: path to resolve
+    :return: resolved path
+    """
+
+    archive_path = _split_archive_path(config_directory)
+    if (archive_path is None) or os.path.isabs(path):
+        return os.path.join(config_directory, path)
+
+    archive, directory = archive_path
+    member = posixpath.normpath(posixpath.join(directory, path.replace("\\", "/")))
+    return archive + ARCHIVE_SEPARATOR + member
+
+
+_MISSING = object()
+
+# events of streamed configuration values - scalar events are (_SCALAR, value) tuples
+# and values that are not searched may be given whole as (_VALUE, value) tuples
+_MAP_START = (0,)
+_MAP_END = (1,)
+_SEQ_START = (2,)
+_SEQ_END = (3,)
+_SCALAR = 4
+_VALUE = 5
+
+_STREAM_CHUNK_SIZE = 1 << 16
+
+
+def _value_events(value: Any) -> Iterator[tuple]:
+    """
+    Yields events of configuration value, as streamed from a configuration file
+
+    :param value: configuration value
+    :return: value events
+    """
+
+    if isinstance(value, Mapping):
+        yield _MAP_START
+        for k, v in value.items():
+            yield _SCALAR, k
+            yield from _value_events(v)
+        yield _MAP_END
+
+    elif isinstance(value, (list, tuple)):
+        yield _SEQ_START
+        for v in value:
+            yield from _value_events(v)
+        yield _SEQ_END
+
+    else:
+        yield _SCALAR, value
+
+
+class _ValueBuilder:
+    """
+    Builds configuration value from its events
+    """
+
+    __slots__ = ("value", "_containers", "_keys")
+
+    def __init__(self):
+        self.value: Any = None
+        self._containers: List[Union[dict, list]] = []
+        self._keys: List[Any] = []
+
+    def feed(self, event: tuple) -> bool:
+        """
+        Adds event to value
+
+        :param event: value event
+        :return: flag indicating if value is complete
+        """
+
+        if event is _MAP_START:
+            self._containers.append({})
+            self._keys.append(_MISSING)
+            return False
+
+        if event is _SEQ_START:
+            self._containers.append([])
+            self._keys.append(None)
+            return False
+
+        if (event is _MAP_END) or (event is _SEQ_END):
+            self._keys.pop()
+            value = self._containers.pop()
+        else:
+            value = event[1]
+
+        if not self._containers:
+            self.value = value
+            return True
+
+        container = self._containers[-1]
+        if isinstance(container, list):
+            container.append(value)
+        elif self._keys[-1] is _MISSING:
+            self._keys[-1] = value
+        else:
+            container[self._keys[-1]] = value
+            self._keys[-1] = _MISSING
+
+        return False
+
+
+class _StreamMatch:
+    """
+    Key-value pair found in streamed configuration values
+
+    :param key: matched key
+    """
+
+    __slots__ = ("key", "value", "complete", "confirmed", "cancelled")
+
+    def __init__(self, key: Any):
+        self.key = key
+        self.value: Any = None
+        self.complete = False
+        self.confirmed = False
+        self.cancelled = False
+
+
+class _StreamFrame:
+    """
+    Open mapping or sequence of streamed configuration values
+
+    :param is_map: flag indicating if mapping, otherwise sequence
+    :param searched: flag indicating if contained keys are searched
+    :param ancestors: searched keys the container is nested within
+    """
+
+    __slots__ = ("is_map", "searched", "ancestors", "expect_key", "key", "matches")
+
+    def __init__(self, is_map: bool, searched: bool, ancestors: frozenset):
+        self.is_map = is_map
+        self.searched = searched
+        self.ancestors = ancestors
+        self.expect_key = True
+        self.key: Any = None
+        self.matches: List[_StreamMatch] = []
+
+
+def _search_events(
+    events: Iterable[tuple], keys: Set[Any]
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yields key-value pairs for keys found in streamed configuration values, as
+    :py:func:`get_value_gen <processor_tools.utils.dict_tools.get_value_gen>` - but building only matched values from
+    the events
+
+    Matched values are yielded in document order, once complete. As for
+    :py:func:`get_value_gen <processor_tools.utils.dict_tools.get_value_gen>`, lists are only searched if all of their
+    items are dictionaries - so matches within lists are held until the end of the list.
+
+    :param events: configuration value events
+    :param keys: keys to search for
+    :return: key-value pairs
+    """
+
+    frames: List[_StreamFrame] = []
+    searched_seqs: List[_StreamFrame] = []
+    builders: List[Tuple[_StreamMatch, _ValueBuilder]] = []
+    pending: Deque[_StreamMatch] = deque()
+
+    for event in events:
+        if (event is _MAP_END) or (event is _SEQ_END):
+            frame = frames.pop()
+            if (not frame.is_map) and frame.searched:
+                # list of dictionaries is complete, so its matches stand
+                searched_seqs.pop()
+                if searched_seqs:
+                    searched_seqs[-1].matches.extend(frame.matches)
+                else:
+                    for match in frame.matches:
+                        match.confirmed = True
+
+        elif frames and frames[-1].is_map and frames[-1].expect_key:
+            if event[0] != _SCALAR:
+                raise ValueError("unsupported non-scalar mapping key")
+            frames[-1].key = event[1]
+            frames[-1].expect_key = False
+
+        else:
+            key = _MISSING
+            ancestors: frozenset
+            if not frames:
+                searched = True
+                ancestors = frozenset()
+
+            else:
+                parent = frames[-1]
+                if parent.is_map:
+                    parent.expect_key = True
+                    searched = parent.searched
+                    ancestors = parent.ancestors
+                    if searched and (parent.key in keys):
+                        # values of a key are not searched for the same key
+                        if parent.key not in ancestors:
+                            key = parent.key
+                        ancestors = ancestors | {parent.key}
+
+                else:
+                    if (
+                        parent.searched
+                        and (event is not _MAP_START)
+                        and not ((event[0] == _VALUE) and isinstance(event[1], dict))
+                    ):
+                        # not a list of dictionaries, so not searched
+                        parent.searched = False
+                        searched_seqs.pop()
+                        for match in parent.matches:
+                            match.cancelled = True
+                        parent.matches = []
+                        builders = [b for b in builders if not b[0].cancelled]
+
+                    searched = parent.searched
+                    ancestors = parent.ancestors
+
+            if key is not _MISSING:
+                match = _StreamMatch(key)
+                pending.append(match)
+                if searched_seqs:
+                    searched_seqs[-1].matches.append(match)
+                else:
+                    match.confirmed = True
+                builders.append((match, _ValueBuilder()))
+
+            if event is _MAP_START:
+                frames.append(_StreamFrame(True, searched, ancestors))
+            elif event is _SEQ_START:
+                frames.append(_StreamFrame(False, searched, ancestors))
+                if searched:
+                    searched_seqs.append(frames[-1])
+
+        if builders:
+            building = []
+            for match, builder in builders:
+                if builder.feed(event):
+                    match.value = builder.value
+                    match.complete = True
+                else:
+                    building.append((match, builder))
+            builders = building
+
+        while pending and (
+            pending[0].cancelled or (pending[0].complete and pending[0].confirmed)
+        ):
+            match = pending.popleft()
+            if not match.cancelled:
+                yield match.key, match.value
+
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_NON_WHITESPACE_RE = re.compile(r"[^ \t\n\r]")
+
+# json scanner states
+_JSON_VALUE = 0  # expecting value
+_JSON_FIRST_VALUE = 1  # expecting value or "]"
+_JSON_FIRST_KEY = 2  # expecting key or "}"
+_JSON_KEY = 3  # expecting key
+_JSON_COLON = 4  # expecting ":"
+_JSON_NEXT = 5  # expecting "," or end of container
+_JSON_END = 6  # expecting end of document
+
+
+def _json_events(
+    stream: IO[str],
+    keys: Optional[Set[Any]] = None,
+    chunk_size: int = _STREAM_CHUNK_SIZE,
+) -> Iterator[tuple]:
+    """
+    Yields events of json document, read incrementally from stream - so only the current chunk of the document is held
+    in memory
+
+    :param stream: json text stream
+    :param keys: keys to be searched for - if defined, containers within the current chunk that cannot contain these
+        keys are decoded at once (with the :py:mod:`json` C scanner) and yielded as single unsearched values
+    :param chunk_size: number of characters to read from stream at a time
+    :return: value events
+    """
+
+    buf = ""
+    pos = 0
+    eof = False
+
+    # text of keys, as may be found in the document without escapes
+    needles = set()
+    for key in keys or ():
+        if isinstance(key, str):
+            needles.add(json.dumps(key))
+            needles.add(json.dumps(key, ensure_ascii=False))
+
+    def read_more() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def decode_container() -> Optional[Iterator[tuple]]:
+        nonlocal pos
+        if len(buf) - pos < chunk_size:
+            read_more()
+
+        try:
+            value, end = _JSON_DECODER.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # extends beyond the current chunk (or is invalid), so is scanned
+            return None
+
+        start = pos
+        pos = end
+        if (buf.find("\\", start, end) == -1) and not any(
+            buf.find(needle, start, end) != -1 for needle in needles
+        ):
+            return iter([(_VALUE, value)])
+
+        return _value_events(value)
+
+    def scan_scalar() -> Any:
+        nonlocal pos
+        # longest constant is "-Infinity"
+        while (len(buf) - pos < 9) and read_more():
+            pass
+
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # strings, or escapes, may be split between chunks
+                if (
+                    e.msg.startswith("Unterminated") or (e.pos >= len(buf) - 6)
+                ) and read_more():
+                    continue
+                raise
+
+            # numbers may be split between chunks, e.g. "1.", "1e+"
+            if (end + 2 >= len(buf)) and read_more():
+                continue
+
+            pos = end
+            return value
+
+    containers: List[str] = []
+    state = _JSON_VALUE
+    while True:
+        m = _JSON_NON_WHITESPACE_RE.search(buf, pos)
+        pos = len(buf) if m is None else m.start()
+        if pos == len(buf):
+            if read_more():
+                continue
+            break
+
+        c = buf[pos]
+
+        if state == _JSON_NEXT:
+            if c == ",":
+                pos += 1
+                state = _JSON_KEY if containers[-1] == "{" else _JSON_VALUE
+                continue
+            if c != ("}" if containers[-1] == "{" else "]"):
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+
+        elif state == _JSON_COLON:
+            if c != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", buf, pos)
+            pos += 1
+            state = _JSON_VALUE
+            continue
+
+        elif state == _JSON_END:
+            raise json.JSONDecodeError("Extra data", buf, pos)
+
+        elif (state == _JSON_FIRST_KEY) or (state == _JSON_KEY):
+            if c == '"':
+                yield _SCALAR, scan_scalar()
+                state = _JSON_COLON
+                continue
+            if (c != "}") or (state == _JSON_KEY):
+                raise json.JSONDecodeError(
+                    "Expecting property name enclosed in double quotes", buf, pos
+                )
+
+        elif (c != "]") or (state != _JSON_FIRST_VALUE):
+            # value
+            if (keys is not None) and ((c == "{") or (c == "[")):
+                value_events = decode_container()
+                if value_events is not None:
+                    yield from value_events
+                    state = _JSON_NEXT if containers else _JSON_END
+                    continue
+
+            if c == "{":
+                pos += 1
+                containers.append(c)
+                state = _JSON_FIRST_KEY
+                yield _MAP_START
+                continue
+
+            if c == "[":
+                pos += 1
+                containers.append(c)
+                state = _JSON_FIRST_VALUE
+                yield _SEQ_START
+                continue
+
+            yield _SCALAR, scan_scalar()
+            state = _JSON_NEXT if containers else _JSON_END
+            continue
+
+        # end of container
+        pos += 1
+        yield _MAP_END if containers.pop() == "{" else _SEQ_END
+        state = _JSON_NEXT if containers else _JSON_END
+
+    if state != _JSON_END:
+        raise json.JSONDecodeError("Expecting value", buf, pos)
+
+
+def _yaml_events(loader: yaml.SafeLoader) -> Iterator[tuple]:
+    """
+    Yields events of yaml documents, parsed incrementally by loader - scalars are resolved and constructed as by the
+    loader, and aliases are replaced by the events of their anchored values
+
+    :param loader: yaml loader
+    :return: value events
+    """
+
+    anchors: Dict[str, Any] = {}
+    anchor_builders: List[Tuple[str, _ValueBuilder]] = []
+
+    while loader.check_event():
+        event = loader.get_event()
+
+        if isinstance(event, yaml.ScalarEvent):
+            tag = event.tag
+            if (tag is None) or (tag == "!"):
+                tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+            # marks of the libyaml parser are equivalent to yaml.Mark
+            node = yaml.ScalarNode(
+                tag,
+                event.value,
+                cast(Optional[yaml.Mark], event.start_mark),
+                cast(Optional[yaml.Mark], event.end_mark),
+                event.style,
+            )
+            value = loader.construct_object(node, deep=True)
+            loader.constructed_objects.pop(node, None)
+            value_events: Iterable[tuple] = ((_SCALAR, value),)
+
+        elif isinstance(event, yaml.MappingStartEvent):
+            value_events = (_MAP_START,)
+        elif isinstance(event, yaml.SequenceStartEvent):
+            value_events = (_SEQ_START,)
+        elif isinstance(event, yaml.MappingEndEvent):
+            value_events = (_MAP_END,)
+        elif isinstance(event, yaml.SequenceEndEvent):
+            value_events = (_SEQ_END,)
+
+        elif isinstance(event, yaml.AliasEvent):
+            if event.anchor not in anchors:
+                raise yaml.composer.ComposerError(
+                    None,
+                    None,
+                    "found undefined alias {!r}".format(event.anchor),
+                    cast(Optional[yaml.Mark], event.start_mark),
+                )
+            value_events = _value_events(anchors[event.anchor])
+
+        else:
+            if isinstance(event, yaml.DocumentEndEvent):
+                anchors = {}
+            continue
+
+        # anchored values are kept, for their aliases
+        anchor = getattr(event, "anchor", None)
+        if (anchor is not None) and not isinstance(event, yaml.AliasEvent):
+            anchor_builders.append((anchor, _ValueBuilder()))
+
+        for value_event in value_events:
+            if anchor_builders:
+                building = []
+                for name, builder in anchor_builders:
+                    if builder.feed(value_event):
+                        anchors[name] = builder.value
+                    else:
+                        building.append((name, builder))
+                anchor_builders = building
+
+            yield value_event
 
 
 class BaseConfigReader(ABC):
@@ -34,142 +858,713 @@ class BaseConfigReader(ABC):
 
         pass
 
+    def read_stream(self, path: str) -> Iterator[Any]:
+        """
+        Yields documents from configuration file - for single document formats, the configuration values dictionary is
+        the only document
+
+        :param path: path of configuration file
+        :return: configuration documents
+        """
+
+        yield self.read(path)
+
+    def get_value_stream(self, path: str, keys: Set[Any]) -> Iterator[Tuple[Any, Any]]:
+        """
+        Yields key-value pairs for keys found in configuration file documents, as
+        :py:func:`get_value_stream <processor_tools.config_io.get_value_stream>` - for formats without an incremental
+        parser, each document is read in full
+
+        :param path: path of configuration file
+        :param keys: keys to search for
+        :return: key-value pairs
+        """
+
+        documents = self.read_stream(path)
+        return _search_events(chain.from_iterable(map(_value_events, documents)), keys)
+
     @staticmethod
     def _infer_dtype(val: Any) -> type:
         """
         Return inferred dtype of val
 
-        :param val: value
-        :return: inferred data type
-        """
+        :param val: value
+        :return: inferred data type
+        """
+
+        if val is None:
+            return type(None)
+
+        match = _VALUE_RE.match(val)
+        if match is None:
+            return str
+
+        # every alternative of the pattern is a named group, so a match always sets one
+        return _DTYPE_BY_GROUP[cast(str, match.lastgroup)]
+
+
+# single pass classification of string values - matching the strings accepted by
+# int()/float() (except for surrounding whitespace, which configparser strips)
+_DIGITS = r"\d+(?:_\d+)*"
+_VALUE_RE = re.compile(
+    r"(?:(?P<bool>true|false)"
+    r"|\s*(?:(?P<int>[+-]?" + _DIGITS + r")"
+    r"|(?P<float>[+-]?(?:"
+    r"(?:(?:" + _DIGITS + r")?\.)?" + _DIGITS + r"(?:e[+-]?" + _DIGITS + r")?"
+    r"|" + _DIGITS + r"\.(?:e[+-]?" + _DIGITS + r")?"
+    r"|inf(?:inity)?|nan)))\s*"
+    r")\Z",
+    re.IGNORECASE,
+)
+_DTYPE_BY_GROUP = {"bool": bool, "int": int, "float": float}
+
+
+class ConfigReader(BaseConfigReader):
+    """
+    Default python config file reader
+
+    String values that are paths relative to the configuration file are returned as absolute paths. By default, string
+    values are resolved if a file or directory exists at that path. Alternatively, the keys of path values may be
+    defined with `path_keys`, in which case only these values are resolved (whether or not a file exists) and no other
+    values are checked against the filesystem - which is faster for large configuration files.
+
+    With `lazy` set, sections are returned as
+    :py:class:`LazyConfigSection <processor_tools.config_io.LazyConfigSection>` objects - the file is only indexed by
+    section on reading, and each section parsed and converted when it is first accessed. This is much faster for large
+    configuration files where only some sections are used. Section headers must not be indented.
+
+    :param path_keys: names of keys with path values (defaults to detecting path values)
+    :param lazy: (default: False) option to parse sections lazily, on access
+    """
+
+    def __init__(self, path_keys: Optional[Iterable[str]] = None, lazy: bool = False):
+        # configparser lowercases keys
+        self.path_keys = (
+            None if path_keys is None else frozenset(k.lower() for k in path_keys)
+        )
+        self.lazy = lazy
+
+    def read(self, path: str, lazy: Optional[bool] = None) -> Dict:
+        """
+        Returns information from configuration file
+
+        :param path: path of configuration file
+        :param lazy: option to parse sections lazily, on access (defaults to reader's `lazy` setting)
+        :return: configuration values dictionary
+        """
+
+        # relative paths in config file are resolved against its directory
+        config_directory = _config_directory(path)
+        path = os.path.abspath(path)
+
+        # as configparser, files that cannot be opened are skipped
+        try:
+            with _open_config(path) as f:
+                data = f.read()
+        except OSError:
+            return {}
+
+        encoding = locale.getpreferredencoding(False)
+
+        if self.lazy if lazy is None else lazy:
+            return self._read_lazy(data, encoding, path, config_directory)
+
+        config = _parse_config_text(data, encoding)
+
+        return {
+            section: self._convert_items(config.items(section), config_directory)
+            for section in config.sections()
+        }
+
+    def _read_lazy(
+        self, data: bytes, encoding: str, path: str, config_directory: str
+    ) -> Dict:
+        """
+        Returns lazily parsed sections of configuration file, indexing the file by its section headers
+
+        :param data: configuration file content
+        :param encoding: configuration file encoding
+        :param path: absolute path of configuration file
+        :param config_directory: directory to resolve relative paths against
+        :return: configuration sections dictionary
+        """
+
+        headers = list(_SECTION_HEADER_RE.finditer(data))
+        starts = [header.start() for header in headers]
+
+        # check any content before first section, raises as configparser
+        _parse_config_text(data[: starts[0] if starts else len(data)], encoding)
+
+        texts: Dict[str, bytes] = {}
+        for i, header in enumerate(headers):
+            name = header.group(1).decode(encoding)
+            if name in texts:
+                raise configparser.DuplicateSectionError(name, path)
+
+            end = starts[i + 1] if i + 1 < len(starts) else len(data)
+            texts[name] = data[header.start() : end]
+
+        defaults = texts.pop(configparser.DEFAULTSECT, b"")
+
+        return {
+            name: LazyConfigSection(
+                self, name, defaults + text, encoding, config_directory
+            )
+            for name, text in texts.items()
+        }
+
+    def _convert_items(self, items: Iterable, config_directory: Optional[str]) -> Dict:
+        """
+        Returns converted configuration values of section
+
+        :param items: `(key, value string)` pairs of section
+        :param config_directory: directory to resolve relative paths against
+        :return: section configuration values
+        """
+
+        convert = self._convert_value
+        path_keys = self.path_keys
+
+        return {
+            key: convert(
+                val, config_directory, None if path_keys is None else key in path_keys
+            )
+            for key, val in items
+        }
+
+    @staticmethod
+    def _convert_value(
+        val: Optional[str],
+        config_directory: Optional[str] = None,
+        is_path: Optional[bool] = None,
+    ) -> Union[None, str, bool, int, float]:
+        """
+        Return config file value string converted to its inferred type
+
+        :param val: config value string
+        :param config_directory: directory to resolve relative paths against (defaults to current working directory)
+        :param is_path: if `True` value is resolved as a path, if `False` value is not a path, if `None` value is
+            resolved as a path if the path exists
+
+        :return: config value
+        """
+
+        if (val == "") or (val is None):
+            return None
+
+        match = _VALUE_RE.match(val)
+
+        if match is None:
+            if is_path is False:
+                return val
+
+            path_val = (
+                val
+                if config_directory is None
+                else _join_config_path(config_directory, val)
+            )
+            if is_path or config_path_exists(path_val):
+                return os.path.abspath(path_val)
+
+            return val
+
+        group = match.lastgroup
+        if group == "bool":
+            return val.lower() == "true"
+
+        elif group == "int":
+            return int(val)
+
+        return float(val)
+
+    @staticmethod
+    def _extract_config_value(
+        config: configparser.RawConfigParser,
+        section: str,
+        key: str,
+        dtype: Optional[type] = None,
+        config_directory: Optional[str] = None,
+        is_path: Optional[bool] = None,
+    ) -> Union[None, str, bool, int, float]:
+        """
+        Return value from config file
+
+        :param config: parsed config file
+        :param section: section to retrieve data from
+        :param key: key in section to retrieve data from
+        :param dtype: type of data to return (defaults to inferred type)
+        :param config_directory: directory to resolve relative paths against (defaults to current working directory)
+        :param is_path: if `True` value is resolved as a path, if `False` value is not a path, if `None` value is
+            resolved as a path if the path exists
+
+        :return: config value
+        """
+
+        val = config.get(section, key, fallback=None)
+
+        if dtype is None:
+            return ConfigReader._convert_value(val, config_directory, is_path)
+
+        if (val == "") or (val is None):
+            if dtype == bool:
+                return False
+            return None
+
+        if dtype == str:
+            if is_path is False:
+                return val
+
+            path_val = (
+                val
+                if config_directory is None
+                else _join_config_path(config_directory, val)
+            )
+            if is_path or config_path_exists(path_val):
+                val = os.path.abspath(path_val)
+
+            return val
+
+        elif dtype == bool:
+            return config.getboolean(section, key)
+
+        elif dtype == int:
+            return config.getint(section, key)
+
+        elif dtype == float:
+            return config.getfloat(section, key)
+
+        else:
+            return None
+
+
+# configparser section headers, at the start of an (unindented) line
+_SECTION_HEADER_RE = re.compile(rb"^\[([^\r\n]+)\][^\r\n]*$", re.MULTILINE)
+
+
+def _parse_config_text(text: bytes, encoding: str) -> configparser.RawConfigParser:
+    """
+    Returns parsed configuration file text
+
+    :param text: configuration file text
+    :param encoding: text encoding
+    :return: parsed configuration
+    """
+
+    config = configparser.RawConfigParser()
+    config.read_file(io.StringIO(text.decode(encoding), newline=None))
+
+    return config
+
+
+class LazyConfigSection(Mapping):
+    """
+    Read-only mapping of the configuration values of a config file section, as returned by
+    :py:class:`ConfigReader <processor_tools.config_io.ConfigReader>` with `lazy=True`.
+
+    The section is only parsed, and its values converted, when first accessed.
+
+    :param reader: config file reader
+    :param name: section name
+    :param text: section text (preceded by any `DEFAULT` section text)
+    :param encoding: section text encoding
+    :param config_directory: directory to resolve relative paths against
+    """
+
+    def __init__(
+        self,
+        reader: ConfigReader,
+        name: str,
+        text: bytes,
+        encoding: str,
+        config_directory: Optional[str] = None,
+    ):
+        self.name = name
+        self._reader = reader
+        self._text: Optional[bytes] = text
+        self._encoding = encoding
+        self._config_directory = config_directory
+        self._values: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_parsed(self) -> bool:
+        """
+        Returns whether section has been parsed
+
+        :return: parsed flag
+        """
+
+        return self._values is not None
+
+    def _get_values(self) -> Dict:
+        values = self._values
+        if values is not None:
+            return values
+
+        with self._lock:
+            if self._values is None:
+                # text is only released once the values have been parsed from it
+                config = _parse_config_text(cast(bytes, self._text), self._encoding)
+                self._values = self._reader._convert_items(
+                    config.items(self.name), self._config_directory
+                )
+                self._text = None
+
+            return self._values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._get_values()[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._get_values()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_values())
+
+    def __len__(self) -> int:
+        return len(self._get_values())
+
+    def __repr__(self) -> str:
+        if self._values is None:
+            return "<LazyConfigSection: {} (unparsed)>".format(self.name)
+        return "<LazyConfigSection: {} {}>".format(self.name, self._values)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _load_npy(path: str) -> np.ndarray:
+    """
+    Returns read-only memory-mapped array from `.npy` file - or read into memory, for files within archives
+
+    :param path: `.npy` file path
+    :return: memory-mapped array
+    """
+
+    if _split_archive_path(path) is not None:
+        with _open_config(path) as f:
+            array = np.load(f)
+        array.setflags(write=False)
+        return array
+
+    return np.load(path, mmap_mode="r")
+
+
+def _load_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    Returns arrays from `.npz` file, memory-mapped where possible.
+
+    :py:func:`numpy.load` ignores `mmap_mode` for `.npz` files, so members stored without compression (i.e. written by
+    :py:func:`numpy.savez`) are memory-mapped directly from their offset in the archive. Compressed members (i.e.
+    written by :py:func:`numpy.savez_compressed`) cannot be mapped and are loaded into memory.
+
+    :param path: `.npz` file path
+    :return: dictionary of arrays, by member name
+    """
+
+    arrays: Dict[str, np.ndarray] = {}
+
+    # files within archives cannot be mapped, so are read into memory
+    if _split_archive_path(path) is not None:
+        with _open_config(path) as f, np.load(f) as npz:
+            for name in npz.files:
+                arrays[name] = npz[name]
+                arrays[name].setflags(write=False)
+
+        return arrays
+
+    with zipfile.ZipFile(path) as zf:
+        infos = zf.infolist()
+
+    with open(path, "rb") as f:
+        for info in infos:
+            name = (
+                info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            )
+
+            array = None
+            if info.compress_type == zipfile.ZIP_STORED:
+                # skip zip local file header to member data, an embedded .npy file
+                f.seek(info.header_offset)
+                fname_len, extra_len = struct.unpack("<HH", f.read(30)[26:30])
+                f.seek(info.header_offset + 30 + fname_len + extra_len)
+
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    header = np.lib.format.read_array_header_1_0(f)
+                elif version == (2, 0):
+                    header = np.lib.format.read_array_header_2_0(f)
+                else:
+                    header = None
+
+                if header is not None:
+                    shape, fortran_order, dtype = header
+                    if (not dtype.hasobject) and (int(np.prod(shape)) > 0):
+                        array = np.memmap(
+                            path,
+                            dtype=dtype,
+                            mode="r",
+                            shape=shape,
+                            order="F" if fortran_order else "C",
+                            offset=f.tell(),
+                        )
+
+            if array is None:
+                with np.load(path) as npz:
+                    array = npz[name]
+
+            arrays[name] = array
+
+    return arrays
+
+
+# libyaml-based C implementations are used where PyYAML is built with them, they are
+# output-equivalent to the pure-python implementations and substantially faster
+if TYPE_CHECKING:
+    # type checked as the pure-python loader, which the C loader is equivalent to
+    _YAMLSafeLoader = yaml.SafeLoader
+else:
+    _YAMLSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAMLDumper = getattr(yaml, "CDumper", yaml.Dumper)
+
+
+class _ConfigLoader(_YAMLSafeLoader):
+    """
+    YAML safe loader, extended with tags to reference external numpy array files:
+
+    * `!npy <path>` - `.npy` file, loaded as read-only memory-mapped array
+    * `!npz <path>` - `.npz` file, loaded as dictionary of arrays (memory-mapped where stored uncompressed)
+
+    Relative paths are resolved against the directory of the yaml file (within the archive, for yaml files within
+    archives).
+    """
+
+    config_directory: Optional[str] = None
+
+    def _resolve_path(self, node: yaml.ScalarNode) -> str:
+        path = os.path.expanduser(self.construct_scalar(node))
+
+        if self.config_directory is not None:
+            path = _join_config_path(self.config_directory, path)
+
+        return path
+
+    def construct_npy(self, node: yaml.ScalarNode) -> np.ndarray:
+        return _load_npy(self._resolve_path(node))
+
+    def construct_npz(self, node: yaml.ScalarNode) -> Dict[str, np.ndarray]:
+        return _load_npz(self._resolve_path(node))
+
+
+_ConfigLoader.add_constructor("!npy", _ConfigLoader.construct_npy)
+_ConfigLoader.add_constructor("!npz", _ConfigLoader.construct_npz)
+
+
+class YAMLReader(BaseConfigReader):
+    """
+    YAML file reader
+
+    Large arrays may be referenced from external numpy files, rather than embedded in the yaml, with the `!npy` and
+    `!npz` tags - for example:
+
+    .. code-block:: yaml
+
+       calibration:
+         gains: !npy gains.npy
+         tables: !npz tables.npz
+
+    Arrays are returned memory-mapped (read-only), so are only paged into memory as they are accessed. Relative paths
+    are resolved against the directory of the yaml file. For yaml files within `.zip`/`.tar` archives, relative paths
+    refer to members of the same archive - these arrays cannot be memory-mapped, so are read into memory (read-only).
+    """
+
+    def read(self, path: str) -> Dict:
+        """
+        Returns information from yaml file
+
+        :param path: path of yaml file
+        :return: configuration values dictionary
+        """
+
+        with io.TextIOWrapper(_open_config(path)) as stream:
+            loader = _ConfigLoader(stream)
+            loader.config_directory = _config_directory(path)
+            try:
+                config_values = loader.get_single_data()
+            finally:
+                loader.dispose()
+
+        return config_values
+
+    def read_stream(self, path: str) -> Iterator[Any]:
+        """
+        Yields documents from (multi-document) yaml file, parsing each as it is consumed - so only one document is held
+        in memory at a time
+
+        :param path: path of yaml file
+        :return: yaml documents
+        """
+
+        with io.TextIOWrapper(_open_config(path)) as stream:
+            loader = _ConfigLoader(stream)
+            loader.config_directory = _config_directory(path)
+            try:
+                while loader.check_data():
+                    yield loader.get_data()
+            finally:
+                loader.dispose()
+
+    def get_value_stream(self, path: str, keys: Set[Any]) -> Iterator[Tuple[Any, Any]]:
+        """
+        Yields key-value pairs for keys found in (multi-document) yaml file, from the yaml parser events - so only
+        matched values are constructed
+
+        :param path: path of yaml file
+        :param keys: keys to search for
+        :return: key-value pairs
+        """
+
+        with io.TextIOWrapper(_open_config(path)) as stream:
+            loader = _ConfigLoader(stream)
+            loader.config_directory = _config_directory(path)
+            try:
+                yield from _search_events(_yaml_events(loader), keys)
+            finally:
+                loader.dispose()
+
+
+def _json_default(obj: Any) -> Any:
+    """
+    Returns json-serialisable representation of numpy and datetime objects, for both json encoders - datetimes are
+    written as ISO 8601 strings
+
+    :param obj: object to serialise
+    :return: serialisable object
+    """
+
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+
+    if isinstance(obj, np.generic):
+        return obj.item()
+
+    raise TypeError(
+        "Object of type " + type(obj).__name__ + " is not JSON serializable"
+    )
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """
+    Returns whether value contains any non-finite (i.e. NaN or infinite) floats, including within numpy arrays
 
-        if val is None:
-            return type(None)
+    :param obj: value
+    :return: non-finite flag
+    """
 
-        # Check bool
-        if (val.lower() == "true") or (val.lower() == "false"):
-            return bool
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
 
-        # Check int
-        is_int = True
-        try:
-            int(val)
-        except:
-            is_int = False
+    if isinstance(obj, Mapping):
+        return any(_has_non_finite(v) for v in obj.values())
 
-        if is_int:
-            return int
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
 
-        # Check float
-        is_float = True
-        try:
-            float(val)
-        except:
-            is_float = False
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f":
+            return not bool(np.isfinite(obj).all())
+        if obj.dtype.kind == "O":
+            return _has_non_finite(obj.tolist())
+        return False
 
-        if is_float:
-            return float
+    if isinstance(obj, np.generic):
+        return _has_non_finite(obj.item())
 
-        return str
+    return False
 
 
-class ConfigReader(BaseConfigReader):
+class JSONReader(BaseConfigReader):
     """
-    Default python config file reader
+    JSON file reader - uses `orjson <https://github.com/ijl/orjson>`_ if installed, otherwise the standard library
+    :py:mod:`json` module
     """
 
     def read(self, path: str) -> Dict:
         """
-        Returns information from configuration file
+        Returns information from json file
 
-        :param path: path of configuration file
+        :param path: path of json file
         :return: configuration values dictionary
         """
 
-        config_values: Dict = dict()
-
-        # Allows handling of relative paths to path
-        cwd = os.getcwd()
-        path = os.path.abspath(path)
-        config_directory = os.path.dirname(path)
-
-        os.chdir(config_directory)
-        config = configparser.RawConfigParser()
-        config.read(path)
+        with _open_config(path) as f:
+            data = f.read()
 
-        for section in config.sections():
-            config_values[section] = dict()
-            for key in config[section].keys():
-                config_values[section][key] = self._extract_config_value(
-                    config, section, key
-                )
+        if orjson is not None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # e.g. NaN/Infinity, which are accepted by the json module
+                pass
 
-        os.chdir(cwd)
-        return config_values
+        return json.loads(data)
 
-    @staticmethod
-    def _extract_config_value(
-        config: configparser.RawConfigParser,
-        section: str,
-        key: str,
-        dtype: Optional[type] = None,
-    ) -> Union[None, str, bool, int, float]:
+    def get_value_stream(self, path: str, keys: Set[Any]) -> Iterator[Tuple[Any, Any]]:
         """
-        Return value from config file
-
-        :param config: parsed config file
-        :param section: section to retrieve data from
-        :param key: key in section to retrieve data from
-        :param dtype: type of data to return
+        Yields key-value pairs for keys found in json file, scanning the file incrementally - so only matched values are
+        decoded
 
-        :return: config value
+        :param path: path of json file
+        :param keys: keys to search for
+        :return: key-value pairs
         """
 
-        val = config.get(section, key, fallback=None)
-
-        dtype = ConfigReader._infer_dtype(val) if dtype is None else dtype
-
-        if (val == "") or (val is None):
-            if dtype == bool:
-                return False
-            return None
-
-        if dtype == str:
-            if Path(val).exists():
-                val = os.path.abspath(val)
+        with io.TextIOWrapper(_open_config(path), encoding="utf-8-sig") as stream:
+            yield from _search_events(_json_events(stream, keys), keys)
 
-            return val
 
-        elif dtype == bool:
-            return config.getboolean(section, key)
+class TOMLReader(BaseConfigReader):
+    """
+    TOML file reader - uses :py:mod:`tomllib` (Python 3.11+) or, on older Pythons,
+    `tomli <https://github.com/hukkin/tomli>`_
+    """
 
-        elif dtype == int:
-            return config.getint(section, key)
+    def read(self, path: str) -> Dict:
+        """
+        Returns information from toml file
 
-        elif dtype == float:
-            return config.getfloat(section, key)
+        :param path: path of toml file
+        :return: configuration values dictionary
+        """
 
-        else:
-            return None
+        with _open_config(path) as f:
+            return _require(tomllib, "tomli").load(f)
 
 
-class YAMLReader(BaseConfigReader):
+class MsgpackReader(BaseConfigReader):
     """
-    YAML file reader
+    `MessagePack <https://msgpack.org>`_ file reader - requires `msgpack <https://github.com/msgpack/msgpack-python>`_
     """
 
     def read(self, path: str) -> Dict:
         """
-        Returns information from yaml file
+        Returns information from msgpack file
 
-        :param path: path of yaml file
+        :param path: path of msgpack file
         :return: configuration values dictionary
         """
 
-        with open(path, "r") as stream:
-            config_values = yaml.safe_load(stream)
-
-        return config_values
+        with _open_config(path) as f:
+            return _require(msgpack, "msgpack").unpackb(f.read(), raw=False)
 
 
 class BaseConfigWriter(ABC):
@@ -203,7 +1598,76 @@ class YAMLWriter(BaseConfigWriter):
         """
 
         with open(path, "w") as f:
-            yaml.dump(config_dict, f, default_flow_style=False)
+            yaml.dump(config_dict, f, Dumper=_YAMLDumper, default_flow_style=False)
+
+
+class JSONWriter(BaseConfigWriter):
+    """
+    JSON file writer - uses `orjson <https://github.com/ijl/orjson>`_ if installed, otherwise the standard library
+    :py:mod:`json` module
+    """
+
+    def write(self, path: str, config_dict: dict):
+        """
+        Writes information to json file
+
+        :param path: path of json file
+        :param config_dict: configuration values dictionary
+        """
+
+        data = None
+        if orjson is not None:
+            data = orjson.dumps(
+                config_dict,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+
+            # orjson writes NaN/Infinity as null, so these are left to the json module
+            if (b"null" in data) and _has_non_finite(config_dict):
+                data = None
+
+        if data is None:
+            data = json.dumps(config_dict, indent=2, default=_json_default).encode()
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+class TOMLWriter(BaseConfigWriter):
+    """
+    TOML file writer - requires `tomli-w <https://github.com/hukkin/tomli-w>`_
+    """
+
+    def write(self, path: str, config_dict: dict):
+        """
+        Writes information to toml file
+
+        :param path: path of toml file
+        :param config_dict: configuration values dictionary
+        """
+
+        with open(path, "wb") as f:
+            _require(tomli_w, "tomli-w").dump(config_dict, f)
+
+
+class MsgpackWriter(BaseConfigWriter):
+    """
+    `MessagePack <https://msgpack.org>`_ file writer - requires `msgpack <https://github.com/msgpack/msgpack-python>`_
+    """
+
+    def write(self, path: str, config_dict: dict):
+        """
+        Writes information to msgpack file
+
+        :param path: path of msgpack file
+        :param config_dict: configuration values dictionary
+        """
+
+        with open(path, "wb") as f:
+            f.write(_require(msgpack, "msgpack").packb(config_dict, use_bin_type=True))
 
 
 class ConfigIOFactory:
@@ -212,12 +1676,16 @@ class ConfigIOFactory:
 
     * default python (with file extensions `["config", "cfg", "conf"]`) - read only
     * yaml file (with file extensions `["yml", "yaml"]`)
+    * json file (with file extension `["json"]`)
+    * toml file (with file extension `["toml"]`) - if :py:mod:`tomllib` or `tomli` available, writing requires `tomli-w`
+    * msgpack file (with file extensions `["msgpack", "mpk"]`) - if `msgpack` installed
 
-    Can be extended to include more file formats in future
+    Further file formats may be added with
+    :py:func:`register_config_format <processor_tools.config_io.register_config_format>`.
     """
 
     # Configuration file readers by extension - maintain with new readers
-    READER_BY_EXT = {
+    READER_BY_EXT: Dict[str, BaseConfigReader] = {
         "config": ConfigReader(),
         "cfg": ConfigReader(),
         "conf": ConfigReader(),
@@ -225,7 +1693,10 @@ class ConfigIOFactory:
         "yaml": YAMLReader(),
     }
 
-    WRITER_BY_EXT = {"yml": YAMLWriter(), "yaml": YAMLWriter()}
+    WRITER_BY_EXT: Dict[str, BaseConfigWriter] = {
+        "yml": YAMLWriter(),
+        "yaml": YAMLWriter(),
+    }
 
     def get_reader(self, path: str) -> BaseConfigReader:
         """
@@ -269,16 +1740,145 @@ class ConfigIOFactory:
         return os.path.splitext(path)[1][1:]
 
 
-def read_config(path: str) -> dict:
+def register_config_format(
+    extensions: Union[str, Iterable[str]],
+    reader: Optional[BaseConfigReader] = None,
+    writer: Optional[BaseConfigWriter] = None,
+):
+    """
+    Registers reader and/or writer for configuration file extension(s), so files of this format are supported by
+    :py:func:`read_config <processor_tools.config_io.read_config>`,
+    :py:func:`write_config <processor_tools.config_io.write_config>`,
+    :py:func:`find_config <processor_tools.config_io.find_config>`,
+    :py:func:`build_configdir <processor_tools.config_io.build_configdir>` and
+    :py:class:`Context <processor_tools.context.Context>`.
+
+    Registering an already supported extension replaces its existing reader/writer.
+
+    :param extensions: file extension(s), e.g. `"json"` or `["yml", "yaml"]`
+    :param reader: config file reader instance
+    :param writer: config file writer instance
+    """
+
+    if isinstance(extensions, str):
+        extensions = [extensions]
+
+    for ext in extensions:
+        ext = ext.lstrip(".")
+
+        if reader is not None:
+            ConfigIOFactory.READER_BY_EXT[ext] = reader
+
+        if writer is not None:
+            ConfigIOFactory.WRITER_BY_EXT[ext] = writer
+
+
+register_config_format("json", JSONReader(), JSONWriter())
+
+if tomllib is not None:
+    register_config_format(
+        "toml", TOMLReader(), TOMLWriter() if tomli_w is not None else None
+    )
+
+if msgpack is not None:
+    register_config_format(["msgpack", "mpk"], MsgpackReader(), MsgpackWriter())
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _ConfigCache:
+    """
+    Thread-safe least-recently-used cache of read configuration values
+
+    :param maxsize: maximum number of entries
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+_CONFIG_CACHE = _ConfigCache()
+
+
+def _config_cache_key(
+    path: str, reader: BaseConfigReader, lazy: bool = False
+) -> Optional[Hashable]:
+    """
+    Returns cache key for config file, which changes if the file is modified - or None if the file cannot be stat'ed
+
+    :param path: configuration file path
+    :param reader: reader for file
+    :param lazy: whether file is read lazily
+    :return: cache key
+    """
+
+    archive_path = _split_archive_path(path)
+
+    try:
+        stat = os.stat(path if archive_path is None else archive_path[0])
+    except OSError:
+        return None
+
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size, reader, lazy
+
+
+def read_config(path: str, use_cache: bool = True, lazy: bool = False) -> dict:
     """
     Read configuration file, supported file types:
 
     * default python
     * yaml
+    * json
+    * toml (if :py:mod:`tomllib` or `tomli` available)
+    * msgpack (if `msgpack` installed)
 
     Ensures strings, floats and booleans are returned in the correct Python types.
 
+    Configuration files may also be read directly from within `.zip`/`.tar` archives, without extraction, by defining
+    the path as `"<archive path>::<member path>"` - e.g. `"bundle.zip::configs/config.yaml"`.
+
+    Read configuration values are cached in memory, keyed by file path, modification time and size - so repeat reads of
+    an unmodified file do not re-parse it. Each call returns a separate copy of the cached values, which may be freely
+    modified. See :py:func:`config_cache_info <processor_tools.config_io.config_cache_info>` and
+    :py:func:`clear_config_cache <processor_tools.config_io.clear_config_cache>`.
+
     :param path: configuration file path
+    :param use_cache: (default: True) option to use the configuration values cache
+    :param lazy: (default: False) option to read default python configuration files lazily by section, as
+        :py:class:`ConfigReader <processor_tools.config_io.ConfigReader>` with `lazy` set - other file types are read
+        as usual
     :return: configuration values dictionary
     """
 
@@ -286,7 +1886,124 @@ def read_config(path: str) -> dict:
     factory = ConfigIOFactory()
     reader = factory.get_reader(path)
 
-    return reader.read(path)
+    read: Callable[[str], Dict] = reader.read
+    if lazy and isinstance(reader, ConfigReader):
+        read = functools.partial(reader.read, lazy=True)
+
+    key = _config_cache_key(path, reader, lazy) if use_cache else None
+
+    if key is None:
+        return read(path)
+
+    config_values = _CONFIG_CACHE.get(key)
+    if config_values is _MISSING:
+        config_values = read(path)
+        _CONFIG_CACHE.put(key, config_values)
+
+    return copy_config_values(config_values)
+
+
+def clear_config_cache() -> None:
+    """
+    Clears cache of configuration values read by :py:func:`read_config <processor_tools.config_io.read_config>` (and of
+    indexes of archives read from), and resets its statistics
+    """
+
+    _CONFIG_CACHE.clear()
+
+    with _ARCHIVES_LOCK:
+        for _, _, archive in _ARCHIVES.values():
+            archive.close()
+        _ARCHIVES.clear()
+
+
+def config_cache_info() -> CacheInfo:
+    """
+    Returns statistics for cache of configuration values read by
+    :py:func:`read_config <processor_tools.config_io.read_config>`
+
+    :return: named tuple of `(hits, misses, maxsize, currsize)`
+    """
+
+    return _CONFIG_CACHE.info()
+
+
+def read_configs(
+    paths: List[str], max_workers: Optional[int] = None, lazy: bool = False
+) -> List[dict]:
+    """
+    Read set of configuration files concurrently, with a bounded pool of threads - which is faster than reading
+    sequentially where file access is I/O bound (e.g. on network filesystems). Supported file types as for
+    :py:func:`read_config <processor_tools.config_io.read_config>`.
+
+    :param paths: configuration file paths
+    :param max_workers: maximum number of threads to read with (default: as
+        :py:class:`concurrent.futures.ThreadPoolExecutor`)
+    :param lazy: (default: False) option to read default python configuration files lazily by section, as for
+        :py:func:`read_config <processor_tools.config_io.read_config>`
+    :return: configuration values dictionaries, in the same order as `paths`
+    """
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(functools.partial(read_config, lazy=lazy), paths))
+
+
+def read_config_stream(path: str) -> Iterator[Any]:
+    """
+    Lazily read documents from configuration file, to process large multi-document yaml streams with bounded memory -
+    for example:
+
+    .. code-block:: python
+
+       for document in read_config_stream("metadata.yaml"):
+           process(document)
+
+    Each document is parsed as it is consumed. Files of single document formats yield their configuration values
+    dictionary as the only document. Documents are not cached (see
+    :py:func:`read_config <processor_tools.config_io.read_config>`).
+
+    :param path: configuration file path
+    :return: configuration documents
+    """
+
+    # get correct reader
+    factory = ConfigIOFactory()
+    reader = factory.get_reader(path)
+
+    return reader.read_stream(path)
+
+
+def get_value_stream(
+    path: str, key: Union[Hashable, List[Hashable]]
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Lazily search configuration file for values of key/s, as
+    :py:func:`get_value_gen <processor_tools.utils.dict_tools.get_value_gen>` - but without reading the whole file into
+    memory, for example:
+
+    .. code-block:: python
+
+       for key, value in get_value_stream("metadata.json", ["SCENE_CENTER_TIME", "CLOUD_COVER"]):
+           process(key, value)
+
+    json and yaml files are parsed incrementally, so only the values of matched keys are built - memory use is bounded
+    by the size of the matched values, rather than the file. Key-value pairs are yielded in the order found in the file,
+    as each value is completed (matches within lists are yielded at the end of the list - as lists are only searched if
+    all of their items are dictionaries). All documents of multi-document yaml files are searched, though yaml merge
+    keys (``<<``) are not expanded. Other file formats are read in full, one document at a time.
+
+    :param path: configuration file path
+    :param key: key, or list of keys, to search for
+    :return: generator of key-value pairs
+    """
+
+    keys = set(key) if isinstance(key, list) else {key}
+
+    # get correct reader
+    factory = ConfigIOFactory()
+    reader = factory.get_reader(path)
+
+    return reader.get_value_stream(path, keys)
 
 
 def write_config(path: str, config_dict: dict):
@@ -294,6 +2011,9 @@ def write_config(path: str, config_dict: dict):
     Write configuration file, supported file types:
 
     * yaml
+    * json
+    * toml (if `tomli-w` installed)
+    * msgpack (if `msgpack` installed)
 
     :param path: configuration file path
     :param config_dict: configuration values dictionary
@@ -306,15 +2026,153 @@ def write_config(path: str, config_dict: dict):
     return writer.write(path, config_dict)
 
 
+# Linux ioctl to clone (reflink) file contents, on copy-on-write filesystems (e.g. btrfs, xfs)
+_FICLONE = 0x40049409
+
+
+def _file_sha256(path: str) -> str:
+    """
+    Returns sha256 hash of file content
+
+    :param path: file path
+    :return: hex digest
+    """
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+def _same_file_content(path1: str, path2: str) -> bool:
+    """
+    Returns whether files have the same content
+
+    :param path1: file path
+    :param path2: file path
+    :return: same content flag
+    """
+
+    if not os.path.isfile(path2):
+        return False
+
+    if os.path.samefile(path1, path2):
+        return True
+
+    if os.path.getsize(path1) != os.path.getsize(path2):
+        return False
+
+    return _file_sha256(path1) == _file_sha256(path2)
+
+
+def _link_file(src: str, dst: str, link_mode: str) -> None:
+    """
+    Creates file at `dst` with content of `src` - as a hardlink or reflink (copy-on-write clone) where requested and
+    supported by the filesystem, otherwise as a copy
+
+    :param src: source file path
+    :param dst: destination file path (must not exist)
+    :param link_mode: one of `"copy"`, `"reflink"` or `"hardlink"` (falls back to reflink, then copy)
+    """
+
+    if link_mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+
+    if (link_mode in ("hardlink", "reflink")) and (fcntl is not None):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass
+
+    shutil.copyfile(src, dst)
+
+
+def _build_config_file(
+    filepath: str, config_def: Union[str, dict], link_mode: str
+) -> bool:
+    """
+    Writes configuration file atomically, if its content is not already up to date
+
+    :param filepath: configuration file path
+    :param config_def: path of config file to copy, or configuration values dictionary
+    :param link_mode: method to create copied files, as for
+        :py:func:`build_configdir <processor_tools.config_io.build_configdir>`
+    :return: `True` if file written, `False` if already up to date
+    """
+
+    # copied files are compared before copying, to skip up to date files without any writes
+    src_path: Optional[str] = None
+    if isinstance(config_def, str) and (_split_archive_path(config_def) is None):
+        src_path = config_def
+
+    if (src_path is not None) and _same_file_content(src_path, filepath):
+        return False
+
+    # write to temporary file in the same directory, with the same extension (which defines the file format)
+    directory, filename = os.path.split(filepath)
+    tmp_path = os.path.join(directory, "." + uuid.uuid4().hex + "-" + filename)
+
+    try:
+        if src_path is not None:
+            _link_file(src_path, tmp_path, link_mode)
+
+        else:
+            if isinstance(config_def, str):
+                with _open_config(config_def) as src, open(tmp_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                write_config(tmp_path, config_def)
+
+            # compare hash of generated content with existing file
+            if os.path.isfile(filepath) and (
+                _file_sha256(tmp_path) == _file_sha256(filepath)
+            ):
+                os.remove(tmp_path)
+                return False
+
+        os.replace(tmp_path, filepath)
+
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return True
+
+
 def build_configdir(
-    path, configs: Dict[str, Union[str, dict]], exists_skip: bool = False
-):
+    path,
+    configs: Dict[str, Union[str, dict]],
+    exists_skip: bool = False,
+    incremental: bool = False,
+    max_workers: Optional[int] = None,
+    link_mode: str = "reflink",
+) -> List[str]:
     """
     Writes set of configuration files to defined directory
 
     :param path: configuration directory path (created if doesn't exist)
     :param configs: definition of configuration files as a dictionary, with an entry per configuration file to write - where the key should be the filename to write and the value should define the file content (see below for options of doing this).
     :param exists_skip: (default: False) option to bypass processing if path directory already exists
+    :param incremental: (default: False) option to only write files which are not up to date (see below)
+    :param max_workers: maximum number of threads to write files with, in incremental mode (default: as
+        :py:class:`concurrent.futures.ThreadPoolExecutor`)
+    :param link_mode: method to create copied files in incremental mode, one of:
+
+    * `"reflink"` (default) - copy-on-write clone, where supported by the filesystem (e.g. btrfs, xfs), otherwise copy
+    * `"hardlink"` - hardlink to source file, where possible (note, changes to either file then change both), otherwise
+      as `"reflink"`
+    * `"copy"` - byte copy
+
+    :return: paths of written configuration files
 
     Configs entry options:
 
@@ -330,28 +2188,82 @@ def build_configdir(
            "new_config.yaml": {"entry1": "value1"}
        }
 
+    In incremental mode, the content of each configuration file is compared (by sha256 hash) with any existing file,
+    which is only rewritten if it differs - so that rebuilding an existing directory only writes changed files. Files
+    are written in parallel, each atomically (i.e. written to a temporary file then moved into place), so that readers
+    never see partially written files.
     """
 
     # skip process if config directory exists and chosen to exists_skip
     if os.path.isdir(path) and exists_skip:
-        return
+        return []
 
     os.makedirs(path, exist_ok=True)
 
+    if incremental:
+        items = [
+            (os.path.join(path, filename), config_def)
+            for filename, config_def in configs.items()
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            written = list(
+                executor.map(
+                    lambda item: _build_config_file(item[0], item[1], link_mode),
+                    items,
+                )
+            )
+
+        return [filepath for (filepath, _), w in zip(items, written) if w]
+
+    filepaths = []
     for filename, config_def in configs.items():
         filepath = os.path.join(path, filename)
 
         if isinstance(config_def, str):
-            shutil.copyfile(config_def, filepath)
+            if _split_archive_path(config_def) is None:
+                shutil.copyfile(config_def, filepath)
+
+            else:
+                with _open_config(config_def) as src, open(filepath, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
 
         elif isinstance(config_def, dict):
             write_config(filepath, config_def)
 
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def copy_config_values(config_values: Any) -> Any:
+    """
+    Returns copy of configuration values - as :py:func:`copy.deepcopy`, except memory-mapped arrays (e.g. from `!npy`
+    references) and lazily read config file sections which, being read-only, are shared rather than duplicated in memory
+
+    :param config_values: configuration values
+    :return: copied configuration values
+    """
+
+    if isinstance(config_values, dict):
+        return {k: copy_config_values(v) for k, v in config_values.items()}
+
+    elif isinstance(config_values, list):
+        return [copy_config_values(v) for v in config_values]
+
+    elif isinstance(config_values, (np.memmap, LazyConfigSection)):
+        return config_values
+
+    return deepcopy(config_values)
+
 
 def find_config(path) -> List[str]:
     """
     Returns configuration files in directory (i.e. files that can be read by :py:class:`read_config <processor_tools.read_config>`).
 
+    The directory may be within a `.zip`/`.tar` archive, defined as `"<archive path>::<directory path>"` - e.g.
+    `"bundle.zip::configs/"` (or `"bundle.zip::"` for the archive root).
+
     :param path: directory containing configuration files
     """
 
@@ -359,6 +2271,22 @@ def find_config(path) -> List[str]:
 
     conf_fact = ConfigIOFactory()
 
+    archive_path = _split_archive_path(path)
+    if archive_path is not None:
+        archive_file, directory = archive_path
+        archive = _get_archive(archive_file)
+
+        for filename in archive.listdir(directory):
+            member = posixpath.join(directory, filename)
+            filename_ext = conf_fact._get_file_extension(filename)
+
+            if (filename_ext in conf_fact.READER_BY_EXT.keys()) and (
+                not archive.isdir(member)
+            ):
+                config_paths.append(archive_file + ARCHIVE_SEPARATOR + member)
+
+        return config_paths
+
     for filename in os.listdir(path):
         filename_ext = conf_fact._get_file_extension(filename)
 
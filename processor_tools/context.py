@@ -1,15 +1,128 @@
 """processor.context - customer container from processing state"""
 
+import copyreg
+import mmap
 import os.path
-from typing import Optional, Dict, Any, List, Union, Tuple
-from copy import deepcopy
-from pydantic.utils import deep_update
+import pickle
+import tempfile
+import threading
+import uuid
+import numpy as np
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Union, Tuple, Iterator
 from processor_tools import GLOBAL_SUPERCONTEXT
-from processor_tools import read_config, find_config
+from processor_tools import read_config, read_configs, read_config_stream, find_config
+from processor_tools.config_io import (
+    copy_config_values,
+    config_path_exists,
+    config_path_isdir,
+)
+from processor_tools.utils.dict_tools import select, Selector
 
 
 __author__ = "Sam Hunt <sam.hunt@npl.co.uk>"
-__all__ = ["Context", "set_global_supercontext", "clear_global_supercontext"]
+__all__ = [
+    "Context",
+    "ContextSection",
+    "ContextBroadcast",
+    "set_global_supercontext",
+    "clear_global_supercontext",
+]
+
+
+_MISSING = object()
+
+
+class _Replace(dict):
+    """
+    Dictionary of batched configuration values that replaces, rather than merges with, the committed value at its
+    location
+    """
+
+    pass
+
+
+def deep_update(mapping: Mapping, *updating_mappings: Mapping) -> dict:
+    """
+    Returns new dictionary of `mapping` deep updated with `updating_mappings` - nested dictionaries are merged, rather
+    than replaced, including read-only mappings (e.g.
+    :py:class:`LazyConfigSection <processor_tools.config_io.LazyConfigSection>`). These are kept as they are unless
+    merged, so lazily read sections are only parsed if another configuration updates them.
+
+    :param mapping: configuration values
+    :param updating_mappings: configuration values to update with
+    :return: updated configuration values
+    """
+
+    updated_mapping = dict(mapping)
+    for updating_mapping in updating_mappings:
+        for k, v in updating_mapping.items():
+            if (
+                k in updated_mapping
+                and isinstance(updated_mapping[k], Mapping)
+                and isinstance(v, Mapping)
+            ):
+                updated_mapping[k] = deep_update(updated_mapping[k], v)
+            else:
+                updated_mapping[k] = v
+
+    return updated_mapping
+
+
+def _merge_into(target: dict, source: Mapping) -> dict:
+    """
+    Deep updates batch buffer `target` in place with `source`.
+
+    Dictionaries from `source` are copied into `target`, so that all dictionaries in the buffer are owned by it and may
+    be safely updated in place. Where a dictionary overwrites a non-dictionary value set earlier in the batch it is
+    marked to replace the committed value, matching the result of applying the updates sequentially with
+    :py:func:`deep_update <processor_tools.context.deep_update>`.
+
+    :param target: batch buffer
+    :param source: configuration values to merge into buffer
+    :return: updated buffer
+    """
+
+    for k, v in source.items():
+        if isinstance(v, Mapping):
+            if k not in target:
+                # read-only mappings are kept as they are, unless merged with
+                target[k] = _merge_into({}, v) if isinstance(v, dict) else v
+            elif isinstance(target[k], dict):
+                _merge_into(target[k], v)
+            elif isinstance(target[k], Mapping):
+                target[k] = _merge_into(_merge_into({}, target[k]), v)
+            else:
+                target[k] = _merge_into(_Replace(), v)
+        else:
+            target[k] = v
+
+    return target
+
+
+def _apply_batch(config_values: Mapping, pending: Mapping) -> dict:
+    """
+    Returns new configuration values dictionary, with batch buffer applied
+
+    :param config_values: committed configuration values
+    :param pending: batch buffer (or read-only mapping within it)
+    :return: updated configuration values
+    """
+
+    config_values = dict(config_values)
+
+    for k, v in pending.items():
+        if (
+            isinstance(v, Mapping)
+            and (not isinstance(v, _Replace))
+            and isinstance(config_values.get(k), Mapping)
+        ):
+            config_values[k] = _apply_batch(config_values[k], v)
+        else:
+            config_values[k] = _apply_batch({}, v) if isinstance(v, dict) else v
+
+    return config_values
 
 
 class Context:
@@ -19,7 +132,8 @@ class Context:
     :param config: processing configuration data, either:
 
     * dictionary of configuration data
-    * path of configuration file or directory containing set of configuration files
+    * path of configuration file or directory containing set of configuration files - which may be within a
+      `.zip`/`.tar` archive, e.g. `"bundle.zip::configs/"`
     * list of dicts/paths (earlier in the list overwrites later in the list)
 
     :param supercontext: context supercontext or list of supercontexts (earlier in the list overwrites later in the list), configuration values of which override those defined in the context. Each defined as context object or tuple of:
@@ -33,6 +147,14 @@ class Context:
 
        supercontext = Context({"section": {"val1": 1 , "val2", 2}})
        (supercontext, "section")
+
+    A section view, from :py:meth:`section <processor_tools.context.Context.section>`, may also be used as a
+    supercontext.
+
+    Context objects are safe to share between threads. Writes (:py:meth:`set <processor_tools.context.Context.set>`,
+    :py:meth:`update <processor_tools.context.Context.update>` etc.) are serialised and build a new snapshot of the
+    configuration values, which is then swapped in atomically - so concurrent readers always see a consistent snapshot
+    and never need to lock. Values returned by the context should therefore be treated as read-only.
     """
 
     # default_config class variable enables you to set configuration file(s)/directory(ies) of files that are
@@ -40,6 +162,16 @@ class Context:
     # list than those defined at init.
     default_config: Optional[Union[str, List[str]]] = None
 
+    # configuration directories with more files than parallel_read_threshold are read concurrently, with up to
+    # max_read_workers threads (set parallel_read_threshold to None to always read sequentially). Values are merged in
+    # the same order either way.
+    parallel_read_threshold: Optional[int] = 8
+    max_read_workers: int = 8
+
+    # with lazy_config set, default python configuration files are read lazily by section (see
+    # processor_tools.config_io.ConfigReader) - so sections are only parsed if accessed, or merged with other values
+    lazy_config: bool = False
+
     def __init__(
         self,
         config: Optional[Union[str, List[str], dict]] = None,
@@ -50,6 +182,13 @@ class Context:
         self._config_values: Dict[str, Any] = {}
         self._supercontext: List[Tuple["Context", Union[None, str]]] = []
 
+        # writer lock - readers never lock, they take the current _config_values snapshot
+        self._lock = threading.RLock()
+
+        # buffer of uncommitted changes, when within batch()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._batch_depth: int = 0
+
         if supercontext is not None:
             self.supercontext = supercontext
 
@@ -83,21 +222,33 @@ class Context:
 
         configs = init_config + default_config
 
-        # open config paths
-        for config_i in reversed(configs):
-            if isinstance(config_i, str):
-                if os.path.isdir(config_i):
-                    for p in find_config(config_i):
-                        self.update_from_file(p, skip_if_not_exists=True)
+        # open config paths - batched, so merged in a single commit
+        with self.batch():
+            for config_i in reversed(configs):
+                if isinstance(config_i, str):
+                    if config_path_isdir(config_i):
+                        paths = find_config(config_i)
 
-                else:
-                    self.update_from_file(config_i, skip_if_not_exists=True)
+                        if (self.parallel_read_threshold is not None) and (
+                            len(paths) > self.parallel_read_threshold
+                        ):
+                            for config in read_configs(
+                                paths, self.max_read_workers, lazy=self.lazy_config
+                            ):
+                                self.update(config)
 
-            elif isinstance(config_i, dict):
-                self.update(config_i)
+                        else:
+                            for p in paths:
+                                self.update_from_file(p, skip_if_not_exists=True)
 
-            else:
-                raise TypeError("config definition must be of type [`str`, `dict`]")
+                    else:
+                        self.update_from_file(config_i, skip_if_not_exists=True)
+
+                elif isinstance(config_i, dict):
+                    self.update(config_i)
+
+                else:
+                    raise TypeError("config definition must be of type [`str`, `dict`]")
 
     @property
     def supercontext(self) -> List[Tuple["Context", Union[None, str]]]:
@@ -126,9 +277,14 @@ class Context:
            supercontext = Context({"section": {"val1": 1 , "val2", 2}})
            (supercontext, "section")
 
+        Alternatively, a section may be defined as a section view, e.g. `supercontext.section("section")`.
         """
 
-        if isinstance(supercontext, tuple) or isinstance(supercontext, self.__class__):
+        if (
+            isinstance(supercontext, tuple)
+            or isinstance(supercontext, self.__class__)
+            or isinstance(supercontext, ContextSection)
+        ):
             supercontext = [supercontext]
 
         if not isinstance(supercontext, list):
@@ -140,6 +296,9 @@ class Context:
             if isinstance(supercontext_i, self.__class__):
                 supercontext[i] = (supercontext_i, None)
 
+            elif isinstance(supercontext_i, ContextSection):
+                supercontext[i] = (supercontext_i.context, supercontext_i.path)
+
             elif isinstance(supercontext_i, tuple):
                 if not (
                     isinstance(supercontext_i[0], self.__class__)
@@ -175,9 +334,9 @@ class Context:
         :param skip_if_not_exists: skips running if file at path doesn't exist
         """
 
-        if os.path.exists(path):
-            config = read_config(path)
-            self._config_values = deep_update(self._config_values, config)
+        if config_path_exists(path):
+            config = read_config(path, lazy=self.lazy_config)
+            self.update(config)
 
         else:
             if skip_if_not_exists:
@@ -185,13 +344,93 @@ class Context:
             else:
                 raise ValueError("no such file: " + path)
 
+    def update_from_stream(self, path: str, skip_if_not_exists: bool = False) -> None:
+        """
+        Update config values from each document of (multi-document) config file in turn, later documents taking
+        precedence.
+
+        Documents are read lazily and merged as a single :py:meth:`batch <processor_tools.context.Context.batch>`, so
+        only one document is held in memory at a time and the update is applied atomically. Empty documents are skipped.
+
+        :param path: config file path
+        :param skip_if_not_exists: skips running if file at path doesn't exist
+        """
+
+        if not config_path_exists(path):
+            if skip_if_not_exists:
+                return
+            raise ValueError("no such file: " + path)
+
+        with self.batch():
+            for document in read_config_stream(path):
+                if document is None:
+                    continue
+
+                if not isinstance(document, dict):
+                    raise ValueError(
+                        "config document must be a dictionary, not "
+                        + type(document).__name__
+                        + ": "
+                        + path
+                    )
+
+                self.update(document)
+
     def update(self, config: dict) -> None:
         """
         Update config values
 
         :param config: dictionary of configuration data
         """
-        self._config_values = deep_update(self._config_values, config)
+
+        with self._lock:
+            if self._pending is not None:
+                _merge_into(self._pending, config)
+
+            else:
+                # deep_update returns a new dictionary, leaving the current snapshot untouched for readers
+                self._config_values = deep_update(self._config_values, config)
+
+    @contextmanager
+    def batch(self) -> Iterator["Context"]:
+        """
+        Context manager to apply a set of changes as a single transaction, for example:
+
+        .. code-block:: python
+
+           with context.batch():
+               for name, value in values.items():
+                   context.set(name, value)
+
+        Within the `with` block, calls to :py:meth:`set <processor_tools.context.Context.set>`,
+        :py:meth:`update <processor_tools.context.Context.update>` and
+        :py:meth:`update_from_file <processor_tools.context.Context.update_from_file>` are buffered and merged into the
+        configuration values once, on exiting the block - rather than each copying the accumulated configuration values.
+        If an exception is raised within the block the buffered changes are discarded.
+
+        Reads within the block return the last committed values, and writes from other threads wait until the batch is
+        committed. Nested batches join the outermost batch.
+
+        :return: this context
+        """
+
+        with self._lock:
+            self._batch_depth += 1
+            if self._batch_depth == 1:
+                self._pending = {}
+
+            try:
+                yield self
+
+                if (self._batch_depth == 1) and (self._pending is not None):
+                    self._config_values = _apply_batch(
+                        self._config_values, self._pending
+                    )
+
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._pending = None
 
     @property
     def config_values(self) -> Any:
@@ -201,32 +440,37 @@ class Context:
         :return: configuration values
         """
 
+        # take snapshots once, so concurrent writers cannot change state mid-merge
         config_values = self._config_values
+        supercontext = self.supercontext
+        global_supercontext = list(GLOBAL_SUPERCONTEXT)
 
-        if (self.supercontext is not None) or (GLOBAL_SUPERCONTEXT != []):
-            config_values = deepcopy(self._config_values)
+        if (supercontext is not None) or (global_supercontext != []):
+            config_values = copy_config_values(config_values)
 
-        if self.supercontext is not None:
-            config_values = self._update_with_supercontexts(
-                config_values, self.supercontext
-            )
+        if supercontext is not None:
+            config_values = self._update_with_supercontexts(config_values, supercontext)
 
-        if GLOBAL_SUPERCONTEXT != []:
+        if global_supercontext != []:
             config_values = self._update_with_supercontexts(
-                config_values, GLOBAL_SUPERCONTEXT
+                config_values, global_supercontext, include_global=False
             )
 
         return config_values
 
-    def _update_with_supercontexts(self, config_values, supercontexts):
+    def _update_with_supercontexts(
+        self, config_values, supercontexts, include_global: bool = True
+    ):
 
         for supercontext_tuple_i in reversed(supercontexts):
             supercontext_i = supercontext_tuple_i[0]
             section_i = supercontext_tuple_i[1]
 
-            # get value from supercontext if available
+            # get value from supercontext if available - only materialising the section
             if section_i is not None:
-                supercontext_values_i = supercontext_i.get(section_i, None)
+                supercontext_values_i = supercontext_i._section_view(
+                    section_i, include_global
+                ).to_dict()
 
             else:
                 supercontext_values_i = supercontext_i._config_values
@@ -236,11 +480,93 @@ class Context:
 
             if supercontext_i.supercontext is not None:
                 config_values = self._update_with_supercontexts(
-                    config_values, supercontext_i.supercontext
+                    config_values, supercontext_i.supercontext, include_global
                 )
 
         return config_values
 
+    def _layers(self, include_global: bool = True) -> List[Mapping]:
+        """
+        Returns sources of configuration values, in order of precedence (highest first) - i.e. those that
+        :py:attr:`config_values <processor_tools.context.Context.config_values>` merges
+
+        :param include_global: include global supercontexts - excluded when resolving a global supercontext itself, as
+            it cannot be its own supercontext
+        :return: configuration value sources
+        """
+
+        layers: List[Mapping] = [self._config_values]
+
+        supercontext = self.supercontext
+        global_supercontext = list(GLOBAL_SUPERCONTEXT) if include_global else []
+
+        if supercontext is not None:
+            self._append_supercontext_layers(layers, supercontext, include_global)
+
+        if global_supercontext != []:
+            self._append_supercontext_layers(layers, global_supercontext, False)
+
+        return layers[::-1]
+
+    def _append_supercontext_layers(self, layers, supercontexts, include_global):
+        for supercontext_i, section_i in reversed(supercontexts):
+            if section_i is not None:
+                layers.append(supercontext_i._section_view(section_i, include_global))
+
+            else:
+                layers.append(supercontext_i._config_values)
+
+            if supercontext_i.supercontext is not None:
+                self._append_supercontext_layers(
+                    layers, supercontext_i.supercontext, include_global
+                )
+
+    def _section_view(
+        self, section: Union[str, Tuple[str, ...]], include_global: bool = True
+    ) -> "ContextSection":
+        """
+        Returns view of section, defined by name or path of names
+
+        :param section: section name or path
+        :param include_global: include global supercontexts when resolving values
+        :return: section view
+        """
+
+        path = (section,) if isinstance(section, str) else tuple(section)
+        return ContextSection(self, path, include_global)
+
+    def section(self, name: str) -> "ContextSection":
+        """
+        Returns read-only live view of a section of the configuration values.
+
+        Unlike indexing the context, no configuration values are merged or copied - values are resolved against the
+        context (and its supercontexts) as they are accessed, so always reflect its current state.
+
+        :param name: section name
+        :return: section view
+        """
+
+        return self._section_view(name)
+
+    def select(
+        self, selector: Union[str, Selector], with_paths: bool = False
+    ) -> Iterator[Any]:
+        """
+        Returns generator of configuration values selected by path query, e.g.
+        ``context.select("PRODUCT_METADATA.*.SCENE_CENTER_TIME")`` - see
+        :py:class:`Selector <processor_tools.utils.dict_tools.Selector>` for the query syntax.
+
+        Values are resolved lazily from a live view of the context, as
+        :py:meth:`section <processor_tools.context.Context.section>` - sections are returned as section views.
+
+        :param selector: selector definition or compiled selector
+        :param with_paths: option to yield (path, value) tuples, where path is a tuple of the keys/list indices of the
+            value
+        :return: generator of selected values
+        """
+
+        return select(self, selector, with_paths)
+
     def set(self, name: str, value: Any):
         """
         Sets config data
@@ -249,7 +575,19 @@ class Context:
         :param value: config data value
         """
 
-        self._config_values[name] = value
+        with self._lock:
+            if self._pending is not None:
+                self._pending[name] = (
+                    _merge_into(_Replace(), value)
+                    if isinstance(value, Mapping)
+                    else value
+                )
+
+            else:
+                # copy-on-write, so readers iterating the current snapshot are unaffected
+                config_values = dict(self._config_values)
+                config_values[name] = value
+                self._config_values = config_values
 
     def __setitem__(self, name: str, value: Any):
         """
@@ -269,7 +607,8 @@ class Context:
         :return: config value if defined, else return default
         """
 
-        return self.config_values[name] if name in self.get_config_names() else default
+        config_values = self.config_values
+        return config_values[name] if name in config_values else default
 
     def __getitem__(self, name: str) -> Any:
         """
@@ -299,6 +638,130 @@ class Context:
 
         return self.get_config_names()
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Returns object state for pickling, omitting the (unpicklable) writer lock
+
+        :return: object state
+        """
+
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restores object state from pickle, recreating the writer lock
+
+        :param state: object state
+        """
+
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+
+class ContextSection(Mapping):
+    """
+    Read-only live view of a section of a context's configuration values, as returned by
+    :py:meth:`Context.section <processor_tools.context.Context.section>`.
+
+    Values are resolved lazily against the context and its supercontexts as they are accessed, following the same
+    precedence as :py:attr:`Context.config_values <processor_tools.context.Context.config_values>`. Subsections are
+    returned as further views.
+
+    :param context: context to view
+    :param path: path of section names from the top level of the context configuration values
+    :param include_global: include global supercontexts when resolving values
+    """
+
+    def __init__(
+        self, context: Context, path: Tuple[str, ...], include_global: bool = True
+    ):
+        self.context = context
+        self.path = path
+        self._include_global = include_global
+
+    def _sources(self) -> List[Mapping]:
+        """
+        Returns sources of values for the section, in order of precedence (highest first)
+
+        :return: section value sources
+        """
+
+        sources = []
+        for layer in self.context._layers(self._include_global):
+            node: Any = layer
+            for name in self.path:
+                if not (isinstance(node, Mapping) and (name in node)):
+                    node = _MISSING
+                    break
+                node = node[name]
+
+            if node is _MISSING:
+                continue
+
+            # a non-mapping value overrides values from lower precedence sources
+            if not isinstance(node, Mapping):
+                break
+
+            sources.append(node)
+
+        return sources
+
+    def __getitem__(self, name: str) -> Any:
+        for source in self._sources():
+            if name in source:
+                value = source[name]
+                if isinstance(value, Mapping):
+                    return ContextSection(
+                        self.context, self.path + (name,), self._include_global
+                    )
+                return value
+
+        raise KeyError(name)
+
+    def __contains__(self, name: Any) -> bool:
+        return any(name in source for source in self._sources())
+
+    def __iter__(self) -> Iterator[str]:
+        # order of keys as merged, from lowest precedence source
+        names: Dict[str, None] = {}
+        for source in reversed(self._sources()):
+            names.update(dict.fromkeys(source))
+
+        return iter(names)
+
+    def __len__(self) -> int:
+        return sum(1 for name in self)
+
+    def __repr__(self) -> str:
+        return "<ContextSection: {}>".format(".".join(self.path))
+
+    def section(self, name: str) -> "ContextSection":
+        """
+        Returns read-only live view of a subsection
+
+        :param name: subsection name
+        :return: subsection view
+        """
+
+        return ContextSection(self.context, self.path + (name,), self._include_global)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns merged values of the section as a dictionary
+
+        :return: section configuration values
+        """
+
+        config_values = {}
+        for name, value in self.items():
+            if isinstance(value, ContextSection):
+                value = value.to_dict()
+            config_values[name] = value
+
+        return config_values
+
 
 class set_global_supercontext:
     """
@@ -337,6 +800,9 @@ class set_global_supercontext:
         if isinstance(supercontext, Context):
             supercontext = (supercontext, None)
 
+        elif isinstance(supercontext, ContextSection):
+            supercontext = (supercontext.context, supercontext.path)
+
         elif isinstance(supercontext, tuple):
             if not (
                 isinstance(supercontext[0], Context)
@@ -369,5 +835,136 @@ def clear_global_supercontext():
     GLOBAL_SUPERCONTEXT.clear()
 
 
+# contexts loaded from broadcasts, by process id and broadcast id - keyed by process so forked workers,
+# which inherit this dictionary, load the broadcast file rather than reuse their parent's contexts
+_BROADCAST_CONTEXTS: Dict[Tuple[int, str], "Context"] = {}
+_BROADCAST_LOCK = threading.Lock()
+
+
+def _load_memmap(filename, dtype, shape, order, offset) -> np.memmap:
+    return np.memmap(
+        filename, dtype=dtype, mode="r", shape=shape, order=order, offset=offset
+    )
+
+
+def _reduce_memmap(array: np.memmap):
+    # read-only memory-mapped arrays (e.g. from `!npy` references) are pickled by reference to their file
+    if (array.mode == "r") and isinstance(array.base, mmap.mmap):
+        order = (
+            "F" if array.flags.f_contiguous and not array.flags.c_contiguous else "C"
+        )
+        return _load_memmap, (
+            array.filename,
+            array.dtype,
+            array.shape,
+            order,
+            array.offset,
+        )
+
+    return array.__reduce__()
+
+
+class ContextBroadcast:
+    """
+    Broadcasts a context to the worker processes of a process pool, such that it is only serialised once per pool and
+    deserialised once per worker - rather than pickled with every task.
+
+    The context is serialised to a temporary file, together with the current global supercontexts (see
+    :py:class:`set_global_supercontext <processor_tools.context.set_global_supercontext>`). The broadcast object itself
+    only refers to the file by id, so is cheap to pass to tasks, which retrieve the context with
+    :py:meth:`get <processor_tools.context.ContextBroadcast.get>`. On first retrieval in each process (including the
+    broadcasting process) the context is loaded from the file and the global supercontexts are reproduced, replacing any
+    already set in that process - so tasks see the context as it was when broadcast, whether the pool starts workers by
+    `fork` or `spawn`. Memory-mapped arrays in the configuration values are shared by reference to their file, rather
+    than copied.
+
+    For example:
+
+    .. code-block:: python
+
+       from multiprocessing import Pool
+       from processor_tools import ContextBroadcast
+
+       def task(broadcast, x):
+           context = broadcast.get()
+           ...
+
+       with ContextBroadcast(context) as broadcast:
+           with Pool(initializer=broadcast.initializer) as pool:
+               pool.starmap(task, [(broadcast, x) for x in inputs])
+
+    The broadcast file is deleted on exiting the `with` block (or on
+    :py:meth:`close <processor_tools.context.ContextBroadcast.close>`), so should outlive the pool.
+
+    :param context: context to broadcast
+    :param directory: directory to write broadcast file to (must be accessible to workers), defaults to system temporary
+        directory
+    """
+
+    def __init__(self, context: Context, directory: Optional[str] = None):
+        self.id: str = uuid.uuid4().hex
+
+        fd, self.path = tempfile.mkstemp(
+            prefix="processor_tools_context_", suffix=".pkl", dir=directory
+        )
+
+        with os.fdopen(fd, "wb") as f:
+            pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickler.dispatch_table = copyreg.dispatch_table.copy()
+            pickler.dispatch_table[np.memmap] = _reduce_memmap
+            pickler.dump((context, list(GLOBAL_SUPERCONTEXT)))
+
+    def get(self) -> Context:
+        """
+        Returns broadcast context, loading it from the broadcast file if not yet loaded in this process.
+
+        On loading, the global supercontexts are set to those active when the context was broadcast - replacing, rather
+        than adding to, any global supercontexts already set in this process.
+
+        :return: broadcast context
+        """
+
+        pid = os.getpid()
+
+        with _BROADCAST_LOCK:
+            context = _BROADCAST_CONTEXTS.get((pid, self.id))
+            if context is None:
+                with open(self.path, "rb") as f:
+                    context, global_supercontext = pickle.load(f)
+
+                # release contexts inherited from a forking parent process
+                for key in [key for key in _BROADCAST_CONTEXTS if key[0] != pid]:
+                    del _BROADCAST_CONTEXTS[key]
+
+                GLOBAL_SUPERCONTEXT[:] = global_supercontext
+                _BROADCAST_CONTEXTS[(pid, self.id)] = context
+
+            return context
+
+    def initializer(self) -> None:
+        """
+        Loads broadcast context - for use as process pool `initializer`, so each worker loads the context as it starts
+        """
+
+        self.get()
+
+    def close(self) -> None:
+        """
+        Removes broadcast file
+        """
+
+        with _BROADCAST_LOCK:
+            _BROADCAST_CONTEXTS.pop((os.getpid(), self.id), None)
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> "ContextBroadcast":
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
 if __name__ == "__main__":
     pass
@@ -158,17 +158,21 @@ class CustomCmdClassUtils:
         return CustomCmdClass
 
 
-def build_configdir_cmdclass(package_name, configs):
+def build_configdir_cmdclass(package_name, configs, incremental: bool = False):
     """
     Build a cmdclass argument for `setuptools.setup` that initialises a directory of configuration files after package installation.
 
     * For the standard `"install"` mode the configuration directory is located at `~/.<packagename>`
     * For "develop" mode (i.e. editable mode with `-e` flag) mode the configuration directory is located at `<package_project_directory>/.<packagename>`
 
-    Skips running if directory already exists (for example if package has previously been installed).
+    Skips running if directory already exists (for example if package has previously been installed) - unless
+    `incremental` is set, in which case the directory is updated on reinstall, only rewriting configuration files that
+    have changed.
 
     :param package_name: package name
     :param configs: as defined for :py:func:`build_configdir <processor_tools.config_io.build_configdir>`
+    :param incremental: (default: False) option to incrementally update existing configuration directory, see
+        :py:func:`build_configdir <processor_tools.config_io.build_configdir>`
     :return: cmdclass argument for `setuptools.setup` that initialises configuration directory post-install
     """
 
@@ -180,7 +184,11 @@ def build_configdir_cmdclass(package_name, configs):
     configdir_cmdclass = cmdutil.build_cmdclass(
         postinstall=build_configdir,
         post_args=[install_path],
-        post_kwargs={"configs": configs, "exists_skip": True},
+        post_kwargs=(
+            {"configs": configs, "incremental": True}
+            if incremental
+            else {"configs": configs, "exists_skip": True}
+        ),
     )
 
     # customise the function arguments in "develop" so it can dynamically identify the package directory to write to
@@ -4,19 +4,45 @@ import unittest
 import random
 import string
 import shutil
-from unittest.mock import patch
+from unittest.mock import call, patch
 import os
+import pickle
+import json
+import datetime
+import tarfile
+import zipfile
+import yaml
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import configparser
 from configparser import RawConfigParser
+import processor_tools.config_io as config_io
+from processor_tools.utils.dict_tools import get_value_gen
 from processor_tools.config_io import (
     BaseConfigReader,
     ConfigReader,
+    LazyConfigSection,
     YAMLReader,
     YAMLWriter,
+    JSONReader,
+    JSONWriter,
+    TOMLReader,
+    MsgpackReader,
+    MsgpackWriter,
     ConfigIOFactory,
     read_config,
+    read_configs,
     write_config,
     build_configdir,
     find_config,
+    read_config_stream,
+    get_value_stream,
+    register_config_format,
+    config_path_exists,
+    config_path_isdir,
+    copy_config_values,
+    clear_config_cache,
+    config_cache_info,
 )
 
 
@@ -59,6 +85,79 @@ class TestBaseConfigReader(unittest.TestCase):
         self.assertEqual(dtype, bool)
 
 
+def _infer_dtype_reference(val):
+    # reference implementation, for comparison with regex-based classification
+    if val is None:
+        return type(None)
+    if val.lower() in ("true", "false"):
+        return bool
+    for dtype in (int, float):
+        try:
+            dtype(val)
+            return dtype
+        except ValueError:
+            pass
+    return str
+
+
+class TestInferDtype(unittest.TestCase):
+    def test__infer_dtype_reference(self):
+        vals = [
+            "",
+            "1",
+            "-1",
+            "+1",
+            "1_000",
+            "1__0",
+            "_1",
+            "1.",
+            ".5",
+            "1.5e3",
+            "1E-3",
+            "1.e3",
+            ".e3",
+            "1e",
+            "e3",
+            "inf",
+            "-Infinity",
+            "nan",
+            "NaN",
+            "infin",
+            "TRUE",
+            "false ",
+            "1 2",
+            " 7 ",
+            "0x10",
+            "1.5.1",
+            "1,5",
+            "value",
+            "\u0663",
+        ]
+        alphabet = "0123456789+-._eEinfatrul \t"
+        vals += [
+            "".join(random.choices(alphabet, k=random.randint(1, 6)))
+            for _ in range(5000)
+        ]
+
+        for val in vals:
+            self.assertEqual(
+                BaseConfigReader._infer_dtype(val), _infer_dtype_reference(val), val
+            )
+
+    def test__convert_value(self):
+        for val, exp_val in [
+            ("", None),
+            ("True", True),
+            ("false", False),
+            ("3", 3),
+            ("-2.5e1", -25.0),
+            ("value", "value"),
+        ]:
+            val = ConfigReader._convert_value(val)
+            self.assertEqual(val, exp_val)
+            self.assertEqual(type(val), type(exp_val))
+
+
 class TestConfigReader(unittest.TestCase):
     def setUp(self) -> None:
         self.config = RawConfigParser()
@@ -138,6 +237,192 @@ class TestConfigReader(unittest.TestCase):
 
         os.remove(fname)
 
+    def test_read_relative_path(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        open(os.path.join(tmp_dir, "data.txt"), "w").close()
+
+        fname = os.path.join(tmp_dir, "file.config")
+        create_config_file(fname, {"path": "data.txt", "missing": "missing.txt"})
+
+        cwd = os.getcwd()
+        config = ConfigReader().read(fname)
+
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(
+            config["Default"]["path"],
+            os.path.abspath(os.path.join(tmp_dir, "data.txt")),
+        )
+        self.assertEqual(config["Default"]["missing"], "missing.txt")
+
+        shutil.rmtree(tmp_dir)
+
+    def test_read_relative_path_no_extension(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(os.path.join(tmp_dir, "data"))
+        open(os.path.join(tmp_dir, "README"), "w").close()
+
+        fname = os.path.join(tmp_dir, "file.config")
+        create_config_file(
+            fname, {"output_dir": "data", "calib": "README", "name": "value"}
+        )
+
+        config = ConfigReader().read(fname)
+
+        self.assertEqual(
+            config["Default"],
+            {
+                "output_dir": os.path.abspath(os.path.join(tmp_dir, "data")),
+                "calib": os.path.abspath(os.path.join(tmp_dir, "README")),
+                "name": "value",
+            },
+        )
+
+        shutil.rmtree(tmp_dir)
+
+    def test_read_path_keys(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        open(os.path.join(tmp_dir, "data.txt"), "w").close()
+
+        fname = os.path.join(tmp_dir, "file.config")
+        create_config_file(
+            fname, {"path": "data.txt", "Output_Path": "out.txt", "name": "data.txt"}
+        )
+
+        with patch("processor_tools.config_io.os.path.exists") as mock_exists:
+            config = ConfigReader(path_keys=["path", "output_path"]).read(fname)
+
+        mock_exists.assert_not_called()
+        self.assertEqual(
+            config["Default"],
+            {
+                "path": os.path.abspath(os.path.join(tmp_dir, "data.txt")),
+                "output_path": os.path.abspath(os.path.join(tmp_dir, "out.txt")),
+                "name": "data.txt",
+            },
+        )
+
+        shutil.rmtree(tmp_dir)
+
+    def test_read_lazy(self):
+        fname = "file4.config"
+        with open(fname, "w") as f:
+            f.write(
+                "; comment\n[DEFAULT]\nshared = 1\n\n"
+                "[a]\nx = 1\ny = multi\n  [line]\n"
+                "[b] ; comment\nz = true\n"
+            )
+
+        config = ConfigReader(lazy=True).read(fname)
+
+        self.assertEqual(list(config), ["a", "b"])
+        self.assertIsInstance(config["a"], LazyConfigSection)
+        self.assertFalse(config["a"].is_parsed)
+
+        self.assertEqual(config["a"]["x"], 1)
+        self.assertTrue(config["a"].is_parsed)
+        self.assertFalse(config["b"].is_parsed)
+
+        self.assertEqual(config, ConfigReader().read(fname))
+
+        # pickle, unparsed and parsed
+        config = ConfigReader(lazy=True).read(fname)
+        config["a"]["x"]
+        self.assertEqual(pickle.loads(pickle.dumps(config)), config)
+
+        os.remove(fname)
+
+    def test_read_config_lazy(self):
+        fname = "file6.config"
+        with open(fname, "w") as f:
+            f.write("[a]\nx = 1\n[b]\ny = 2\n")
+
+        config = read_config(fname, lazy=True)
+        self.assertIsInstance(config["a"], LazyConfigSection)
+        self.assertFalse(config["b"].is_parsed)
+
+        # lazy and eager reads are cached separately
+        self.assertIsInstance(read_config(fname)["a"], dict)
+        self.assertIsInstance(
+            read_configs([fname], lazy=True)[0]["a"], LazyConfigSection
+        )
+        self.assertEqual(read_config(fname, lazy=True), read_config(fname))
+
+        clear_config_cache()
+        os.remove(fname)
+
+    def test_read_lazy_errors(self):
+        fname = "file5.config"
+        with open(fname, "w") as f:
+            f.write("[a]\nx = 1\n[a]\nx = 2\n")
+
+        self.assertRaises(
+            configparser.DuplicateSectionError, ConfigReader(lazy=True).read, fname
+        )
+
+        with open(fname, "w") as f:
+            f.write("x = 1\n[a]\nx = 2\n")
+
+        self.assertRaises(
+            configparser.MissingSectionHeaderError,
+            ConfigReader(lazy=True).read,
+            fname,
+        )
+
+        os.remove(fname)
+
+        self.assertEqual(ConfigReader(lazy=True).read(fname), {})
+
+    def test_read_path_detection(self):
+        fname = "file3.config"
+        create_config_file(fname, {"name": "value", "n": "1", "path": "dir/data.txt"})
+
+        with patch("processor_tools.config_io.os.path.exists") as mock_exists:
+            mock_exists.return_value = False
+            config = ConfigReader().read(fname)
+
+        # only string values are checked against the filesystem
+        mock_exists.assert_has_calls(
+            [
+                call(os.path.join(os.path.abspath("."), "value")),
+                call(os.path.join(os.path.abspath("."), "dir/data.txt")),
+            ]
+        )
+        self.assertEqual(mock_exists.call_count, 2)
+        self.assertEqual(
+            config["Default"], {"name": "value", "n": 1, "path": "dir/data.txt"}
+        )
+
+        os.remove(fname)
+
+    def test_read_concurrent(self):
+        tmp_dirs = []
+        for i in range(8):
+            tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+            os.makedirs(tmp_dir)
+            open(os.path.join(tmp_dir, "data" + str(i) + ".txt"), "w").close()
+            create_config_file(
+                os.path.join(tmp_dir, "file.config"), {"path": "data" + str(i) + ".txt"}
+            )
+            tmp_dirs.append(tmp_dir)
+
+        reader = ConfigReader()
+        paths = [os.path.join(tmp_dirs[i % 8], "file.config") for i in range(64)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            configs = list(executor.map(reader.read, paths))
+
+        for i, config in enumerate(configs):
+            self.assertEqual(
+                config["Default"]["path"],
+                os.path.abspath(
+                    os.path.join(tmp_dirs[i % 8], "data" + str(i % 8) + ".txt")
+                ),
+            )
+
+        for tmp_dir in tmp_dirs:
+            shutil.rmtree(tmp_dir)
+
 
 class TestYAMLReaderFactory(unittest.TestCase):
     def setUp(self) -> None:
@@ -160,9 +445,200 @@ class TestYAMLReaderFactory(unittest.TestCase):
         self.assertEqual(type(config), dict)
         self.assertDictEqual(config, self.exp_config)
 
+    def test_read_stream(self):
+        yml_path = os.path.join(self.tmp_dir, "multi.yaml")
+        with open(yml_path, "w") as f:
+            f.write("a: 1\n---\nb: [1, 2]\n---\n---\nc: !npy gains.npy\n")
+        np.save(os.path.join(self.tmp_dir, "gains.npy"), np.arange(3))
+
+        stream = YAMLReader().read_stream(yml_path)
+
+        self.assertEqual(next(stream), {"a": 1})
+        self.assertEqual(list(stream)[:2], [{"b": [1, 2]}, None])
+
+        documents = list(YAMLReader().read_stream(yml_path))
+        self.assertEqual(len(documents), 4)
+        np.testing.assert_array_equal(documents[3]["c"], np.arange(3))
+
+    def test_read_stream_single(self):
+        reader = ConfigReader()
+        cfg_path = os.path.join(self.tmp_dir, "test.cfg")
+        create_config_file(cfg_path)
+
+        self.assertEqual(list(reader.read_stream(cfg_path)), [reader.read(cfg_path)])
+
+    def test_read_npy(self):
+        np.save(os.path.join(self.tmp_dir, "gains.npy"), np.arange(6.0).reshape(2, 3))
+
+        yml_path = os.path.join(self.tmp_dir, "npy.yaml")
+        with open(yml_path, "w") as f:
+            f.write("calibration:\n   gains: !npy gains.npy")
+
+        config = YAMLReader().read(yml_path)
+
+        gains = config["calibration"]["gains"]
+        self.assertIsInstance(gains, np.memmap)
+        self.assertFalse(gains.flags.writeable)
+        np.testing.assert_array_equal(gains, np.arange(6.0).reshape(2, 3))
+
+    def test_read_npz(self):
+        np.savez(
+            os.path.join(self.tmp_dir, "tables.npz"),
+            a=np.arange(5),
+            b=np.asfortranarray(np.ones((3, 2), dtype=np.float32)),
+        )
+        np.savez_compressed(
+            os.path.join(self.tmp_dir, "compressed.npz"), c=np.arange(3)
+        )
+
+        yml_path = os.path.join(self.tmp_dir, "npz.yaml")
+        with open(yml_path, "w") as f:
+            f.write("tables: !npz tables.npz\ncompressed: !npz compressed.npz")
+
+        config = YAMLReader().read(yml_path)
+
+        self.assertIsInstance(config["tables"]["a"], np.memmap)
+        self.assertIsInstance(config["tables"]["b"], np.memmap)
+        np.testing.assert_array_equal(config["tables"]["a"], np.arange(5))
+        np.testing.assert_array_equal(config["tables"]["b"], np.ones((3, 2)))
+        np.testing.assert_array_equal(config["compressed"]["c"], np.arange(3))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+class TestYAMLLibyaml(unittest.TestCase):
+    def test_read_write_equivalent(self):
+        config_dict = {
+            "section": {"int": 1, "float": 1.5, "bool": True, "none": None},
+            "list": [1.0, "two", [3]],
+            "str": "multi word: string",
+            "unicode": "\u00b5m",
+        }
+
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "config.yaml")
+
+        YAMLWriter().write(path, config_dict)
+
+        with open(path, "r") as f:
+            text = f.read()
+
+        self.assertEqual(
+            text, yaml.dump(config_dict, Dumper=yaml.Dumper, default_flow_style=False)
+        )
+        self.assertEqual(YAMLReader().read(path), config_dict)
+        self.assertEqual(yaml.load(text, Loader=yaml.SafeLoader), config_dict)
+
+        shutil.rmtree(tmp_dir)
+
+
+class TestJSONReaderWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, "config.json")
+
     def tearDown(self):
         shutil.rmtree(self.tmp_dir)
 
+    def test_write_read(self):
+        config_dict = {"section": {"int": 1, "float": 1.5, "bool": True, "none": None}}
+
+        JSONWriter().write(self.path, config_dict)
+
+        self.assertEqual(JSONReader().read(self.path), config_dict)
+
+    @unittest.skipIf(config_io.orjson is None, "orjson not available")
+    def test_write_orjson_stdlib_equivalent(self):
+        npy_path = os.path.join(self.tmp_dir, "array.npy")
+        np.save(npy_path, np.arange(4.0))
+
+        config_dict = {
+            1: "int key",
+            "nan": float("nan"),
+            "inf": [float("-inf")],
+            "memmap": np.load(npy_path, mmap_mode="r"),
+            "transposed": np.arange(6).reshape(2, 3).T,
+            "big_endian": np.arange(3, dtype=">i4"),
+            "float32": np.float32(1.5),
+            "datetime": datetime.datetime(2020, 1, 1, 12, 30, 0, 500),
+            "datetime_tz": datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+            "date": datetime.date(2020, 1, 1),
+            "time": datetime.time(12, 30),
+            "datetime64": np.datetime64("2020-01-01T12:30:00.000500"),
+        }
+
+        JSONWriter().write(self.path, config_dict)
+        orjson_values = JSONReader().read(self.path)
+
+        with patch("processor_tools.config_io.orjson", None):
+            JSONWriter().write(self.path, config_dict)
+            stdlib_values = json.loads(open(self.path).read())
+
+        np.testing.assert_equal(orjson_values, stdlib_values)
+        np.testing.assert_equal(
+            stdlib_values,
+            {
+                "1": "int key",
+                "nan": float("nan"),
+                "inf": [float("-inf")],
+                "memmap": [0.0, 1.0, 2.0, 3.0],
+                "transposed": [[0, 3], [1, 4], [2, 5]],
+                "big_endian": [0, 1, 2],
+                "float32": 1.5,
+                "datetime": "2020-01-01T12:30:00.000500",
+                "datetime_tz": "2020-01-01T00:00:00+00:00",
+                "date": "2020-01-01",
+                "time": "12:30:00",
+                "datetime64": "2020-01-01T12:30:00.000500",
+            },
+        )
+
+    def test_write_read_stdlib(self):
+        config_dict = {"array": np.array([1, 2, 3]), "float": np.float64(1.5)}
+
+        with patch("processor_tools.config_io.orjson", None):
+            JSONWriter().write(self.path, config_dict)
+            config = JSONReader().read(self.path)
+
+        self.assertEqual(config, {"array": [1, 2, 3], "float": 1.5})
+
+
+@unittest.skipIf(config_io.tomllib is None, "tomllib/tomli not available")
+class TestTOMLReader(unittest.TestCase):
+    def test_read(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "config.toml")
+
+        with open(path, "w") as f:
+            f.write('[section]\nint = 1\nfloat = 1.5\nbool = true\nstr = "value"\n')
+
+        self.assertEqual(
+            TOMLReader().read(path),
+            {"section": {"int": 1, "float": 1.5, "bool": True, "str": "value"}},
+        )
+
+        shutil.rmtree(tmp_dir)
+
+
+@unittest.skipIf(config_io.msgpack is None, "msgpack not installed")
+class TestMsgpackReaderWriter(unittest.TestCase):
+    def test_write_read(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "config.msgpack")
+
+        config_dict = {"section": {"int": 1, "float": 1.5, "list": [1, "a"]}}
+
+        MsgpackWriter().write(path, config_dict)
+
+        self.assertEqual(MsgpackReader().read(path), config_dict)
+
+        shutil.rmtree(tmp_dir)
+
 
 class TestYAMLWriter(unittest.TestCase):
     def setUp(self) -> None:
@@ -214,6 +690,11 @@ class TestConfigIOFactory(unittest.TestCase):
         crf = ConfigIOFactory()
         self.assertRaises(ValueError, crf.get_reader, "test/file/path.invalid")
 
+    def test_get_reader_json(self):
+        crf = ConfigIOFactory()
+        self.assertIsInstance(crf.get_reader("test/file/path.json"), JSONReader)
+        self.assertIsInstance(crf.get_writer("test/file/path.json"), JSONWriter)
+
     def test_get_file_extension(self):
         path = "test/file/path.extension"
         self.assertEqual(ConfigIOFactory._get_file_extension(path), "extension")
@@ -232,6 +713,227 @@ class TestReadConfig(unittest.TestCase):
             cfg, mock_reader.return_value.get_reader.return_value.read.return_value
         )
 
+    def test_read_config_cache(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        fname = os.path.join(tmp_dir, "file.config")
+        create_config_file(fname, {"entry1": "1"})
+
+        clear_config_cache()
+        with patch.object(ConfigReader, "read", wraps=ConfigReader().read) as mock_read:
+            config1 = read_config(fname)
+            config2 = read_config(fname)
+
+            self.assertEqual(mock_read.call_count, 1)
+            self.assertEqual(config1, {"Default": {"entry1": 1}})
+            self.assertEqual(config2, config1)
+
+            info = config_cache_info()
+            self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+            # returned values are independent copies of cached values
+            config1["Default"]["entry1"] = 2
+            self.assertEqual(read_config(fname), {"Default": {"entry1": 1}})
+
+            # modified file is re-read
+            create_config_file(fname, {"entry1": "10"})
+            self.assertEqual(read_config(fname), {"Default": {"entry1": 10}})
+            self.assertEqual(mock_read.call_count, 2)
+
+            read_config(fname, use_cache=False)
+            self.assertEqual(mock_read.call_count, 3)
+
+        clear_config_cache()
+        self.assertEqual(config_cache_info().currsize, 0)
+
+        shutil.rmtree(tmp_dir)
+
+
+class TestRegisterConfigFormat(unittest.TestCase):
+    @patch.dict(ConfigIOFactory.WRITER_BY_EXT)
+    @patch.dict(ConfigIOFactory.READER_BY_EXT)
+    def test_register_config_format(self):
+        reader = JSONReader()
+        writer = JSONWriter()
+
+        register_config_format([".jsn", "js"], reader=reader, writer=writer)
+
+        crf = ConfigIOFactory()
+        self.assertIs(crf.get_reader("path.jsn"), reader)
+        self.assertIs(crf.get_reader("path.js"), reader)
+        self.assertIs(crf.get_writer("path.jsn"), writer)
+
+    @patch.dict(ConfigIOFactory.WRITER_BY_EXT)
+    @patch.dict(ConfigIOFactory.READER_BY_EXT)
+    def test_register_config_format_reader_only(self):
+        register_config_format("jsn", reader=JSONReader())
+
+        crf = ConfigIOFactory()
+        self.assertIsInstance(crf.get_reader("path.jsn"), JSONReader)
+        self.assertRaises(ValueError, crf.get_writer, "path.jsn")
+
+    @patch.dict(ConfigIOFactory.READER_BY_EXT)
+    def test_register_config_format_find_config(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        for filename in ["file1.jsn", "file2.txt"]:
+            open(os.path.join(tmp_dir, filename), "w").close()
+
+        register_config_format("jsn", reader=JSONReader())
+
+        self.assertEqual(find_config(tmp_dir), [os.path.join(tmp_dir, "file1.jsn")])
+
+        shutil.rmtree(tmp_dir)
+
+
+class TestReadConfigStream(unittest.TestCase):
+    @patch("processor_tools.config_io.ConfigIOFactory")
+    def test_read_config_stream(self, mock_factory):
+        stream = read_config_stream("test.path")
+        mock_factory.return_value.get_reader.assert_called_once_with("test.path")
+        mock_reader = mock_factory.return_value.get_reader.return_value
+        mock_reader.read_stream.assert_called_once_with("test.path")
+
+        self.assertEqual(stream, mock_reader.read_stream.return_value)
+
+
+class TestGetValueStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(self.tmp_dir)
+
+        self.config_dict = {
+            "gain": 1.0,
+            "section": {
+                "gain": {"value": 2.0, "gain": "nested"},
+                "offset": [1, 2.5e-3, "\u00b5m", None, True],
+            },
+            "bands": [{"gain": 3}, {"sub": {"gain": [4, 5]}}],
+            "mixed": [{"gain": 6}, "value"],
+            "nested_lists": [[{"gain": 7}]],
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assert_matches_get_value_gen(self, path, keys):
+        config_dict = read_config(path, use_cache=False)
+        found = list(get_value_stream(path, keys))
+
+        for key in keys:
+            self.assertEqual(
+                [v for k, v in found if k == key],
+                [v for k, v in get_value_gen(config_dict, key)],
+            )
+
+    def test_get_value_stream_json(self):
+        path = os.path.join(self.tmp_dir, "config.json")
+        JSONWriter().write(path, self.config_dict)
+
+        self.assertEqual(
+            list(get_value_stream(path, "gain")),
+            [
+                ("gain", 1.0),
+                ("gain", {"value": 2.0, "gain": "nested"}),
+                ("gain", 3),
+                ("gain", [4, 5]),
+            ],
+        )
+        self.assert_matches_get_value_gen(path, ["gain", "offset", "value", "sub"])
+
+    def test_get_value_stream_json_chunks(self):
+        path = os.path.join(self.tmp_dir, "config.json")
+        JSONWriter().write(path, self.config_dict)
+        expected = list(get_value_stream(path, ["gain", "offset"]))
+
+        for keys in [None, {"gain", "offset"}]:
+            for chunk_size in range(1, 80, 3):
+                with open(path) as f:
+                    events = config_io._json_events(f, keys, chunk_size=chunk_size)
+                    self.assertEqual(
+                        list(config_io._search_events(events, {"gain", "offset"})),
+                        expected,
+                    )
+
+    def test_get_value_stream_json_invalid(self):
+        path = os.path.join(self.tmp_dir, "config.json")
+
+        for text in ['{"a" 1}', "[1, 2,]", '{"a": 1} 2', "", "[1 2]", "[", "tru"]:
+            with open(path, "w") as f:
+                f.write(text)
+
+            stream = get_value_stream(path, "a")
+            self.assertRaises(ValueError, list, stream)
+
+    def test_get_value_stream_yaml(self):
+        path = os.path.join(self.tmp_dir, "config.yaml")
+        YAMLWriter().write(path, self.config_dict)
+
+        self.assert_matches_get_value_gen(path, ["gain", "offset", "value", "sub"])
+
+    def test_get_value_stream_yaml_aliases(self):
+        np.save(os.path.join(self.tmp_dir, "gains.npy"), np.arange(3))
+        path = os.path.join(self.tmp_dir, "config.yaml")
+        with open(path, "w") as f:
+            f.write(
+                "base: &base\n"
+                "  gain: 1.5\n"
+                "  table: !npy gains.npy\n"
+                "section:\n"
+                "  inherited: *base\n"
+                "  gain: 2\n"
+            )
+
+        self.assert_matches_get_value_gen(path, ["gain"])
+
+        ((key, inherited),) = get_value_stream(path, "inherited")
+        self.assertEqual(inherited["gain"], 1.5)
+        np.testing.assert_array_equal(inherited["table"], np.arange(3))
+
+        tables = [table for key, table in get_value_stream(path, "table")]
+        self.assertEqual(len(tables), 2)
+        self.assertIsInstance(tables[0], np.memmap)
+
+    def test_get_value_stream_yaml_documents(self):
+        path = os.path.join(self.tmp_dir, "multi.yaml")
+        with open(path, "w") as f:
+            f.write("a: 1\n---\nb: {a: 2}\n---\n---\n- a: 3\n")
+
+        self.assertEqual(
+            list(get_value_stream(path, "a")), [("a", 1), ("a", 2), ("a", 3)]
+        )
+
+    def test_get_value_stream_lazy(self):
+        path = os.path.join(self.tmp_dir, "config.json")
+        with open(path, "w") as f:
+            f.write('{"gain": 1, "invalid": }')
+
+        stream = get_value_stream(path, "gain")
+
+        self.assertEqual(next(stream), ("gain", 1))
+        self.assertRaises(ValueError, next, stream)
+
+    def test_get_value_stream_other_format(self):
+        path = os.path.join(self.tmp_dir, "config.cfg")
+        create_config_file(path, {"entry1": "value1", "entry2": "2"})
+
+        self.assertEqual(list(get_value_stream(path, ["entry2"])), [("entry2", 2)])
+
+
+class TestReadConfigs(unittest.TestCase):
+    @patch(
+        "processor_tools.config_io.read_config",
+        side_effect=lambda path, lazy=False: {path: lazy},
+    )
+    def test_read_configs(self, mock_read_config):
+        paths = ["path" + str(i) for i in range(20)]
+
+        configs = read_configs(paths, max_workers=4)
+        self.assertEqual(configs, [{path: False} for path in paths])
+
+        configs = read_configs(paths, max_workers=4, lazy=True)
+        self.assertEqual(configs, [{path: True} for path in paths])
+
 
 class TestWriteConfig(unittest.TestCase):
     @patch("processor_tools.config_io.ConfigIOFactory")
@@ -284,6 +986,265 @@ class TestBuildConfigDir(unittest.TestCase):
         mock_write.assert_not_called()
 
 
+class TestBuildConfigDirIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        self.src_path = os.path.join(self.tmp_dir, "src.yaml")
+        self.configdir = os.path.join(self.tmp_dir, "configdir")
+        os.makedirs(self.tmp_dir)
+        write_config(self.src_path, {"entry1": "value1"})
+
+        self.configs = {
+            "copied_config.yaml": self.src_path,
+            "new_config.yaml": {"entry2": "value2"},
+            "new_config2.yaml": {"entry3": "value3"},
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_build_configdir_incremental(self):
+        written = build_configdir(self.configdir, self.configs, incremental=True)
+
+        self.assertCountEqual(
+            written, [os.path.join(self.configdir, f) for f in self.configs]
+        )
+        self.assertCountEqual(os.listdir(self.configdir), list(self.configs))
+        self.assertEqual(
+            read_config(os.path.join(self.configdir, "copied_config.yaml")),
+            {"entry1": "value1"},
+        )
+        self.assertEqual(
+            read_config(os.path.join(self.configdir, "new_config.yaml")),
+            {"entry2": "value2"},
+        )
+
+        # rebuild is a no-op
+        self.assertEqual(
+            build_configdir(self.configdir, self.configs, incremental=True), []
+        )
+
+        # only changed files are rewritten
+        write_config(self.src_path, {"entry1": "changed"})
+        self.configs["new_config.yaml"] = {"entry2": "changed"}
+
+        written = build_configdir(
+            self.configdir, self.configs, incremental=True, max_workers=2
+        )
+
+        self.assertCountEqual(
+            written,
+            [
+                os.path.join(self.configdir, "copied_config.yaml"),
+                os.path.join(self.configdir, "new_config.yaml"),
+            ],
+        )
+        self.assertEqual(
+            read_config(os.path.join(self.configdir, "copied_config.yaml")),
+            {"entry1": "changed"},
+        )
+        self.assertCountEqual(os.listdir(self.configdir), list(self.configs))
+
+    def test_build_configdir_incremental_link_modes(self):
+        for link_mode in ("copy", "reflink", "hardlink"):
+            configdir = self.configdir + link_mode
+            build_configdir(
+                configdir, self.configs, incremental=True, link_mode=link_mode
+            )
+
+            copied_path = os.path.join(configdir, "copied_config.yaml")
+            self.assertEqual(read_config(copied_path), {"entry1": "value1"})
+            self.assertEqual(
+                os.path.samefile(copied_path, self.src_path), link_mode == "hardlink"
+            )
+
+    @patch("processor_tools.config_io.write_config", side_effect=ValueError)
+    def test_build_configdir_incremental_error(self, mock_write):
+        self.assertRaises(
+            ValueError,
+            build_configdir,
+            self.configdir,
+            {"new_config.yaml": {"entry2": "value2"}},
+            incremental=True,
+        )
+
+        # no temporary files left behind
+        self.assertEqual(os.listdir(self.configdir), [])
+
+
+class TestCopyConfigValues(unittest.TestCase):
+    def test_copy_config_values(self):
+        tmp_path = (
+            "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6)) + ".npy"
+        )
+        np.save(tmp_path, np.arange(3))
+        array = np.load(tmp_path, mmap_mode="r")
+
+        config_values = {"a": {"b": [1, {"c": 2}]}, "array": array}
+        config_copy = copy_config_values(config_values)
+
+        self.assertEqual(config_copy, {"a": {"b": [1, {"c": 2}]}, "array": array})
+        self.assertIsNot(config_copy["a"], config_values["a"])
+        self.assertIsNot(config_copy["a"]["b"][1], config_values["a"]["b"][1])
+        self.assertIs(config_copy["array"], array)
+
+        del array, config_values, config_copy
+        os.remove(tmp_path)
+
+    def test_copy_config_values_lazy_section(self):
+        section = LazyConfigSection(ConfigReader(), "a", b"[a]\nb = 1\n", "utf-8")
+
+        config_copy = copy_config_values({"a": section})
+
+        self.assertIs(config_copy["a"], section)
+        self.assertFalse(section.is_parsed)
+
+
+class TestArchiveConfigs(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(self.tmp_dir)
+
+        self.members = {
+            "configs/a.yaml": b"a: 1\nshared: a\n",
+            "configs/b.cfg": b"[b]\nval = 2\n",
+            "configs/notes.txt": b"text",
+            "configs/sub/c.yaml": b"c: 3\n",
+        }
+
+        self.zip_path = os.path.join(self.tmp_dir, "bundle.zip")
+        with zipfile.ZipFile(self.zip_path, "w") as zf:
+            for name, data in self.members.items():
+                zf.writestr(name, data)
+
+        self.tar_path = os.path.join(self.tmp_dir, "bundle.tar.gz")
+        src_dir = os.path.join(self.tmp_dir, "src")
+        for name, data in self.members.items():
+            os.makedirs(os.path.dirname(os.path.join(src_dir, name)), exist_ok=True)
+            with open(os.path.join(src_dir, name), "wb") as f:
+                f.write(data)
+        with tarfile.open(self.tar_path, "w:gz") as tf:
+            tf.add(os.path.join(src_dir, "configs"), arcname="configs")
+
+        clear_config_cache()
+
+    def tearDown(self):
+        clear_config_cache()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_read_config(self):
+        for archive in (self.zip_path, self.tar_path):
+            self.assertEqual(
+                read_config(archive + "::configs/a.yaml"), {"a": 1, "shared": "a"}
+            )
+            self.assertEqual(
+                read_config(archive + "::configs/b.cfg", use_cache=False),
+                {"b": {"val": 2}},
+            )
+            self.assertEqual(
+                list(read_config_stream(archive + "::configs/sub/c.yaml")), [{"c": 3}]
+            )
+            self.assertRaises(
+                FileNotFoundError, read_config, archive + "::configs/missing.yaml"
+            )
+
+    def test_find_config(self):
+        for archive in (self.zip_path, self.tar_path):
+            self.assertEqual(
+                find_config(archive + "::configs/"),
+                [archive + "::configs/a.yaml", archive + "::configs/b.cfg"],
+            )
+            self.assertEqual(find_config(archive + "::"), [])
+
+    def test_config_path_exists_isdir(self):
+        for archive in (self.zip_path, self.tar_path):
+            self.assertTrue(config_path_exists(archive + "::configs/a.yaml"))
+            self.assertTrue(config_path_exists(archive + "::configs/sub"))
+            self.assertFalse(config_path_exists(archive + "::configs/x.yaml"))
+            self.assertTrue(config_path_isdir(archive + "::configs/"))
+            self.assertTrue(config_path_isdir(archive + "::"))
+            self.assertFalse(config_path_isdir(archive + "::configs/a.yaml"))
+
+        self.assertFalse(config_path_exists("missing.zip::configs/a.yaml"))
+        self.assertTrue(config_path_isdir(self.tmp_dir))
+
+    def test_archive_index_cached(self):
+        with patch(
+            "processor_tools.config_io._ConfigArchive",
+            wraps=config_io._ConfigArchive,
+        ) as mock_archive:
+            read_config(self.zip_path + "::configs/a.yaml")
+            read_config(self.zip_path + "::configs/b.cfg")
+            find_config(self.zip_path + "::configs")
+
+            self.assertEqual(mock_archive.call_count, 1)
+            archive = config_io._get_archive(self.zip_path)
+
+            # modified archive is re-indexed
+            with zipfile.ZipFile(self.zip_path, "a") as zf:
+                zf.writestr("configs/d.yaml", b"d: 4\n")
+
+            self.assertEqual(read_config(self.zip_path + "::configs/d.yaml"), {"d": 4})
+            self.assertEqual(mock_archive.call_count, 2)
+
+            # replaced index is closed
+            self.assertIsNone(archive._archive.fp)
+
+    def test_archive_index_bounded(self):
+        with patch("processor_tools.config_io._ARCHIVES_MAXSIZE", 1):
+            zip_archive = config_io._get_archive(self.zip_path)
+            tar_archive = config_io._get_archive(self.tar_path)
+
+            self.assertEqual(
+                list(config_io._ARCHIVES), [os.path.abspath(self.tar_path)]
+            )
+            self.assertIsNone(zip_archive._archive.fp)
+
+        clear_config_cache()
+        self.assertEqual(len(config_io._ARCHIVES), 0)
+        self.assertTrue(tar_archive._archive.closed)
+
+    def test_read_relative_paths(self):
+        arrays_path = os.path.join(self.tmp_dir, "arrays.npz")
+        np.savez(arrays_path, b=np.arange(2))
+        npy_path = os.path.join(self.tmp_dir, "a.npy")
+        np.save(npy_path, np.arange(3.0))
+
+        zip_path = os.path.join(self.tmp_dir, "paths.zip")
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("configs/paths.cfg", b"[s]\npath = data\nmissing = x.txt\n")
+            zf.writestr("configs/data/d.txt", b"text")
+            zf.writestr(
+                "configs/arrays.yaml", b"a: !npy ../a.npy\nb: !npz arrays.npz\n"
+            )
+            zf.write(npy_path, "a.npy")
+            zf.write(arrays_path, "configs/arrays.npz")
+
+        # relative paths refer to members of the same archive
+        self.assertEqual(
+            read_config(zip_path + "::configs/paths.cfg"),
+            {
+                "s": {
+                    "path": os.path.abspath(zip_path) + "::configs/data",
+                    "missing": "x.txt",
+                }
+            },
+        )
+
+        config = read_config(zip_path + "::configs/arrays.yaml", use_cache=False)
+        np.testing.assert_array_equal(config["a"], np.arange(3.0))
+        np.testing.assert_array_equal(config["b"]["b"], np.arange(2))
+        self.assertFalse(config["a"].flags.writeable)
+        self.assertFalse(config["b"]["b"].flags.writeable)
+
+    def test_build_configdir(self):
+        configdir = os.path.join(self.tmp_dir, "configdir")
+        build_configdir(configdir, {"a.yaml": self.tar_path + "::configs/a.yaml"})
+
+        with open(os.path.join(configdir, "a.yaml"), "rb") as f:
+            self.assertEqual(f.read(), self.members["configs/a.yaml"])
+
+
 class TestFindConfig(unittest.TestCase):
     def setUp(self):
         random_string = random.choices(string.ascii_lowercase, k=6)
@@ -4,19 +4,45 @@ import shutil
 import unittest
 from unittest.mock import patch, call, PropertyMock
 import os
+import pickle
 import random
 import string
+import threading
+import mmap
+import multiprocessing
+import zipfile
+import numpy as np
 from processor_tools import GLOBAL_SUPERCONTEXT
+from processor_tools.config_io import (
+    read_configs,
+    ConfigIOFactory,
+    ConfigReader,
+    LazyConfigSection,
+)
 from processor_tools.context import (
     Context,
+    ContextSection,
+    ContextBroadcast,
     set_global_supercontext,
     clear_global_supercontext,
+    deep_update,
 )
 
 
 __author__ = "Sam Hunt <sam.hunt@npl.co.uk>"
 
 
+def broadcast_task(broadcast, name):
+    context = broadcast.get()
+    array = context["array"]
+    return (
+        context[name],
+        len(GLOBAL_SUPERCONTEXT),
+        os.path.abspath(array.filename),
+        isinstance(array.base, mmap.mmap),
+    )
+
+
 class TestContext(unittest.TestCase):
     def test___init___None_default_None(self):
         context = Context()
@@ -132,6 +158,32 @@ class TestContext(unittest.TestCase):
         Context.default_config = None
         shutil.rmtree(tmp_dir)
 
+    def test___init__dir_parallel(self):
+        random_string = random.choices(string.ascii_lowercase, k=6)
+        tmp_dir = "tmp_" + "".join(random_string)
+        os.makedirs(tmp_dir)
+
+        for i in range(12):
+            with open(os.path.join(tmp_dir, "file" + str(i) + ".yaml"), "w") as f:
+                f.write("shared: " + str(i) + "\nentry" + str(i) + ": " + str(i))
+
+        Context.parallel_read_threshold = None
+        context_sequential = Context(tmp_dir)
+
+        Context.parallel_read_threshold = 8
+        with patch(
+            "processor_tools.context.read_configs", wraps=read_configs
+        ) as mock_read_configs:
+            context_parallel = Context(tmp_dir)
+
+        mock_read_configs.assert_called_once()
+        self.assertEqual(len(context_parallel.keys()), 13)
+        self.assertEqual(
+            context_parallel._config_values, context_sequential._config_values
+        )
+
+        shutil.rmtree(tmp_dir)
+
     def test_supercontext_setter_context(self):
         supercontext = Context({"section": {"val1": 1, "val2": 2}})
 
@@ -424,6 +476,23 @@ class TestContext(unittest.TestCase):
                 },
             )
 
+    def test_config_values_super_memmap(self):
+        tmp_path = (
+            "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6)) + ".npy"
+        )
+        np.save(tmp_path, np.arange(3))
+        array = np.load(tmp_path, mmap_mode="r")
+
+        context = Context({"section": {"array": array, "entry1": "value1"}})
+        context.supercontext = Context({"section": {"entry1": "super1"}})
+
+        config_values = context.config_values
+        self.assertIs(config_values["section"]["array"], array)
+        self.assertEqual(config_values["section"]["entry1"], "super1")
+
+        del array, context, config_values
+        os.remove(tmp_path)
+
     def test_update(self):
         context = Context()
         context._config_values = {
@@ -441,6 +510,112 @@ class TestContext(unittest.TestCase):
             },
         )
 
+    def test_update_from_stream(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "multi.yaml")
+        with open(path, "w") as f:
+            f.write("a: 1\nb: {c: 1, d: 1}\n---\n---\nb: {d: 2}\ne: 3\n")
+
+        context = Context({"a": 0, "f": 4})
+        context.update_from_stream(path)
+
+        self.assertEqual(
+            context.config_values, {"a": 1, "b": {"c": 1, "d": 2}, "e": 3, "f": 4}
+        )
+
+        with open(path, "w") as f:
+            f.write("a: 5\n---\n- not a dictionary\n")
+
+        self.assertRaises(ValueError, context.update_from_stream, path)
+        self.assertEqual(context["a"], 1)
+
+        shutil.rmtree(tmp_dir)
+
+    def test_update_from_stream_not_exists(self):
+        context = Context({"a": 0})
+        self.assertRaises(ValueError, context.update_from_stream, "missing.yaml")
+
+        context.update_from_stream("missing.yaml", skip_if_not_exists=True)
+        self.assertEqual(context.config_values, {"a": 0})
+
+    def test_batch(self):
+        context = Context({"entry1": "value1", "entry2": {"subentry2a": "value2a"}})
+
+        with context.batch():
+            context.set("entry3", "value3")
+            context.update({"entry2": {"subentry2b": "value2b"}})
+
+            # changes not visible until committed
+            self.assertIsNone(context["entry3"])
+
+        self.assertDictEqual(
+            context._config_values,
+            {
+                "entry1": "value1",
+                "entry2": {"subentry2a": "value2a", "subentry2b": "value2b"},
+                "entry3": "value3",
+            },
+        )
+
+    def test_batch_matches_sequential(self):
+        rng = random.Random(1)
+        values = [1, "a", {}, {"x": 1}, {"y": {"z": 2}}, {"x": {"z": 3}}]
+
+        for i in range(200):
+            operations = []
+            for j in range(6):
+                name = rng.choice(["a", "b"])
+                value = {rng.choice(["x", "y"]): rng.choice(values)}
+                operations.append((rng.choice(["set", "update"]), name, value))
+
+            sequential = Context({"a": {"x": {"w": 0}}, "b": 0})
+            batched = Context({"a": {"x": {"w": 0}}, "b": 0})
+
+            for method, name, value in operations:
+                if method == "set":
+                    sequential.set(name, value)
+                else:
+                    sequential.update({name: value})
+
+            with batched.batch():
+                for method, name, value in operations:
+                    if method == "set":
+                        batched.set(name, value)
+                    else:
+                        batched.update({name: value})
+
+            self.assertEqual(batched._config_values, sequential._config_values)
+
+    def test_batch_exception(self):
+        context = Context({"entry1": "value1"})
+
+        with self.assertRaises(RuntimeError):
+            with context.batch():
+                context.set("entry1", "new1")
+                raise RuntimeError
+
+        self.assertDictEqual(context._config_values, {"entry1": "value1"})
+
+        context.set("entry2", "value2")
+        self.assertDictEqual(
+            context._config_values, {"entry1": "value1", "entry2": "value2"}
+        )
+
+    def test_batch_nested(self):
+        context = Context()
+
+        with context.batch():
+            with context.batch():
+                context.set("entry1", "value1")
+
+            self.assertDictEqual(context._config_values, {})
+            context.set("entry2", "value2")
+
+        self.assertDictEqual(
+            context._config_values, {"entry1": "value1", "entry2": "value2"}
+        )
+
     @patch(
         "processor_tools.context.Context.config_values",
         new_callable=PropertyMock(
@@ -587,6 +762,336 @@ class TestContext(unittest.TestCase):
 
         self.assertEqual(context._config_values["entry5"], "value5")
 
+    def test_set_copy_on_write(self):
+        context = Context({"entry1": "value1"})
+        snapshot = context._config_values
+
+        context.set("entry2", "value2")
+
+        self.assertDictEqual(snapshot, {"entry1": "value1"})
+        self.assertDictEqual(
+            context._config_values, {"entry1": "value1", "entry2": "value2"}
+        )
+
+    def test_concurrent_read_write(self):
+        supercontext = Context({"entry0": "super"})
+        context = Context(
+            {"entry" + str(i): i for i in range(50)}, supercontext=supercontext
+        )
+        errors = []
+
+        def reader():
+            try:
+                for i in range(200):
+                    list(context.config_values.items())
+                    context.get("entry1")
+            except Exception as e:
+                errors.append(e)
+
+        def writer():
+            try:
+                for i in range(200):
+                    context.set("new" + str(i), i)
+                    context.update({"nested": {"new" + str(i): i}})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=reader) for i in range(4)]
+        threads += [threading.Thread(target=writer) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(context["entry0"], "super")
+        self.assertEqual(len(context["nested"]), 200)
+
+    def test_init_archive(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        archive = os.path.join(tmp_dir, "bundle.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("configs/a.yaml", "a: 1\nshared: a\n")
+            zf.writestr("configs/b.yaml", "b: 2\nshared: b\n")
+            zf.writestr("extra.yaml", "shared: extra\n")
+
+        context = Context(
+            [
+                archive + "::extra.yaml",
+                archive + "::configs/",
+                archive + "::missing.yaml",
+            ]
+        )
+
+        self.assertEqual(context["a"], 1)
+        self.assertEqual(context["b"], 2)
+        self.assertEqual(context["shared"], "extra")
+
+        context.update_from_file(archive + "::configs/a.yaml")
+        self.assertEqual(context["shared"], "a")
+
+        shutil.rmtree(tmp_dir)
+
+    def test_lazy_config_sections(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "config.cfg")
+        with open(path, "w") as f:
+            f.write("[a]\nx = 1\n[b]\ny = 1\nz = 1\n[c]\nw = 1\n")
+
+        with patch.dict(
+            ConfigIOFactory.READER_BY_EXT, {"cfg": ConfigReader(lazy=True)}
+        ):
+            context = Context([{"b": {"y": 2}}, path])
+            context.supercontext = Context({"c": {"w": 2}})
+            context.update({"d": 1})
+            with context.batch():
+                context.update({"b": {"z": 3}})
+
+        config_values = context._config_values
+        self.assertFalse(config_values["a"].is_parsed)
+
+        self.assertEqual(context.section("a")["x"], 1)
+        self.assertEqual(context["b"], {"y": 2, "z": 3})
+        self.assertEqual(context["c"], {"w": 2})
+        self.assertTrue(config_values["a"].is_parsed)
+
+        shutil.rmtree(tmp_dir)
+
+    def test_lazy_config(self):
+        class LazyContext(Context):
+            lazy_config = True
+            parallel_read_threshold = 0
+
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "config.cfg")
+        with open(path, "w") as f:
+            f.write("[a]\nx = 1\n[b]\ny = 1\n")
+
+        for config in (path, tmp_dir):
+            context = LazyContext(config)
+            self.assertIsInstance(context._config_values["a"], LazyConfigSection)
+            self.assertEqual(context["b"], {"y": 1})
+
+        # lazy reading only applies to contexts with lazy_config set
+        self.assertIsInstance(Context(path)._config_values["a"], dict)
+
+        shutil.rmtree(tmp_dir)
+
+    def test_deep_update(self):
+        section = LazyConfigSection(ConfigReader(), "a", b"[a]\nb = 1\n", "utf-8")
+
+        config_values = deep_update({"a": section, "c": 1}, {"c": 2})
+        self.assertIs(config_values["a"], section)
+        self.assertFalse(section.is_parsed)
+
+        config_values = deep_update({"a": section}, {"a": {"c": 2}}, {"d": 3})
+        self.assertEqual(config_values, {"a": {"b": 1, "c": 2}, "d": 3})
+
+    def test_pickle(self):
+        context = Context({"entry1": "value1"}, supercontext=Context({"entry2": 2}))
+
+        context_unpickled = pickle.loads(pickle.dumps(context))
+
+        self.assertDictEqual(context_unpickled.config_values, context.config_values)
+        context_unpickled.set("entry3", "value3")
+        self.assertEqual(context_unpickled["entry3"], "value3")
+
+
+class TestContextSection(unittest.TestCase):
+    def setUp(self):
+        self.supersupercontext = Context(
+            {"section": {"entry1": "supersuper1", "sub": {"entry2": "supersuper2"}}}
+        )
+        self.supercontext = Context(
+            {
+                "section": {"entry1": "super1", "entry3": "super3"},
+                "other": {"section": {"entry4": "othersuper4"}},
+            },
+            supercontext=self.supersupercontext,
+        )
+        self.context = Context(
+            {
+                "section": {
+                    "entry1": "value1",
+                    "entry4": "value4",
+                    "sub": {"entry2": "value2", "entry5": "value5"},
+                },
+                "leaf": "value",
+            },
+            supercontext=self.supercontext,
+        )
+
+    def tearDown(self):
+        clear_global_supercontext()
+
+    def test_section(self):
+        section = self.context.section("section")
+
+        self.assertIsInstance(section, ContextSection)
+        self.assertEqual(section["entry1"], "supersuper1")
+        self.assertEqual(section["entry3"], "super3")
+        self.assertEqual(section["entry4"], "value4")
+        self.assertRaises(KeyError, section.__getitem__, "missing")
+        self.assertIsNone(section.get("missing"))
+        self.assertTrue("entry3" in section)
+        self.assertFalse("missing" in section)
+
+    def test_section_matches_config_values(self):
+        with set_global_supercontext(
+            (Context({"global": {"entry1": "global1"}}), "global")
+        ):
+            for name in ["section", "other", "missing"]:
+                self.assertEqual(
+                    self.context.section(name).to_dict(),
+                    self.context.config_values.get(name, {}),
+                )
+
+    def test_section_nested(self):
+        sub = self.context.section("section").section("sub")
+
+        self.assertEqual(sub["entry2"], "supersuper2")
+        self.assertEqual(sub["entry5"], "value5")
+        self.assertIsInstance(self.context.section("section")["sub"], ContextSection)
+        self.assertEqual(sub, {"entry2": "supersuper2", "entry5": "value5"})
+
+    def test_section_mapping(self):
+        section = self.context.section("section")
+
+        self.assertEqual(list(section.keys()), ["entry1", "entry4", "sub", "entry3"])
+        self.assertEqual(len(section), 4)
+        self.assertDictEqual(
+            section.to_dict(),
+            {
+                "entry1": "supersuper1",
+                "entry4": "value4",
+                "sub": {"entry2": "supersuper2", "entry5": "value5"},
+                "entry3": "super3",
+            },
+        )
+
+    def test_section_live(self):
+        section = self.context.section("section")
+
+        self.context.update({"section": {"entry6": "value6"}})
+        self.supercontext.update({"section": {"entry4": "super4"}})
+
+        self.assertEqual(section["entry6"], "value6")
+        self.assertEqual(section["entry4"], "super4")
+
+    def test_section_overridden_by_value(self):
+        self.supercontext.set("leaf", {"entry": "super"})
+        self.supersupercontext.set("section", "overridden")
+
+        self.assertEqual(self.context.section("leaf").to_dict(), {"entry": "super"})
+        self.assertEqual(self.context.section("section").to_dict(), {})
+        self.assertEqual(self.context["section"], "overridden")
+
+    def test_section_as_supercontext(self):
+        context = Context({"entry4": "value4", "entry5": "value5"})
+        context.supercontext = self.supercontext.section("other").section("section")
+
+        self.assertEqual(context._supercontext[0][0], self.supercontext)
+        self.assertEqual(context._supercontext[0][1], ("other", "section"))
+        self.assertEqual(context["entry4"], "othersuper4")
+        self.assertEqual(context.section("missing").to_dict(), {})
+
+        context = Context({"section": {"entry4": "value4"}})
+        with set_global_supercontext(self.supercontext.section("other")):
+            self.assertEqual(context["section"]["entry4"], "othersuper4")
+            self.assertEqual(context.section("section")["entry4"], "othersuper4")
+
+    def test_select(self):
+        self.assertEqual(
+            list(self.context.select("section.*", with_paths=True)),
+            [
+                (("section", "entry1"), "supersuper1"),
+                (("section", "entry4"), "value4"),
+                (("section", "sub"), {"entry2": "supersuper2", "entry5": "value5"}),
+                (("section", "entry3"), "super3"),
+            ],
+        )
+        self.assertEqual(
+            list(self.context.select("**.entry2")),
+            ["supersuper2"],
+        )
+
+
+class TestContextBroadcast(unittest.TestCase):
+    def setUp(self):
+        self.tmp_path = (
+            "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6)) + ".npy"
+        )
+        np.save(self.tmp_path, np.arange(4.0))
+
+    def tearDown(self):
+        clear_global_supercontext()
+        os.remove(self.tmp_path)
+
+    def test_broadcast(self):
+        array = np.load(self.tmp_path, mmap_mode="r")
+        context = Context({"entry1": "value1", "array": array})
+
+        with set_global_supercontext(Context({"entry1": "global1"})):
+            with ContextBroadcast(context) as broadcast:
+                # changes after broadcasting are not broadcast
+                context["entry1"] = "changed"
+
+                loaded = broadcast.get()
+                self.assertIsNot(loaded, context)
+                self.assertEqual(loaded._config_values["entry1"], "value1")
+                self.assertIs(broadcast.get(), loaded)
+                self.assertTrue(os.path.exists(broadcast.path))
+
+                broadcast_unpickled = pickle.loads(pickle.dumps(broadcast))
+                self.assertEqual(broadcast_unpickled.id, broadcast.id)
+
+            self.assertFalse(os.path.exists(broadcast.path))
+
+    def test_broadcast_pool(self):
+        array = np.load(self.tmp_path, mmap_mode="r")
+        context = Context({"entry1": "value1", "array": array})
+
+        with set_global_supercontext(Context({"entry1": "global1"})):
+            with ContextBroadcast(context) as broadcast:
+                mp_context = multiprocessing.get_context("spawn")
+                with mp_context.Pool(2, initializer=broadcast.initializer) as pool:
+                    results = pool.starmap(broadcast_task, [(broadcast, "entry1")] * 4)
+
+        self.assertEqual(
+            results, [("global1", 1, os.path.abspath(self.tmp_path), True)] * 4
+        )
+
+    @unittest.skipIf(
+        "fork" not in multiprocessing.get_all_start_methods(), "fork not available"
+    )
+    def test_broadcast_pool_fork(self):
+        array = np.load(self.tmp_path, mmap_mode="r")
+        context = Context({"entry1": "value1", "entry2": "value2", "array": array})
+
+        with set_global_supercontext(Context({"entry1": "global1"})):
+            broadcast = ContextBroadcast(context)
+
+        with broadcast:
+            # changes after broadcasting, to the context and the copy loaded in this process, are not broadcast
+            context["entry2"] = "changed"
+            broadcast.get()["entry2"] = "changed"
+            clear_global_supercontext()
+
+            mp_context = multiprocessing.get_context("fork")
+            with mp_context.Pool(2, initializer=broadcast.initializer) as pool:
+                results = pool.starmap(
+                    broadcast_task, [(broadcast, "entry1"), (broadcast, "entry2")] * 2
+                )
+
+        path = os.path.abspath(self.tmp_path)
+        self.assertEqual(
+            results,
+            [("global1", 1, path, True), ("value2", 1, path, True)] * 2,
+        )
+
 
 class TestSetGlobalSupercontext(unittest.TestCase):
     def tearDown(self):
@@ -404,6 +404,19 @@ class TestBuildConfigDirCmdClass(unittest.TestCase):
 
         mock_build.assert_has_calls(exp_mock_build_calls)
 
+    @patch("processor_tools.config_io.os.path.expanduser", return_value="test")
+    @patch("processor_tools.setup_utils.CustomCmdClassUtils.build_cmdclass")
+    def test_build_configdir_cmdclass_incremental(self, mock_build, mock_expand):
+        package_name = "test_package"
+        configs = {"copied_config.yaml": "path/to/old_config.yaml"}
+        build_configdir_cmdclass(package_name, configs, incremental=True)
+
+        mock_build.assert_called_once_with(
+            postinstall=build_configdir,
+            post_args=[os.path.join("test", "." + package_name)],
+            post_kwargs={"configs": configs, "incremental": True},
+        )
+
     def test__build_configdir_cmdclass_install(self):
 
         random_string = random.choices(string.ascii_lowercase, k=6)
@@ -1,7 +1,24 @@
 """processor_tools.utils.dict_tools - dictionary utility functions"""
 
+import fnmatch
+import re
+from bisect import bisect_left
+from collections.abc import Mapping
 from copy import copy, deepcopy
-from typing import Any, Dict, Generator, List, Optional, Union
+from functools import lru_cache
+from itertools import chain
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 
@@ -11,6 +28,11 @@ __author__ = "Mattea Goalen <mattea.goalen@npl.co.uk>"
 __all__ = [
     "get_value",
     "get_value_gen",
+    "get_values",
+    "KeyIndex",
+    "Selector",
+    "compile_selector",
+    "select",
 ]
 
 
@@ -39,16 +61,16 @@ def get_value_gen(test_dict: dict, key: str) -> Generator:
             yield from get_value_gen(test_dict[i], key)
 
 
-def get_value(test_dict, key, multiple=False):
+def _select_value(value_list: List[Tuple[Any, Any]], key, multiple: bool = False):
     """
-    Return dictionary values associated with the specified key
+    Return value from list of key-value pairs found for a key, as
+    :py:func:`get_value <processor_tools.utils.dict_tools.get_value>`
 
-    :param multiple:
-    :param test_dict: input dictionary in which to search for the key-value pair/s
-    :param key: key to use to search through dictionary
+    :param value_list: list of key-value pairs
+    :param key: key searched for
+    :param multiple: option to return list of key-value pairs, if found
     :return: list of multiple values or single value associated with key
     """
-    value_list = list(get_value_gen(test_dict, key))
     try:
         if len(value_list) == 1 or all(
             [True if i[1] == value_list[0][1] else False for i in value_list]
@@ -78,5 +100,550 @@ def get_value(test_dict, key, multiple=False):
     return
 
 
+def get_value(test_dict, key, multiple=False):
+    """
+    Return dictionary values associated with the specified key
+
+    :param multiple:
+    :param test_dict: input dictionary in which to search for the key-value pair/s - or
+        :py:class:`KeyIndex <processor_tools.utils.dict_tools.KeyIndex>` of dictionary
+    :param key: key to use to search through dictionary
+    :return: list of multiple values or single value associated with key
+    """
+    if isinstance(test_dict, KeyIndex):
+        return test_dict.get_value(key, multiple=multiple, copy=True)
+
+    value_list = list(get_value_gen(test_dict, key))
+    return _select_value(value_list, key, multiple)
+
+
+def _is_dict_list(v) -> bool:
+    """
+    Return whether value is a list of dictionaries, i.e. is searched by `get_value_gen`
+
+    :param v: value
+    :return: bool
+    """
+    return isinstance(v, list) and all(isinstance(i, dict) for i in v)
+
+
+def _iter_items(node: Union[dict, List[dict]]) -> Iterator[Tuple[Any, Any]]:
+    """
+    Returns iterator of key-value pairs of dictionary, or of each dictionary in list of dictionaries in turn
+
+    :param node: dictionary or list of dictionaries
+    :return: iterator of key-value pairs
+    """
+    if isinstance(node, dict):
+        return iter(node.items())
+    return chain.from_iterable(v.items() for v in node)
+
+
+def get_values(
+    test_dict, keys: Iterable, multiple: bool = False, copy: bool = False
+) -> dict:
+    """
+    Return dictionary values associated with each of the specified keys, as
+    :py:func:`get_value <processor_tools.utils.dict_tools.get_value>` - but searching for all keys in a single
+    (iterative, rather than recursive) traversal of the dictionary
+
+    :param test_dict: input dictionary in which to search for the key-value pair/s
+    :param keys: keys to use to search through dictionary
+    :param multiple: option to return list of key-value pairs per key, if found
+    :param copy: (default: False) option to return (deep) copies of values, rather than references
+    :return: dictionary of list of multiple values or single value associated with each key
+    """
+
+    found: Dict[Any, List[Tuple[Any, Any]]] = {key: [] for key in keys}
+
+    # stack of (key-value pair iterator, keys of containing dictionaries)
+    stack: List[Tuple[Iterator[Tuple[Any, Any]], frozenset]] = []
+    if isinstance(test_dict, dict) or _is_dict_list(test_dict):
+        stack.append((_iter_items(test_dict), frozenset()))
+
+    while stack:
+        items, ancestors = stack[-1]
+        item = next(items, None)
+        if item is None:
+            stack.pop()
+            continue
+
+        k, v = item
+        if k in found:
+            # values of a key are not searched for the same key, as get_value_gen
+            if k not in ancestors:
+                found[k].append((k, deepcopy(v) if copy else v))
+            v_ancestors = ancestors | {k}
+        else:
+            v_ancestors = ancestors
+
+        if isinstance(v, dict) or _is_dict_list(v):
+            stack.append((_iter_items(v), v_ancestors))
+
+    return {key: _select_value(found[key], key, multiple) for key in found}
+
+
+class KeyIndex:
+    """
+    Index of the locations of every key in a nested dictionary, for fast repeated key lookups.
+
+    The index is built in one traversal of the dictionary, after which values associated with a key are found in
+    proportion to the number of matches - rather than searching the whole dictionary, as
+    :py:func:`get_value_gen <processor_tools.utils.dict_tools.get_value_gen>`. Lookups return the same values, in the
+    same order. Values are returned by reference, unless copies are requested.
+
+    If the dictionary is changed, the index must be updated with
+    :py:meth:`update <processor_tools.utils.dict_tools.KeyIndex.update>`.
+
+    :param nested_dict: nested dictionary (or list of dictionaries) to index
+    """
+
+    def __init__(self, nested_dict: Union[dict, List[dict]]):
+        self.nested_dict = nested_dict
+
+        # per key, paths of occurrences and their positions in traversal order
+        # (index of each key/item within its container), sorted by position
+        self._paths: Dict[Hashable, List[tuple]] = {}
+        self._positions: Dict[Hashable, List[tuple]] = {}
+
+        self.update()
+
+    def _index(
+        self,
+        node: Any,
+        path: tuple,
+        position: tuple,
+        ancestors: frozenset,
+        paths: Dict[Hashable, List[tuple]],
+        positions: Dict[Hashable, List[tuple]],
+    ) -> None:
+        """
+        Adds occurrences of keys in node to index, in traversal order
+
+        :param node: dictionary or list of dictionaries
+        :param path: path of node
+        :param position: position of node
+        :param ancestors: keys of dictionaries containing node - occurrences of these keys within node are not returned
+            by `get_value_gen`
+        :param paths: index of key paths to add to
+        :param positions: index of key positions to add to
+        """
+
+        if isinstance(node, dict):
+            for i, (k, v) in enumerate(node.items()):
+                k_path = path + (k,)
+                k_position = position + (i,)
+
+                if k not in ancestors:
+                    paths.setdefault(k, []).append(k_path)
+                    positions.setdefault(k, []).append(k_position)
+
+                if isinstance(v, dict) or _is_dict_list(v):
+                    self._index(
+                        v, k_path, k_position, ancestors | {k}, paths, positions
+                    )
+
+        elif _is_dict_list(node):
+            for i, v in enumerate(node):
+                self._index(
+                    v, path + (i,), position + (i,), ancestors, paths, positions
+                )
+
+    def _resolve(self, path: tuple) -> Tuple[Any, tuple, frozenset]:
+        """
+        Returns node at path within dictionary, with its position and the keys of the dictionaries containing it
+
+        :param path: path of node
+        :return: node, position and ancestor keys
+        """
+
+        node = self.nested_dict
+        position: tuple = ()
+        ancestors: frozenset = frozenset()
+        for p in path:
+            if isinstance(node, dict):
+                position += (list(node).index(p),)
+                ancestors = ancestors | {p}
+            else:
+                position += (p,)
+            node = node[p]
+
+        return node, position, ancestors
+
+    def update(self, path: tuple = ()) -> None:
+        """
+        Updates index for changes to the dictionary
+
+        :param path: path (tuple of keys/list indices) of the dictionary (or list of dictionaries) within the indexed
+            dictionary that has changed, to only re-index its contents - by default, the whole dictionary is re-indexed
+        """
+
+        path = tuple(path)
+
+        if not path:
+            self._paths = {}
+            self._positions = {}
+            self._index(
+                self.nested_dict, (), (), frozenset(), self._paths, self._positions
+            )
+            return
+
+        node, position, ancestors = self._resolve(path)
+
+        new_paths: Dict[Hashable, List[tuple]] = {}
+        new_positions: Dict[Hashable, List[tuple]] = {}
+        self._index(node, path, position, ancestors, new_paths, new_positions)
+
+        # replace index entries within node - a contiguous range of each (sorted) list
+        end_position = position[:-1] + (position[-1] + 1,)
+        for key in set(self._paths) | set(new_paths):
+            key_positions = self._positions.get(key, [])
+            start = bisect_left(key_positions, position + (0,))
+            end = bisect_left(key_positions, end_position)
+
+            if key in self._paths:
+                self._paths[key][start:end] = new_paths.get(key, [])
+                key_positions[start:end] = new_positions.get(key, [])
+            else:
+                self._paths[key] = new_paths[key]
+                self._positions[key] = new_positions[key]
+
+            if not self._paths[key]:
+                del self._paths[key]
+                del self._positions[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def keys(self) -> List[Hashable]:
+        """
+        Returns keys in dictionary
+
+        :return: keys
+        """
+        return list(self._paths)
+
+    def paths(self, key) -> List[tuple]:
+        """
+        Returns paths of values associated with key in dictionary, as tuples of keys/list indices
+
+        :param key: key
+        :return: paths
+        """
+        return list(self._paths.get(key, []))
+
+    def items(self, key, copy: bool = False) -> List[Tuple[Any, Any]]:
+        """
+        Returns key-value pairs of values associated with key in dictionary, as `list(get_value_gen(nested_dict, key))`
+
+        :param key: key
+        :param copy: (default: False) option to return (deep) copies of values, rather than references
+        :return: key-value pairs
+        """
+
+        items = []
+        for path in self._paths.get(key, []):
+            node = self.nested_dict
+            for p in path:
+                node = node[p]
+            items.append((path[-1], deepcopy(node) if copy else node))
+
+        return items
+
+    def get_value(self, key, multiple: bool = False, copy: bool = False):
+        """
+        Return dictionary values associated with the specified key, as
+        :py:func:`get_value <processor_tools.utils.dict_tools.get_value>`
+
+        :param key: key
+        :param multiple: option to return list of key-value pairs, if found
+        :param copy: (default: False) option to return (deep) copies of values, rather than references
+        :return: list of multiple values or single value associated with key
+        """
+        return _select_value(self.items(key, copy=copy), key, multiple)
+
+
+def _with_step(
+    children: Iterator[Tuple[Any, Any]], i: int, path: tuple
+) -> Iterator[Tuple[Any, int, tuple]]:
+    """
+    Yields children of node, with index of selector step to evaluate for them and their paths
+
+    :param children: (key/index, value) pairs of children
+    :param i: index of selector step
+    :param path: path of node
+    :return: (value, step index, path) tuples
+    """
+    for k, v in children:
+        yield v, i, path + (k,)
+
+
+class Selector:
+    """
+    Compiled path query, selecting values from nested dictionaries/lists (or
+    :py:class:`Context <processor_tools.context.Context>` objects).
+
+    Selectors are defined as a sequence of "." separated steps, each of which may be:
+
+    * `name` - value of key `name` (or list element, for integer names)
+    * `"na.me"` - value of key `na.me`, for names including special characters
+    * `*` - every value (or list element)
+    * `**` - every nested value, at any depth (including none)
+    * glob pattern, e.g. `RADIANCE_MULT_BAND_*` - values of keys matching the pattern (with `*` and `?` wildcards)
+    * `/regex/` - values of keys matching the regular expression, e.g. `/RADIANCE_(MULT|ADD)_BAND_[0-9]+/`
+    * `[i]` - list element `i` (may follow another step without a ".", e.g. `BANDS[0]`), or `[*]` for every list element
+
+    For example, ``Selector("LEVEL1_RADIOMETRIC_RESCALING.RADIANCE_MULT_BAND_*")``.
+
+    :param selector: selector definition
+    """
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.steps = self._parse(selector)
+
+    @staticmethod
+    def _parse(selector: str) -> List[Tuple[str, Any]]:
+        """
+        Returns steps of selector, as tuples of step type and argument
+
+        :param selector: selector definition
+        :return: selector steps
+        """
+
+        steps: List[Tuple[str, Any]] = []
+        i = 0
+        n = len(selector)
+        expect_step = n > 0
+
+        def error(msg):
+            return ValueError("invalid selector '{}': {}".format(selector, msg))
+
+        while i < n:
+            c = selector[i]
+
+            if c == ".":
+                if expect_step:
+                    raise error("empty step at position {}".format(i))
+                expect_step = True
+                i += 1
+                continue
+
+            if c == "[":
+                end = selector.find("]", i)
+                if end == -1:
+                    raise error("unclosed '['")
+                index = selector[i + 1 : end].strip()
+                if index == "*":
+                    steps.append(("any", None))
+                else:
+                    try:
+                        steps.append(("index", int(index)))
+                    except ValueError:
+                        raise error("invalid list index '{}'".format(index))
+                i = end + 1
+                expect_step = False
+                continue
+
+            if not expect_step:
+                raise error("missing '.' at position {}".format(i))
+
+            if c in '"/':
+                # quoted name or regex, up to the next unescaped delimiter
+                j = i + 1
+                chars = []
+                while j < n and selector[j] != c:
+                    if (selector[j] == "\\") and (j + 1 < n) and (selector[j + 1] == c):
+                        j += 1
+                    chars.append(selector[j])
+                    j += 1
+                if j == n:
+                    raise error("unclosed '{}'".format(c))
+                value = "".join(chars)
+
+                if c == '"':
+                    steps.append(("key", value))
+                else:
+                    try:
+                        steps.append(("regex", re.compile(value)))
+                    except re.error as e:
+                        raise error("invalid regex '{}' ({})".format(value, e))
+                i = j + 1
+
+            else:
+                j = i
+                while j < n and selector[j] not in ".[":
+                    j += 1
+                name = selector[i:j]
+
+                if name == "**":
+                    # consecutive "**" are equivalent to one
+                    if not (steps and steps[-1][0] == "descendants"):
+                        steps.append(("descendants", None))
+                elif name == "*":
+                    steps.append(("any", None))
+                elif ("*" in name) or ("?" in name):
+                    steps.append(("regex", re.compile(fnmatch.translate(name))))
+                else:
+                    steps.append(("key", name))
+                i = j
+
+            expect_step = False
+
+        if expect_step:
+            raise error("empty step at end")
+
+        return steps
+
+    def __repr__(self) -> str:
+        return "Selector({!r})".format(self.selector)
+
+    @staticmethod
+    def _children(node: Any) -> Iterator[Tuple[Any, Any]]:
+        """
+        Returns iterator of (key/index, value) pairs of node's children
+
+        :param node: node
+        :return: children of node
+        """
+
+        if isinstance(node, Mapping):
+            return iter(node.items())
+        if isinstance(node, (list, tuple)):
+            return enumerate(node)
+        return iter(())
+
+    @classmethod
+    def _match_step(cls, step: Tuple[str, Any], node: Any) -> Iterator[Tuple[Any, Any]]:
+        """
+        Returns iterator of (key/index, value) pairs of node's children matched by step
+
+        :param step: selector step
+        :param node: node
+        :return: matched children of node
+        """
+
+        kind, arg = step
+
+        if kind == "any":
+            return cls._children(node)
+
+        if kind == "regex":
+            if isinstance(node, Mapping):
+                return (
+                    (k, v)
+                    for k, v in node.items()
+                    if isinstance(k, str) and (arg.fullmatch(k) is not None)
+                )
+            return iter(())
+
+        if kind == "key":
+            if isinstance(node, Mapping):
+                if arg in node:
+                    return iter([(arg, node[arg])])
+
+                # keys read as integers, e.g. from yaml
+                try:
+                    int_key = int(arg)
+                except ValueError:
+                    return iter(())
+                return iter([(int_key, node[int_key])] if int_key in node else [])
+
+            if isinstance(node, (list, tuple)):
+                try:
+                    arg = int(arg)
+                except ValueError:
+                    return iter(())
+            else:
+                return iter(())
+
+        # index
+        if isinstance(node, (list, tuple)) and (-len(node) <= arg < len(node)):
+            return iter([(arg, node[arg])])
+        return iter(())
+
+    def select(self, d: Any, with_paths: bool = False) -> Iterator[Any]:
+        """
+        Returns generator of selected values, evaluated lazily in (depth-first) traversal order
+
+        Selecting from :py:class:`Context <processor_tools.context.Context>` objects resolves values from its live view
+        (see :py:meth:`Context.section <processor_tools.context.Context.section>`), so configuration values are not
+        merged up front - sections are returned as :py:class:`ContextSection <processor_tools.context.ContextSection>`
+        views.
+
+        :param d: nested dictionary/list, or context object, to select from
+        :param with_paths: option to yield (path, value) tuples, where path is a tuple of the keys/list indices of the
+            value
+        :return: generator of selected values
+        """
+
+        from processor_tools.context import Context
+
+        if isinstance(d, Context):
+            d = d._section_view(())
+
+        steps = self.steps
+        n_steps = len(steps)
+
+        # stack of iterators of (node, step index, path) to evaluate
+        stack: List[Iterator[Tuple[Any, int, tuple]]] = [iter([(d, 0, ())])]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+
+            node, i, path = item
+            if i == n_steps:
+                yield (path, node) if with_paths else node
+                continue
+
+            step = steps[i]
+            if step[0] == "descendants":
+                stack.append(
+                    chain(
+                        [(node, i + 1, path)],
+                        _with_step(self._children(node), i, path),
+                    )
+                )
+            else:
+                stack.append(_with_step(self._match_step(step, node), i + 1, path))
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> Selector:
+    """
+    Returns compiled selector, from cache if previously compiled
+
+    :param selector: selector definition (see :py:class:`Selector <processor_tools.utils.dict_tools.Selector>`)
+    :return: compiled selector
+    """
+    return Selector(selector)
+
+
+def select(
+    d: Any, selector: Union[str, Selector], with_paths: bool = False
+) -> Iterator[Any]:
+    """
+    Returns generator of values selected from nested dictionaries/lists (or
+    :py:class:`Context <processor_tools.context.Context>` objects) by path query, e.g.
+    ``select(d, "PRODUCT_METADATA.*.SCENE_CENTER_TIME")``
+
+    :param d: nested dictionary/list, or context object, to select from
+    :param selector: selector definition (see :py:class:`Selector <processor_tools.utils.dict_tools.Selector>`) or
+        compiled selector
+    :param with_paths: option to yield (path, value) tuples, where path is a tuple of the keys/list indices of the value
+    :return: generator of selected values
+    """
+
+    if isinstance(selector, str):
+        selector = compile_selector(selector)
+
+    return selector.select(d, with_paths)
+
+
 if __name__ == "__main__":
     pass
@@ -1,9 +1,32 @@
 """processor_tools.utils.formatters - formatting functions for values"""
 
 import datetime as dt
+import json
+import locale
+import mmap
+import os
+import re
+import sqlite3
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import numpy as np
-from dateutil.parser import parse  # type: ignore[import-untyped]
-from typing import Union
+from dateutil.parser import parse, parserinfo  # type: ignore[import-untyped]
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+    cast,
+)
 
 __author__ = "Mattea Goalen <mattea.goalen@npl.co.uk>"
 
@@ -11,9 +34,13 @@ __all__ = [
     "is_number",
     "is_datetime",
     "str2datetime",
+    "str2datetime_many",
     "val_format",
+    "val_format_many",
     "list_to_dict",
     "txt_to_dict",
+    "txt_to_dict_many",
+    "IngestStats",
     "convert_datetime",
     "datetime_from_yearday",
 ]
@@ -81,19 +108,388 @@ def str2datetime(s):
     return val
 
 
+# regex patterns for strptime-like format directives, with the datetime field they define
+_FORMAT_DIRECTIVES = {
+    "%Y": ("year", "([0-9]{4})"),
+    "%m": ("month", "([0-9]{2})"),
+    "%d": ("day", "([0-9]{2})"),
+    "%H": ("hour", "([0-9]{2})"),
+    "%M": ("minute", "([0-9]{2})"),
+    "%S": ("second", "([0-9]{2})"),
+    "%f": ("microsecond", "([0-9]{1,6})"),
+    "%b": ("month", "([A-Za-z]{3})"),
+    "%B": ("month", "([A-Za-z]{3,9})"),
+}
+
+_MONTH_NAMES = [
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+]
+_MONTHS = {
+    **{name: i + 1 for i, name in enumerate(_MONTH_NAMES)},
+    **{name[:3]: i + 1 for i, name in enumerate(_MONTH_NAMES)},
+}
+
+# candidate formats of non-ISO 8601 datetime strings (parsed by dateutil in str2datetime)
+_DATE_FORMATS = [
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y.%m.%d",
+    "%d.%m.%Y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%Y%m%d",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d %Y",
+    "%B %d %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%d-%b-%Y",
+]
+_TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%H:%M:%S.%f", "%H%M%S"]
+_DATETIME_FORMATS = _DATE_FORMATS + [
+    date_format + sep + time_format
+    for date_format in _DATE_FORMATS
+    for sep in (" ", "T")
+    for time_format in _TIME_FORMATS
+]
+
+
+def _compile_datetime_format(fmt: str) -> Callable[[str], dt.datetime]:
+    """
+    Returns parser for strings of strptime-like datetime format (supporting only directives of `_FORMAT_DIRECTIVES`),
+    with results matching dateutil's parser - raises ValueError for strings that do not match the format, invalid dates
+    or day first dates that dateutil would read month first
+
+    :param fmt: datetime format
+    :return: parser function
+    """
+
+    pattern_parts = []
+    fields = []
+    for token in re.split("(%[a-zA-Z])", fmt):
+        if token in _FORMAT_DIRECTIVES:
+            field, token_pattern = _FORMAT_DIRECTIVES[token]
+            fields.append(field)
+            pattern_parts.append(token_pattern)
+        else:
+            pattern_parts.append(re.escape(token))
+
+    pattern = re.compile("".join(pattern_parts))
+    i_year = fields.index("year")
+    i_month = fields.index("month")
+    i_day = fields.index("day")
+    i_time = [fields.index(f) for f in ("hour", "minute", "second") if f in fields]
+    i_microsecond = fields.index("microsecond") if "microsecond" in fields else None
+    month_named = ("%b" in fmt) or ("%B" in fmt)
+
+    # dateutil reads ambiguous numeric dates month first
+    day_first = (i_day < i_month) and not month_named
+
+    def parse_format(s):
+        match = pattern.fullmatch(s)
+        if match is None:
+            raise ValueError("'{}' does not match format '{}'".format(s, fmt))
+
+        groups = match.groups()
+
+        if month_named:
+            month = _MONTHS.get(groups[i_month].lower())
+            if month is None:
+                raise ValueError("unknown month in '{}'".format(s))
+        else:
+            month = int(groups[i_month])
+
+        day = int(groups[i_day])
+        if day_first and (day <= 12):
+            raise ValueError("ambiguous day first date '{}'".format(s))
+
+        time_values = [int(groups[i]) for i in i_time]
+        if i_microsecond is not None:
+            time_values.append(int(groups[i_microsecond].ljust(6, "0")))
+
+        return dt.datetime(int(groups[i_year]), month, day, *time_values)
+
+    return parse_format
+
+
+def _shape_pattern(s: str) -> Pattern:
+    """
+    Returns compiled regex pattern matching strings with the same layout as the input string, i.e. with any digits in
+    place of its digits
+
+    :param s: input string
+    :return: compiled pattern
+    """
+
+    return re.compile(
+        "".join("[0-9]" if c in "0123456789" else re.escape(c) for c in s)
+    )
+
+
+def _parse_isoformat(s: str) -> dt.datetime:
+    """
+    Returns datetime parsed from ISO 8601 string, as the first attempt of `str2datetime`
+
+    :param s: input string
+    :return: datetime object
+    """
+
+    return dt.datetime.fromisoformat(s[:-1] if s[-1] == "Z" else s)
+
+
+def _learn_datetime_parser(
+    s: str,
+) -> Optional[Callable[[str], Union[dt.datetime, dt.time]]]:
+    """
+    Returns fast parser for strings with the same datetime format as the input string, which gives the same result as
+    `str2datetime` - parsers raise ValueError for strings that do not match the format
+
+    :param s: example datetime string
+    :return: parser function - or None if no fast parser is available for the format
+    """
+
+    strip_z = s[-1:] == "Z"
+    s_stripped = s[:-1] if strip_z else s
+
+    # ISO 8601 - str2datetime's first attempt, so no format check is required
+    try:
+        dt.datetime.fromisoformat(s_stripped)
+    except ValueError:
+        pass
+    else:
+        return _parse_isoformat
+
+    # truncated ISO 8601 datetimes and times - only parsed this way by str2datetime
+    # after earlier attempts fail, so only applied to strings of the same layout
+    shape = _shape_pattern(s)
+    for parse_truncated in (
+        lambda si: dt.datetime.fromisoformat(si[:26]),
+        lambda si: dt.time.fromisoformat(si[:15]),
+    ):
+        try:
+            parse_truncated(s_stripped)
+        except ValueError:
+            continue
+
+        def parse_shape(si, parse_truncated=parse_truncated):
+            if shape.fullmatch(si) is None:
+                raise ValueError("'{}' does not match format of '{}'".format(si, s))
+            return parse_truncated(si[:-1] if strip_z else si)
+
+        return parse_shape
+
+    # other formats - parsed by dateutil, find equivalent format to match with regex
+    try:
+        val = parse(s_stripped, fuzzy=False)
+    except (ValueError, OverflowError):
+        return None
+
+    if val.tzinfo is not None:
+        return None
+
+    for fmt in _DATETIME_FORMATS:
+        parse_format = _compile_datetime_format(fmt)
+        try:
+            if parse_format(s_stripped) != val:
+                continue
+        except ValueError:
+            continue
+
+        if not strip_z:
+            return parse_format
+
+        def parse_format_z(si, parse_format=parse_format):
+            if si[-1:] != "Z":
+                raise ValueError("'{}' does not match format of '{}'".format(si, s))
+            return parse_format(si[:-1])
+
+        return parse_format_z
+
+    return None
+
+
+def str2datetime_many(
+    values: Iterable[str], cache_size: int = 4096
+) -> List[Union[dt.datetime, dt.time]]:
+    """
+    Convert many strings of recognised datetime formats to datetime objects, equivalent to applying `str2datetime` to
+    each value.
+
+    Large collections of timestamps typically share a single format. So, the format of the first value is detected and a
+    fast parser compiled for it, which is applied to the remaining values - falling back to `str2datetime` only for
+    values that do not match this format. Repeated values are only parsed once.
+
+    :param values: input strings
+    :param cache_size: (default: 4096) maximum number of distinct values to cache parsed results for, 0 disables caching
+    :return: list of datetime objects
+    """
+
+    values = iter(values)
+    for first in values:
+        break
+    else:
+        return []
+
+    parse_fast = _learn_datetime_parser(first)
+
+    if parse_fast is None:
+        parse_value = str2datetime
+    else:
+
+        def parse_value(s):
+            try:
+                return parse_fast(s)
+            except ValueError:
+                return str2datetime(s)
+
+    # ISO 8601 parsing is cheaper than a cache lookup
+    if (cache_size > 0) and (parse_fast is not _parse_isoformat):
+        parse_value = lru_cache(maxsize=cache_size)(parse_value)
+
+    vals = [parse_value(first)]
+    vals.extend(map(parse_value, values))
+    return vals
+
+
+_MISSING = object()
+
+_UTC_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _convert_datetime_array(date_time: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Returns array of datetimes converted in bulk to `datetime64[ns]` (UTC), for arrays of `datetime64`, numeric epoch
+    timestamps (seconds) or ISO 8601 datetime strings
+
+    :param date_time: array of date times
+    :return: converted array - or None if array cannot be converted in bulk
+    """
+
+    kind = date_time.dtype.kind
+
+    if kind == "M":
+        return date_time.astype("datetime64[ns]")
+
+    if kind in "iu":
+        return (
+            date_time.astype("int64").astype("datetime64[s]").astype("datetime64[ns]")
+        )
+
+    if kind == "f":
+        if not np.all(np.isfinite(date_time)):
+            return None
+
+        # split whole/fractional seconds, to retain sub-second precision
+        seconds = np.floor(date_time)
+        ns = seconds.astype("int64") * 10**9 + np.round(
+            (date_time - seconds) * 1e9
+        ).astype("int64")
+        return ns.astype("datetime64[ns]")
+
+    if (kind == "U") and (date_time.dtype.itemsize // 4 >= 10) and (date_time.size > 0):
+        # only strings of ISO 8601 dates, i.e. "YYYY-MM-DD..." - other formats are
+        # parsed by str2datetime differently to numpy
+        chars = date_time.reshape(-1).view("U1").reshape(date_time.size, -1)
+        if not (np.all(chars[:, 4] == "-") and np.all(chars[:, 7] == "-")):
+            return None
+
+        # strip single trailing "Z", as str2datetime - other timezone designators are not handled
+        stripped = np.char.rstrip(date_time, "Z")
+        if np.any(np.char.str_len(date_time) - np.char.str_len(stripped) > 1):
+            return None
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                return np.array(stripped, dtype="datetime64[ns]")
+        except (ValueError, Warning):
+            return None
+
+    return None
+
+
+def _epoch_seconds_to_us(seconds: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Returns float epoch timestamps (seconds) as `datetime64[us]`, rounded to the microsecond as by
+    :py:meth:`datetime.datetime.fromtimestamp` (i.e. round half to even, of the fraction of a second)
+
+    :param seconds: epoch timestamps
+    :return: converted array - or None if not all timestamps are finite
+    """
+
+    if not np.all(np.isfinite(seconds)):
+        return None
+
+    frac, whole = np.modf(seconds)
+    us = np.round(frac * 1e6)
+
+    carry = (us >= 1e6).astype("int64") - (us < 0).astype("int64")
+    us = us.astype("int64") - carry * 10**6
+    return ((whole.astype("int64") + carry) * 10**6 + us).astype("datetime64[us]")
+
+
 def convert_datetime(
     date_time: Union[dt.datetime, dt.date, str, float, int, np.ndarray],
-) -> dt.datetime:
+    as_datetime64: bool = False,
+) -> Union[dt.datetime, np.datetime64, np.ndarray]:
     """
     Convert input datetimes to a datetime object
 
+    Arrays of `datetime64`, numeric epoch timestamps or ISO 8601 datetime strings are converted in bulk (other arrays
+    are converted element by element).
+
     :param date_time: date time to convert to a datetime object
+    :param as_datetime64: (default: False) option to return `datetime64[ns]` (UTC) values, rather than datetime
+        objects - much more compact and faster for large arrays
     :return: datetime object corresponding to input date_time
     """
     if isinstance(date_time, np.ndarray):
+        date_time_ns = _convert_datetime_array(date_time)
+
+        if (date_time_ns is not None) and as_datetime64:
+            return date_time_ns
+
+        date_time_us = None
+        if date_time_ns is not None:
+            if date_time.dtype.kind == "f":
+                # rounded as the float seconds of the scalar path
+                date_time_us = _epoch_seconds_to_us(date_time.astype("float64"))
+            elif date_time.dtype.kind == "M":
+                date_time_us = _epoch_seconds_to_us(
+                    (date_time - np.datetime64(0, "s")) / np.timedelta64(1, "s")
+                )
+            else:
+                date_time_us = date_time_ns.astype("datetime64[us]")
+
+        if date_time_us is not None:
+            # offset from the UTC epoch, as timedelta objects, added to a timezone
+            # aware epoch datetime - avoids setting the tzinfo of each element
+            offsets = date_time_us - np.datetime64(0, "us")
+            if offsets.ndim == 0:
+                return _UTC_EPOCH + dt.timedelta(
+                    microseconds=int(offsets.astype("int64"))
+                )
+            return offsets.astype(object) + _UTC_EPOCH
+
         date_time_out = np.array(
-            [convert_datetime(date_time_i) for date_time_i in date_time]
+            [convert_datetime(date_time_i, as_datetime64) for date_time_i in date_time]
         )
+        if as_datetime64:
+            return date_time_out
+
     elif isinstance(date_time, (dt.datetime, dt.time)):
         date_time_out = date_time
     elif isinstance(date_time, dt.date):
@@ -122,11 +518,109 @@ def convert_datetime(
     elif date_time_out.tzinfo is None:
         date_time_out = date_time_out.replace(tzinfo=dt.timezone.utc)
 
+    if as_datetime64 and not isinstance(date_time_out, np.ndarray):
+        return np.datetime64(
+            date_time_out.astimezone(dt.timezone.utc).replace(tzinfo=None), "ns"
+        )
+
     return date_time_out
 
 
+def _utc_minutes_elementwise(utc: np.ndarray) -> np.ndarray:
+    """
+    Returns time of day in minutes, for array of times of day - parsed element by element, as scalar
+    `datetime_from_yearday` inputs
+
+    :param utc: array of times of day
+    :return: array of minutes of the day
+    """
+
+    minutes = [
+        (d.hour * 60 + d.minute)
+        for d in (datetime_from_yearday(1970, 1, u) for u in utc.reshape(-1))
+    ]
+    return np.array(minutes, dtype=np.int64).reshape(utc.shape)
+
+
+def _utc_minutes_array(utc: np.ndarray) -> np.ndarray:
+    """
+    Returns time of day in minutes, for array of times of day as HHMM numbers, "HHMM"/"HH:MM" strings or `datetime64`
+    values
+
+    :param utc: array of times of day
+    :return: array of minutes of the day
+    """
+
+    kind = utc.dtype.kind
+
+    if kind == "O":
+        return _utc_minutes_elementwise(utc)
+
+    if kind == "M":
+        day = utc.astype("datetime64[D]")
+        return (utc - day).astype("timedelta64[m]").astype(np.int64)
+
+    if kind in "US":
+        utc_str = np.char.replace(utc.astype("U"), ":", "")
+        lengths = np.char.str_len(utc_str)
+
+        if np.any(lengths < 4):
+            return _utc_minutes_elementwise(utc)
+
+        if np.any(lengths > 4):
+            warnings.warn("seconds provided - slicing to hours/minutes")
+            utc_str = utc_str.astype("U4")
+
+        chars = utc_str.reshape(-1).view("U1")
+        if not np.all((chars >= "0") & (chars <= "9")):
+            raise ValueError("time data does not match format 'HHMM'")
+
+        utc = utc_str.astype(np.int64)
+
+    elif kind in "iuf":
+        if not np.all(np.isfinite(utc) & (utc >= 0)):
+            raise ValueError("time data does not match format 'HHMM'")
+
+        utc = np.trunc(utc).astype(np.int64)
+
+    else:
+        raise TypeError("unsupported utc array dtype '{}'".format(utc.dtype))
+
+    hours, minutes = np.divmod(utc, 100)
+    if np.any(hours > 23) or np.any(minutes > 59):
+        raise ValueError("time data does not match format 'HHMM'")
+
+    return hours * 60 + minutes
+
+
 def datetime_from_yearday(year, doy, utc):
-    """ """
+    """
+    Returns datetime from year, day of year and time of day (to the minute)
+
+    Any of the inputs may be numpy arrays, in which case the datetimes are computed in bulk and returned as an array of
+    `datetime64[ns]` values (with the broadcast shape of the inputs). In arrays, numeric time of day values are
+    interpreted as HHMM, e.g. 930 is 09:30.
+
+    :param year: year
+    :param doy: day of year, where 1 is January 1st
+    :param utc: time of day, as HHMM number, "HHMM"/"HH:MM" string (seconds are ignored, with a warning) or datetime
+        object
+    :return: datetime object - or array of `datetime64[ns]` values for array inputs
+    """
+
+    if any(isinstance(v, np.ndarray) for v in (year, doy, utc)):
+        year, doy, utc = np.broadcast_arrays(
+            np.asarray(year), np.asarray(doy), np.asarray(utc)
+        )
+
+        years = np.trunc(year).astype(np.int64) - 1970
+        days = np.trunc(doy).astype(np.int64) - 1
+
+        return (
+            years.astype("datetime64[Y]").astype("datetime64[D]")
+            + days.astype("timedelta64[D]")
+            + _utc_minutes_array(utc).astype("timedelta64[m]")
+        ).astype("datetime64[ns]")
 
     if isinstance(utc, str):
         if ":" in utc:
@@ -150,102 +644,598 @@ def datetime_from_yearday(year, doy, utc):
     return dt.datetime(int(year), 1, 1, utc.hour, utc.minute) + doyDelta
 
 
-def val_format(s):
+# token patterns that can be classified without exception-driven parsing
+_FLOAT_PATTERN = r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+_INT_RE = re.compile(r"[+-]?[0-9]+")
+_FLOAT_RE = re.compile(_FLOAT_PATTERN)
+_NUMERIC_LIST_RE = re.compile(r"{0}(?:;{0})+".format(_FLOAT_PATTERN))
+_ISO_DATETIME_RE = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?:T[0-9]{2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]{1,6})?)?)?Z?"
+)
+_ISO_TIME_RE = re.compile(r"[0-9]{2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]{1,12})?)?Z?")
+_DIGIT_RE = re.compile(r"\d")
+_WORD_RE = re.compile(r"[^\W\d_]+")
+# characters that dateutil's parser (without fuzzy) rejects
+_NON_DATETIME_CHAR_RE = re.compile(r"[^\w\s.,;\-/':+]|_")
+
+
+def _dateutil_words() -> frozenset:
+    """
+    Returns the (lower case) words recognised by dateutil's parser
+
+    :return: set of words
+    """
+
+    info = parserinfo()
+    words = set(w for w in info.JUMP + info.UTCZONE + info.PERTAIN)
+    for names in info.WEEKDAYS + info.MONTHS + info.HMS + info.AMPM:
+        words.update(names)
+    return frozenset(w.lower() for w in words)
+
+
+_DATEUTIL_WORDS = _dateutil_words()
+_DATEUTIL_DATE_WORDS = frozenset(
+    w.lower() for names in parserinfo.WEEKDAYS + parserinfo.MONTHS for w in names
+)
+
+
+def _may_be_datetime(s: str) -> bool:
+    """
+    Return whether a string may be a datetime, i.e. is not ruled out by cheap checks of the characters and words
+    dateutil's parser accepts
+
+    :param s: input string
+    :return: bool
+    """
+
+    words = _WORD_RE.findall(s)
+
+    # without digits, only weekday or month names define a date
+    if (_DIGIT_RE.search(s) is None) and not any(
+        w.lower() in _DATEUTIL_DATE_WORDS for w in words
+    ):
+        return False
+
+    if _NON_DATETIME_CHAR_RE.search(s) is not None:
+        return False
+
+    # other words may only be timezone names, e.g. "BST"
+    return all(
+        (w.lower() in _DATEUTIL_WORDS)
+        or ((len(w) <= 5) and w.isascii() and w.isupper())
+        for w in words
+    )
+
+
+@lru_cache(maxsize=8192)
+def _format_token(s: str) -> Union[int, float, dt.datetime, dt.time, str]:
+    """
+    Change recognised format of single input string token into different type, as `val_format`
+
+    :param s: input string token
+    :return: newly formatted value (or original string)
+    """
+
+    if _INT_RE.fullmatch(s) is not None:
+        return int(s)
+
+    if _FLOAT_RE.fullmatch(s) is not None:
+        return float(s)
+
+    if _ISO_DATETIME_RE.fullmatch(s) is not None:
+        try:
+            return _parse_isoformat(s)
+        except ValueError:
+            pass
+
+    elif _ISO_TIME_RE.fullmatch(s) is not None:
+        try:
+            return str2datetime(s)
+        except ValueError:
+            pass
+
+    # uncommon formats, e.g. with whitespace or underscores
+    try:
+        return int(s)
+    except ValueError:
+        if is_number(s):
+            return float(s)
+
+    if _may_be_datetime(s) and is_datetime(s):
+        return str2datetime(s)
+
+    return s
+
+
+def val_format(s, as_array: bool = False):
     """
     Change recognised formats of input strings into different types
 
+    Strings are split into tokens on ";" (or otherwise " "), which are converted to `int`, `float` or datetime values
+    where possible.
+
     :param s: input value
+    :param as_array: (default: False) option to return numeric values of ";" separated lists as numpy arrays, rather
+        than lists
     :return: newly formatted string (or original input value)
     """
-    if type(s) is str:
-        v = s.split(";")
-        if len(v) == 1:
-            v = v[0].split(" ")
-        if len(v) == 1:
-            try:
-                val = int(v[0])
-            except ValueError:
-                if is_number(v[0]):
-                    val = float(v[0])
-                elif is_datetime(v[0]):
-                    val = str2datetime(v[0])
-                else:
-                    val = v[0]
-        else:
-            val = [0] * len(v)
-            for i, vi in enumerate(v):
-                try:
-                    val[i] = int(v[i])
-                except ValueError:
-                    if is_number(vi):
-                        val[i] = float(vi)
-                    elif is_datetime(vi):
-                        val[i] = str2datetime(vi)
-                    else:
-                        val[i] = vi
-            if all([type(j) for j in val]) is True and type(val[0]) is str:
-                if "=" not in val[0]:
-                    val = " ".join(
-                        [str(k) for k in val]
-                    )  # if all values are string and not key_value pairs .join()
-                else:
-                    val = {}
-                    for vi in v:
-                        k, vv = vi.split("=")
-                        val[k] = val_format(vv)
-            elif (
-                any([type(j) is str for j in val]) is False
-                and any([type(j) is dt.datetime for j in val]) is False
-                and all([type(j) for j in val]) is False
-            ):
-                val = [float(j) for j in val]
-    else:
-        val = s
+    if type(s) is not str:
+        return s
+
+    v = s.split(";")
+    is_semicolon_list = len(v) > 1
+
+    if as_array and is_semicolon_list and (_NUMERIC_LIST_RE.fullmatch(s) is not None):
+        is_int = [_INT_RE.fullmatch(vi) is not None for vi in v]
+        try:
+            if all(is_int):
+                return np.array(v, dtype=np.int64)
+
+            # ints beyond int64 would otherwise give object arrays
+            if not any(i and len(vi) > 18 for i, vi in zip(is_int, v)):
+                return np.array(v, dtype=np.float64)
+        except OverflowError:
+            pass
+
+    if len(v) == 1:
+        v = v[0].split(" ")
+    if len(v) == 1:
+        return _format_token(v[0])
+
+    val = [_format_token(vi) for vi in v]
+
+    if type(val[0]) is str:
+        if "=" not in val[0]:
+            # if first value is string and not key_value pair .join()
+            return " ".join([str(k) for k in val])
+
+        val_dict = {}
+        for vi in v:
+            k, vv = vi.split("=")
+            val_dict[k] = val_format(vv, as_array)
+        return val_dict
+
+    if as_array and is_semicolon_list and all(type(j) in (int, float) for j in val):
+        return np.array(val)
+
     return val
 
 
-# todo - look into nested dictionaries
-def list_to_dict(test_list, key=None) -> dict:
+def val_format_many(values: Iterable, as_array: bool = False) -> list:
+    """
+    Change recognised formats of many input strings into different types, as `val_format`
+
+    Repeated values are only converted once.
+
+    :param values: input values
+    :param as_array: (default: False) option to return numeric values of ";" separated lists as numpy arrays, rather
+        than lists
+    :return: list of newly formatted values
+    """
+
+    vals = []
+    converted: dict = {}
+    for s in values:
+        if type(s) is not str:
+            vals.append(s)
+            continue
+
+        val = converted.get(s, _MISSING)
+        if val is _MISSING:
+            val = val_format(s, as_array)
+            if not isinstance(val, (list, dict, np.ndarray)):
+                converted[s] = val
+        vals.append(val)
+
+    return vals
+
+
+def list_to_dict(test_list, key=None, convert: bool = False) -> dict:
     """
     Convert a list of tuples into a dictionary, based on 'GROUP' and 'END_GROUP' values
 
-    :param test_list: list of tuples containing (key, value), ("GROUP", key) and ("END_GROUP", key) tuples
-    :param key: key of the dictionary into which subsequent key-value pairs are added
+    Entries are processed in a single pass, with a stack of the open groups - so nested groups are returned as nested
+    dictionaries. Entries outside of any group are ignored.
+
+    :param test_list: list (or other iterable) of tuples containing (key, value), ("GROUP", key) and ("END_GROUP", key)
+        tuples
+    :param key: key of the dictionary into which subsequent key-value pairs are added, i.e. entries start within this
+        group - if defined, returns at its 'END_GROUP'
+    :param convert: (default: False) option to convert values to recognised types with `val_format`
     :return d: dictionary containing test_list key-value pairs
     """
     d: dict = {}
-    for i, e in enumerate(test_list):
+
+    # open groups, as (group name, group dictionary)
+    stack: List[Tuple[Any, dict]] = []
+    if key is not None:
+        stack.append((key, d))
+
+    for e in test_list:
         if e[0] == "GROUP":
-            key = e[1]
-            values = [list(j.keys()) for k, j in enumerate(list(d.values())) if k == 0]
-            if len(values) == 0 or key not in values[0]:
-                d[key] = list_to_dict(test_list[i + 1 :], key)
-            key = None
-        elif e[0] == "END_GROUP" and e[1] == key:
-            return d
-        elif key is not None:
-            d.update({e[0]: e[1]})
-        else:
-            pass
+            group: dict = {}
+            (stack[-1][1] if stack else d)[e[1]] = group
+            stack.append((e[1], group))
+        elif e[0] == "END_GROUP":
+            # close the matching group, and any unclosed groups within it
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == e[1]:
+                    del stack[i:]
+                    break
+
+            if (key is not None) and not stack:
+                return d
+        elif stack:
+            stack[-1][1][e[0]] = val_format(e[1]) if convert else e[1]
+
     return d
 
 
-def txt_to_dict(txt_filepath):
+def _read_lines(path: str, use_mmap: bool = False) -> Iterator[str]:
+    """
+    Yields lines of text file, read lazily
+
+    :param path: text file path
+    :param use_mmap: (default: False) option to read file by memory-mapping it - for very large files
+    :return: lines of file
+    """
+
+    if not use_mmap:
+        with open(path) as f:
+            yield from f
+        return
+
+    encoding = locale.getpreferredencoding(False)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line.decode(encoding)
+
+
+def _iter_txt_entries(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (key, value) entries of lines of text file with format "key = value"
+
+    :param lines: lines of text file
+    :return: entries of lines with a single "=" (other lines are skipped)
+    """
+
+    for line in lines:
+        parts = line.strip().split("=")
+        if len(parts) == 2:
+            yield parts[0].strip().strip('"'), parts[1].strip().strip('"')
+
+
+def txt_to_dict(txt_filepath, convert: bool = False, use_mmap: bool = False) -> dict:
     """
     Read in text file into a dictionary
 
+    The file is read line by line and parsed in a single pass, so memory use and time are linear in the file size.
+
     :param txt_filepath: text file filepath from which to read
+    :param convert: (default: False) option to convert values to recognised types with `val_format`
+    :param use_mmap: (default: False) option to read file by memory-mapping it - for very large files
+    :return: dictionary of file entries, with a nested dictionary per group
     """
-    with open(txt_filepath) as mtl:
-        lines = mtl.readlines()
 
-    elements = [
-        (j[0].strip().strip('""'), j[1].strip().strip('""'))
-        for j in [i.strip().split("\n")[0].split("=") for i in lines]
-        if len(j) == 2
-    ]
+    return list_to_dict(
+        _iter_txt_entries(_read_lines(txt_filepath, use_mmap)), convert=convert
+    )
+
+
+class IngestStats:
+    """
+    Throughput statistics of bulk reading of files with
+    :py:func:`txt_to_dict_many <processor_tools.utils.formatters.txt_to_dict_many>`, updated as results are returned
+    """
+
+    def __init__(self):
+        self.n_files = 0
+        self.n_cached = 0
+        self.n_bytes = 0
+        self.elapsed = 0.0
+        self._start: Optional[float] = None
+
+    def _update(self, n_bytes: int, cached: bool) -> None:
+        """
+        Adds returned file to statistics
+
+        :param n_bytes: file size
+        :param cached: whether file was returned from cache
+        """
+
+        self.n_files += 1
+        self.n_cached += int(cached)
+        self.n_bytes += n_bytes
+        if self._start is not None:
+            self.elapsed = time.perf_counter() - self._start
+
+    @property
+    def files_per_second(self) -> float:
+        """
+        Returns number of files returned per second
+
+        :return: files per second
+        """
+        return self.n_files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """
+        Returns megabytes (10^6 bytes) of files returned per second
+
+        :return: MB per second
+        """
+        return self.n_bytes / 1e6 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            "IngestStats(n_files={}, n_cached={}, n_bytes={}, elapsed={:.3f})".format(
+                self.n_files, self.n_cached, self.n_bytes, self.elapsed
+            )
+        )
+
+    def __str__(self) -> str:
+        return "{} files ({} cached), {:.1f} MB in {:.2f}s: {:.1f} files/s, {:.2f} MB/s".format(
+            self.n_files,
+            self.n_cached,
+            self.n_bytes / 1e6,
+            self.elapsed,
+            self.files_per_second,
+            self.mb_per_second,
+        )
+
+
+# tags of values stored in the txt_to_dict cache as json objects, e.g. {"$time": "10:30:00"}
+_CACHE_DECODERS: Dict[str, Callable[[str], Any]] = {
+    "$datetime": dt.datetime.fromisoformat,
+    "$date": dt.date.fromisoformat,
+    "$time": dt.time.fromisoformat,
+}
+
+
+def _to_cache_value(value: Any) -> Any:
+    """
+    Returns value read from text file as json-serialisable value, for the txt_to_dict cache - dates/times are tagged,
+    and dictionary keys beginning "$" are escaped (with a further "$")
+
+    :param value: value
+    :return: json-serialisable value
+    """
+
+    if isinstance(value, dict):
+        return {
+            ("$" + k if k.startswith("$") else k): _to_cache_value(v)
+            for k, v in value.items()
+        }
+
+    if isinstance(value, list):
+        return [_to_cache_value(v) for v in value]
+
+    if isinstance(value, dt.datetime):
+        return {"$datetime": value.isoformat()}
+
+    if isinstance(value, dt.date):
+        return {"$date": value.isoformat()}
+
+    if isinstance(value, dt.time):
+        return {"$time": value.isoformat()}
+
+    return value
+
+
+def _from_cache_object(obj: Dict[str, Any]) -> Any:
+    """
+    Returns value of json object from the txt_to_dict cache, reversing :py:func:`_to_cache_value`
+
+    :param obj: decoded json object
+    :return: value
+    """
+
+    if len(obj) == 1:
+        key, value = next(iter(obj.items()))
+        if key in _CACHE_DECODERS:
+            return _CACHE_DECODERS[key](value)
+
+    return {(k[1:] if k.startswith("$") else k): v for k, v in obj.items()}
+
+
+class _TxtDictCache:
+    """
+    On-disk (sqlite) cache of dictionaries read from text files, keyed by file path, modification time and size
+
+    Dictionaries are stored as json, so reading the cache cannot execute code - though cached values are trusted as the
+    content of the files, so the cache should be kept where only its owner can write to it.
+
+    :param path: cache database path
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS txt_dicts_json ("
+            "path TEXT, convert INTEGER, mtime_ns INTEGER, size INTEGER, data TEXT, "
+            "PRIMARY KEY (path, convert))"
+        )
+        self.connection.commit()
+        self._n_pending = 0
+
+    def contains(self, path: str, convert: bool, stat: os.stat_result) -> bool:
+        """
+        Returns whether cache has dictionary for file, and the file is unchanged
+
+        :param path: absolute file path
+        :param convert: whether values were converted
+        :param stat: current file stat
+        :return: cached flag
+        """
+
+        row = self.connection.execute(
+            "SELECT mtime_ns, size FROM txt_dicts_json WHERE path = ? AND convert = ?",
+            (path, int(convert)),
+        ).fetchone()
+
+        return (
+            (row is not None)
+            and (row[0] == stat.st_mtime_ns)
+            and (row[1] == stat.st_size)
+        )
+
+    def get(self, path: str, convert: bool, stat: os.stat_result) -> Optional[dict]:
+        """
+        Returns cached dictionary for file, if file is unchanged
+
+        :param path: absolute file path
+        :param convert: whether values were converted
+        :param stat: current file stat
+        :return: cached dictionary - or None if not cached
+        """
+
+        row = self.connection.execute(
+            "SELECT mtime_ns, size, data FROM txt_dicts_json WHERE path = ? AND convert = ?",
+            (path, int(convert)),
+        ).fetchone()
+
+        if (row is None) or (row[0] != stat.st_mtime_ns) or (row[1] != stat.st_size):
+            return None
+
+        return json.loads(row[2], object_hook=_from_cache_object)
+
+    def put(self, path: str, convert: bool, stat: os.stat_result, d: dict) -> None:
+        """
+        Adds dictionary for file to cache (committed in batches)
+
+        :param path: absolute file path
+        :param convert: whether values were converted
+        :param stat: file stat
+        :param d: dictionary read from file
+        """
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO txt_dicts_json VALUES (?, ?, ?, ?, ?)",
+            (
+                path,
+                int(convert),
+                stat.st_mtime_ns,
+                stat.st_size,
+                json.dumps(_to_cache_value(d)),
+            ),
+        )
+
+        self._n_pending += 1
+        if self._n_pending >= 1000:
+            self.commit()
+
+    def commit(self) -> None:
+        """
+        Commits pending cache entries
+        """
+        self.connection.commit()
+        self._n_pending = 0
+
+    def close(self) -> None:
+        """
+        Commits pending cache entries and closes cache
+        """
+        self.commit()
+        self.connection.close()
+
+
+def txt_to_dict_many(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = None,
+    convert: bool = False,
+    use_mmap: bool = False,
+    chunksize: int = 16,
+    stats: Optional[IngestStats] = None,
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Read in many text files into dictionaries, as `txt_to_dict`, in parallel - yielding results as they are read
+
+    Files are read in a pool of processes. Optionally, read dictionaries are cached on disk, so unchanged files are not
+    re-read - a file is re-read if its modification time or size has changed.
+
+    Uncached files are submitted to the pool first, so they are read while the results for cached files are yielded -
+    followed by the results of read files (in the order of `paths`).
+
+    :param paths: text file paths
+    :param workers: number of processes to read files with (default: number of CPUs), if 1 files are read in the current
+        process
+    :param cache_path: path of cache database file (created if it doesn't exist), default no caching
+    :param convert: (default: False) option to convert values to recognised types with `val_format`
+    :param use_mmap: (default: False) option to read files by memory-mapping them - for very large files
+    :param chunksize: number of files sent to processes at a time
+    :param stats: throughput statistics object, updated as files are returned
+    :return: iterator of (path, dictionary) tuples
+    """
+
+    if stats is None:
+        stats = IngestStats()
+    stats._start = time.perf_counter() - stats.elapsed
+
+    cache = _TxtDictCache(cache_path) if cache_path is not None else None
+
+    try:
+        cached = []
+        to_read = []
+        for path in paths:
+            stat = os.stat(path)
+
+            if (cache is not None) and cache.contains(
+                os.path.abspath(path), convert, stat
+            ):
+                cached.append((path, stat))
+            else:
+                to_read.append((path, stat))
+
+        read = partial(txt_to_dict, convert=convert, use_mmap=use_mmap)
+        read_paths = [path for path, stat in to_read]
+
+        # uncached files are submitted before cached results are yielded
+        pool_results: Optional[Generator[dict, None, None]] = None
+        executor = None
+        if (workers == 1) or (len(to_read) <= 1):
+            results: Iterator[dict] = map(read, read_paths)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            # Executor.map returns a generator, closed to cancel pending reads
+            pool_results = cast(
+                Generator[dict, None, None],
+                executor.map(read, read_paths, chunksize=chunksize),
+            )
+            results = pool_results
+
+        try:
+            for path, stat in cached:
+                d = None
+                if cache is not None:
+                    d = cache.get(os.path.abspath(path), convert, stat)
+                if d is None:
+                    # removed from cache since checked
+                    d = read(path)
+                stats._update(stat.st_size, True)
+                yield path, d
+
+            for (path, stat), d in zip(to_read, results):
+                if cache is not None:
+                    cache.put(os.path.abspath(path), convert, stat, d)
+
+                stats._update(stat.st_size, False)
+                yield path, d
+        finally:
+            if pool_results is not None:
+                # cancels pending reads, if iteration stopped early
+                pool_results.close()
+            if executor is not None:
+                executor.shutdown()
 
-    return list_to_dict(elements)
+    finally:
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
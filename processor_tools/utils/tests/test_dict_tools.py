@@ -135,6 +135,216 @@ class MyDictTools(unittest.TestCase):
 
         self.assertEqual(list(get_value_gen(input_6, "Science")), output_6)
 
+    def test_get_values(self):
+        input_1 = {
+            "Labs": {
+                "Ground_Floor": [{"Science": "G1", "Art": []}],
+                "First_Floor": [{"Science": "F1", "Art": []}],
+            },
+            "Subjects": {"Science": "Triple", "Maths": {"Maths": "nested"}},
+        }
+
+        self.assertEqual(
+            get_values(input_1, ["Science", "Maths", "Ground_Floor"], multiple=True),
+            {
+                "Science": [
+                    ("Science", "G1"),
+                    ("Science", "F1"),
+                    ("Science", "Triple"),
+                ],
+                "Maths": [("Maths", {"Maths": "nested"})],
+                "Ground_Floor": [("Ground_Floor", [{"Science": "G1", "Art": []}])],
+            },
+        )
+        self.assertEqual(
+            get_values(input_1, ["Art", "Maths", "Storage"]),
+            {"Art": [], "Maths": {"Maths": "nested"}, "Storage": None},
+        )
+
+    def test_get_values_copy(self):
+        input_1 = {"Rooms": {"Ground_Floor": ["A1"]}}
+
+        self.assertIs(
+            get_values(input_1, ["Ground_Floor"])["Ground_Floor"],
+            input_1["Rooms"]["Ground_Floor"],
+        )
+        self.assertIsNot(
+            get_values(input_1, ["Ground_Floor"], copy=True)["Ground_Floor"],
+            input_1["Rooms"]["Ground_Floor"],
+        )
+
+    def test_get_values_deep(self):
+        input_1: dict = {}
+        node = input_1
+        for i in range(5000):
+            node["Level"] = {}
+            node = node["Level"]
+        node["Ground_Floor"] = "A1"
+
+        self.assertEqual(get_values(input_1, ["Ground_Floor"]), {"Ground_Floor": "A1"})
+
+
+class TestKeyIndex(unittest.TestCase):
+    def setUp(self):
+        self.input_dict = {
+            "Labs": {
+                "Ground_Floor": [{"Science": "G1", "Art": []}],
+                "First_Floor": [{"Science": "F1", "Art": []}],
+            },
+            "Subjects": {"Science": {"Science": "nested"}, "Maths": [1, 2]},
+        }
+
+    def test_items(self):
+        index = KeyIndex(self.input_dict)
+
+        for key in ["Science", "Art", "Ground_Floor", "Maths", "Storage"]:
+            self.assertEqual(
+                index.items(key), list(get_value_gen(self.input_dict, key))
+            )
+
+    def test_items_reference(self):
+        index = KeyIndex(self.input_dict)
+
+        self.assertIs(index.items("Maths")[0][1], self.input_dict["Subjects"]["Maths"])
+        self.assertIsNot(
+            index.items("Maths", copy=True)[0][1], self.input_dict["Subjects"]["Maths"]
+        )
+
+    def test_paths(self):
+        index = KeyIndex(self.input_dict)
+
+        self.assertEqual(
+            index.paths("Science"),
+            [
+                ("Labs", "Ground_Floor", 0, "Science"),
+                ("Labs", "First_Floor", 0, "Science"),
+                ("Subjects", "Science"),
+            ],
+        )
+        self.assertEqual(index.paths("Storage"), [])
+        self.assertIn("Art", index)
+        self.assertNotIn("Storage", index)
+
+    def test_get_value(self):
+        index = KeyIndex(self.input_dict)
+
+        self.assertEqual(index.get_value("Maths"), [1, 2])
+        self.assertEqual(
+            index.get_value("Science", multiple=True),
+            get_value(self.input_dict, "Science", multiple=True),
+        )
+        self.assertEqual(get_value(index, "Maths"), [1, 2])
+        self.assertIsNone(index.get_value("Storage"))
+
+    def test_update(self):
+        index = KeyIndex(self.input_dict)
+
+        self.input_dict["Labs"]["Ground_Floor"].append({"Science": "G2"})
+        self.input_dict["Labs"]["Basement"] = {"Art": "B1"}
+        index.update(("Labs",))
+
+        for key in ["Science", "Art", "Basement"]:
+            self.assertEqual(
+                index.items(key), list(get_value_gen(self.input_dict, key))
+            )
+
+    def test_update_all(self):
+        index = KeyIndex(self.input_dict)
+
+        del self.input_dict["Labs"]
+        index.update()
+
+        self.assertEqual(index.keys(), ["Subjects", "Science", "Maths"])
+
+
+class TestSelect(unittest.TestCase):
+    def setUp(self):
+        self.input_dict = {
+            "LEVEL1_RADIOMETRIC_RESCALING": {
+                "RADIANCE_MULT_BAND_1": 0.01,
+                "RADIANCE_MULT_BAND_2": 0.02,
+                "RADIANCE_ADD_BAND_1": -60.0,
+            },
+            "PRODUCT_METADATA": {
+                "SCENE_1": {"SCENE_CENTER_TIME": "10:30:00"},
+                "SCENE_2": {"SCENE_CENTER_TIME": "10:31:00"},
+            },
+            "BANDS": [{"ID": 1}, {"ID": 2, "NAME": {"ID": "nested"}}],
+            "A.B": "dotted",
+        }
+
+    def test_select_key(self):
+        self.assertEqual(
+            list(select(self.input_dict, "PRODUCT_METADATA.SCENE_1.SCENE_CENTER_TIME")),
+            ["10:30:00"],
+        )
+        self.assertEqual(list(select(self.input_dict, '"A.B"')), ["dotted"])
+        self.assertEqual(list(select(self.input_dict, "PRODUCT_METADATA.SCENE_3")), [])
+
+    def test_select_wildcard(self):
+        self.assertEqual(
+            list(select(self.input_dict, "PRODUCT_METADATA.*.SCENE_CENTER_TIME")),
+            ["10:30:00", "10:31:00"],
+        )
+
+    def test_select_descendants(self):
+        self.assertEqual(
+            list(select(self.input_dict, "**.ID", with_paths=True)),
+            [
+                (("BANDS", 0, "ID"), 1),
+                (("BANDS", 1, "ID"), 2),
+                (("BANDS", 1, "NAME", "ID"), "nested"),
+            ],
+        )
+
+    def test_select_glob(self):
+        self.assertEqual(
+            list(
+                select(
+                    self.input_dict,
+                    "LEVEL1_RADIOMETRIC_RESCALING.RADIANCE_MULT_BAND_*",
+                )
+            ),
+            [0.01, 0.02],
+        )
+
+    def test_select_regex(self):
+        self.assertEqual(
+            list(
+                select(
+                    self.input_dict,
+                    "LEVEL1_RADIOMETRIC_RESCALING./RADIANCE_(MULT|ADD)_BAND_1/",
+                )
+            ),
+            [0.01, -60.0],
+        )
+
+    def test_select_index(self):
+        self.assertEqual(list(select(self.input_dict, "BANDS[1].ID")), [2])
+        self.assertEqual(list(select(self.input_dict, "BANDS.0.ID")), [1])
+        self.assertEqual(list(select(self.input_dict, "BANDS[*].ID")), [1, 2])
+        self.assertEqual(list(select(self.input_dict, "BANDS[-1].ID")), [2])
+        self.assertEqual(list(select(self.input_dict, "BANDS[2].ID")), [])
+
+    def test_select_lazy(self):
+        values = select(self.input_dict, "**")
+
+        self.assertIs(next(values), self.input_dict)
+
+    def test_compile_selector(self):
+        selector = compile_selector("PRODUCT_METADATA.*.SCENE_CENTER_TIME")
+
+        self.assertIs(
+            compile_selector("PRODUCT_METADATA.*.SCENE_CENTER_TIME"), selector
+        )
+        self.assertEqual(
+            list(select(self.input_dict, selector)), ["10:30:00", "10:31:00"]
+        )
+
+    def test_compile_selector_invalid(self):
+        for selector in ["A..B", "A.", "A[x]", "A[0", "/(/", '"A']:
+            self.assertRaises(ValueError, compile_selector, selector)
+
 
 if __name__ == "__main__":
     unittest.main()
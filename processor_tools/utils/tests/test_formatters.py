@@ -1,6 +1,10 @@
 """processor_tools.utils.tests.test_formatters - test for processor_tools.utils.formatters"""
 
 import datetime as dt
+import os
+import random
+import shutil
+import string
 import numpy as np
 import unittest
 import unittest.mock as mock
@@ -12,6 +16,78 @@ __author__ = "Mattea Goalen <mattea.goalen@npl.co.uk>"
 __all__ = []
 
 
+def val_format_reference(s):
+    """Reference implementation of val_format, prior to tokenizer optimisation"""
+    if type(s) is str:
+        v = s.split(";")
+        if len(v) == 1:
+            v = v[0].split(" ")
+        if len(v) == 1:
+            try:
+                val = int(v[0])
+            except ValueError:
+                if is_number(v[0]):
+                    val = float(v[0])
+                elif is_datetime(v[0]):
+                    val = str2datetime(v[0])
+                else:
+                    val = v[0]
+        else:
+            val = [0] * len(v)
+            for i, vi in enumerate(v):
+                try:
+                    val[i] = int(v[i])
+                except ValueError:
+                    if is_number(vi):
+                        val[i] = float(vi)
+                    elif is_datetime(vi):
+                        val[i] = str2datetime(vi)
+                    else:
+                        val[i] = vi
+            if all([type(j) for j in val]) is True and type(val[0]) is str:
+                if "=" not in val[0]:
+                    val = " ".join([str(k) for k in val])
+                else:
+                    val = {}
+                    for vi in v:
+                        k, vv = vi.split("=")
+                        val[k] = val_format_reference(vv)
+    else:
+        val = s
+    return val
+
+
+VAL_FORMAT_TOKENS = [
+    "0",
+    "-3",
+    "+7",
+    "007",
+    "1.5",
+    ".5",
+    "5.",
+    "1e5",
+    "-2.5E+3",
+    "inf",
+    "1_000",
+    "1e",
+    "-",
+    "",
+    "2022-06-15",
+    "2022-06-15T10:30:00Z",
+    "2022-06-15T10:30:00.123456",
+    "2022-13-01",
+    "10:30:00",
+    "2022/06/15",
+    "June",
+    "at",
+    "5th",
+    "LC08_L1TP_2022",
+    "text",
+    "x=1",
+    "99999999999999999999",
+]
+
+
 class TestFormatters(unittest.TestCase):
     def test_is_number_int(self):
         self.assertTrue(is_number("9"))
@@ -64,6 +140,53 @@ class TestFormatters(unittest.TestCase):
             str2datetime("20:23:47.11135654Z"), dt.time(20, 23, 47, 111356)
         )
 
+    def test_str2datetime_many_iso(self):
+        values = ["2022-09-10T20:23:47Z", "2022-09-10T20:23:48.5Z", "2022-09-10"]
+        self.assertEqual(str2datetime_many(values), [str2datetime(v) for v in values])
+
+    def test_str2datetime_many_time(self):
+        values = ["20:23:47.11135654Z", "20:23:48.11135654Z", "20:23:48"]
+        self.assertEqual(str2datetime_many(values), [str2datetime(v) for v in values])
+
+    def test_str2datetime_many_format(self):
+        values = [
+            "15/06/2022 10:30:00",
+            "16/06/2022 10:30:01",
+            "01/07/2022 10:30:02",
+            "2022/07/01 10:30:03",
+            "02 Jul 2022",
+        ]
+
+        # ambiguous dates read month first, as dateutil
+        self.assertEqual(
+            str2datetime_many(values),
+            [
+                dt.datetime(2022, 6, 15, 10, 30, 0),
+                dt.datetime(2022, 6, 16, 10, 30, 1),
+                dt.datetime(2022, 1, 7, 10, 30, 2),
+                dt.datetime(2022, 7, 1, 10, 30, 3),
+                dt.datetime(2022, 7, 2),
+            ],
+        )
+
+    @mock.patch("processor_tools.utils.formatters.str2datetime", wraps=str2datetime)
+    def test_str2datetime_many_fallback(self, mock_str2datetime):
+        values = ["Jun 15 2022 10:30", "Jun 15 2022 10:30", "Jun 16 2022 10:30"]
+        values += ["2022-06-17"]
+
+        vals = str2datetime_many(values)
+
+        self.assertEqual(vals[:3], [str2datetime(v) for v in values[:3]])
+        self.assertEqual(vals[3], dt.datetime(2022, 6, 17))
+
+        # only mismatched value parsed with str2datetime
+        mock_str2datetime.assert_called_once_with("2022-06-17")
+
+    def test_str2datetime_many_invalid(self):
+        self.assertRaises(
+            ValueError, str2datetime_many, ["2022-06-15", "not a datetime"]
+        )
+
     def test_val_format_str(self):
         self.assertEqual(val_format("str"), "str")
         self.assertEqual(
@@ -90,6 +213,63 @@ class TestFormatters(unittest.TestCase):
     def test_val_format_other(self):
         self.assertEqual(val_format({"A": "a"}), {"A": "a"})
 
+    def test_val_format_reference(self):
+        rng = random.Random(0)
+        for i in range(2000):
+            tokens = rng.choices(VAL_FORMAT_TOKENS, k=rng.choice([1, 2, 3, 5]))
+            s = rng.choice([";", " "]).join(tokens)
+
+            try:
+                expected = val_format_reference(s)
+            except ValueError:
+                self.assertRaises(ValueError, val_format, s)
+                continue
+
+            val = val_format(s)
+            self.assertEqual(val, expected, msg=s)
+            self.assertEqual(type(val), type(expected), msg=s)
+            if isinstance(val, list):
+                self.assertEqual(
+                    [type(j) for j in val], [type(j) for j in expected], msg=s
+                )
+
+    def test_val_format_as_array(self):
+        val = val_format("1;2;3", as_array=True)
+        self.assertIsInstance(val, np.ndarray)
+        self.assertEqual(val.dtype, np.int64)
+        np.testing.assert_array_equal(val, [1, 2, 3])
+
+        val = val_format("0.8;1;1.2e1", as_array=True)
+        self.assertEqual(val.dtype, np.float64)
+        np.testing.assert_array_equal(val, [0.8, 1.0, 12.0])
+
+        val = val_format("1; 2;3 ", as_array=True)
+        np.testing.assert_array_equal(val, [1, 2, 3])
+
+    def test_val_format_as_array_not_numeric(self):
+        self.assertEqual(val_format("1 2 3", as_array=True), [1, 2, 3])
+        self.assertEqual(
+            val_format("1;2022-06-15", as_array=True),
+            [1, dt.datetime(2022, 6, 15)],
+        )
+        self.assertEqual(val_format("a;b", as_array=True), "a b")
+
+    def test_val_format_many(self):
+        values = ["1", "2.3", "1 2 3", "text", "1", {"A": "a"}, "1 2 3"]
+
+        vals = val_format_many(values)
+
+        self.assertEqual(vals, [val_format(v) for v in values])
+
+        # repeated lists are separate objects
+        vals[2].append(4)
+        self.assertEqual(vals[6], [1, 2, 3])
+
+    def test_val_format_many_as_array(self):
+        vals = val_format_many(["1;2", "3"], as_array=True)
+        np.testing.assert_array_equal(vals[0], [1, 2])
+        self.assertEqual(vals[1], 3)
+
     # todo - look into nested dictionaries
     def test_list_to_dict(self):
         input_list = [
@@ -124,8 +304,111 @@ class TestFormatters(unittest.TestCase):
         self.maxDiff = None
         self.assertDictEqual(list_to_dict(input_list), output_dict)
 
+    def test_list_to_dict_nested(self):
+        input_list = [
+            ("GROUP", "L1_METADATA_FILE"),
+            ("GROUP", "Satellite"),
+            ("Name", "Landsat 8"),
+            ("END_GROUP", "Satellite"),
+            ("GROUP", "Metadata"),
+            ("Aquisition_time", "01:51:58"),
+            ("END_GROUP", "Metadata"),
+            ("END_GROUP", "L1_METADATA_FILE"),
+            ("Outside", "group"),
+        ]
+        output_dict = {
+            "L1_METADATA_FILE": {
+                "Satellite": {"Name": "Landsat 8"},
+                "Metadata": {"Aquisition_time": "01:51:58"},
+            }
+        }
+
+        self.assertDictEqual(list_to_dict(iter(input_list)), output_dict)
+
+    def test_list_to_dict_key(self):
+        input_list = [
+            ("Name", "Landsat 8"),
+            ("END_GROUP", "Satellite"),
+            ("GROUP", "Metadata"),
+            ("END_GROUP", "Metadata"),
+        ]
+
+        self.assertDictEqual(
+            list_to_dict(input_list, key="Satellite"), {"Name": "Landsat 8"}
+        )
+
+    def test_list_to_dict_convert(self):
+        input_list = [
+            ("GROUP", "Metadata"),
+            ("Band", "1"),
+            ("Aquisition_time", "01:51:58"),
+            ("Name", "Spectral band 1"),
+            ("END_GROUP", "Metadata"),
+        ]
+
+        self.assertDictEqual(
+            list_to_dict(input_list, convert=True),
+            {
+                "Metadata": {
+                    "Band": 1,
+                    "Aquisition_time": dt.time(1, 51, 58),
+                    "Name": "Spectral band 1",
+                }
+            },
+        )
+
     def test_txt_to_dict(self):
-        pass
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "MTL.txt")
+        with open(path, "w") as f:
+            f.write(
+                "GROUP = L1_METADATA_FILE\n"
+                "  GROUP = METADATA_FILE_INFO\n"
+                '    ORIGIN = "Image courtesy of the U.S. Geological Survey"\n'
+                "    REQUEST_ID = 0501703126420_00025\n"
+                "    FILE_DATE = 2017-03-13T10:08:37Z\n"
+                "  END_GROUP = METADATA_FILE_INFO\n"
+                "  GROUP = IMAGE_ATTRIBUTES\n"
+                "    CLOUD_COVER = 0.02\n"
+                "  END_GROUP = IMAGE_ATTRIBUTES\n"
+                "END_GROUP = L1_METADATA_FILE\n"
+                "END\n"
+            )
+
+        expected = {
+            "L1_METADATA_FILE": {
+                "METADATA_FILE_INFO": {
+                    "ORIGIN": "Image courtesy of the U.S. Geological Survey",
+                    "REQUEST_ID": "0501703126420_00025",
+                    "FILE_DATE": "2017-03-13T10:08:37Z",
+                },
+                "IMAGE_ATTRIBUTES": {"CLOUD_COVER": "0.02"},
+            }
+        }
+
+        self.assertDictEqual(txt_to_dict(path), expected)
+        self.assertDictEqual(txt_to_dict(path, use_mmap=True), expected)
+
+        converted = txt_to_dict(path, convert=True)["L1_METADATA_FILE"]
+        self.assertEqual(
+            converted["METADATA_FILE_INFO"]["FILE_DATE"],
+            dt.datetime(2017, 3, 13, 10, 8, 37),
+        )
+        self.assertEqual(converted["IMAGE_ATTRIBUTES"]["CLOUD_COVER"], 0.02)
+
+        shutil.rmtree(tmp_dir)
+
+    def test_txt_to_dict_empty(self):
+        tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(tmp_dir)
+        path = os.path.join(tmp_dir, "MTL.txt")
+        open(path, "w").close()
+
+        self.assertDictEqual(txt_to_dict(path), {})
+        self.assertDictEqual(txt_to_dict(path, use_mmap=True), {})
+
+        shutil.rmtree(tmp_dir)
 
     def test_datetime_from_yearday(self):
         test_date = datetime_from_yearday(2022, 100, "08:30:46")
@@ -137,6 +420,58 @@ class TestFormatters(unittest.TestCase):
         test_date = datetime_from_yearday(2020, 180, "1300")
         assert test_date == dt.datetime(2020, 6, 28, 13, 0)
 
+    def test_datetime_from_yearday_array(self):
+        years = np.array([2022, 2020, 2021])
+        doys = np.array([100, 180, 365])
+        expected = np.array(
+            ["2022-04-10T08:30", "2020-06-28T13:00", "2021-12-31T23:59"],
+            dtype="datetime64[ns]",
+        )
+
+        for utc in [
+            np.array(["08:30", "1300", "2359"]),
+            np.array([830, 1300, 2359]),
+            np.array([830.0, 1300.0, 2359.0]),
+            np.array(["830", "13:00", 2359.0], dtype=object),
+        ]:
+            test_dates = datetime_from_yearday(years, doys, utc)
+            self.assertEqual(test_dates.dtype, np.dtype("datetime64[ns]"))
+            np.testing.assert_array_equal(test_dates, expected)
+
+    def test_datetime_from_yearday_array_broadcast(self):
+        test_dates = datetime_from_yearday(2020, np.array([[1], [180]]), "1300")
+
+        self.assertEqual(test_dates.shape, (2, 1))
+        self.assertEqual(
+            test_dates[1, 0], np.datetime64(datetime_from_yearday(2020, 180, "1300"))
+        )
+
+    def test_datetime_from_yearday_array_seconds(self):
+        with self.assertWarns(UserWarning):
+            test_dates = datetime_from_yearday(
+                np.array([2022]), np.array([100]), np.array(["08:30:46"])
+            )
+
+        self.assertEqual(test_dates[0], np.datetime64("2022-04-10T08:30"))
+
+    def test_datetime_from_yearday_array_scalar_formats(self):
+        # strings shorter than HHMM parsed as scalar values
+        utc = np.array(["830", "123"])
+
+        test_dates = datetime_from_yearday(np.array([2022, 2022]), 100, utc)
+
+        np.testing.assert_array_equal(
+            test_dates,
+            np.array(
+                [datetime_from_yearday(2022, 100, u) for u in utc],
+                dtype="datetime64[ns]",
+            ),
+        )
+
+    def test_datetime_from_yearday_array_invalid(self):
+        for utc in [np.array(["2460"]), np.array([2400]), np.array(["ab:cd"])]:
+            self.assertRaises(ValueError, datetime_from_yearday, 2022, 1, utc)
+
     def test_convert_datetime(self):
         date = np.datetime64("2022-06-15T10:30:00")
         combined = convert_datetime(date)
@@ -169,6 +504,203 @@ class TestFormatters(unittest.TestCase):
             2022, 6, 15, 0, 10, 0, 500000, tzinfo=dt.timezone.utc
         )
 
+    def test_convert_datetime_array(self):
+        arrays = [
+            np.array(
+                ["2022-06-15T10:30:00", "2022-06-16T11:30:00.5"], "datetime64[ms]"
+            ),
+            np.array([1655251800, 1655251801]),
+            np.array([1655251800.5, 1655251801.25]),
+            np.array(["2022-06-15T10:30:00Z", "2022-06-15", "2022-06-15 10:30:00.123"]),
+        ]
+
+        for array in arrays:
+            exp = [convert_datetime(v) for v in array.tolist()]
+            if array.dtype.kind == "M":
+                exp = [convert_datetime(v) for v in array]
+
+            converted = convert_datetime(array)
+            self.assertEqual(converted.dtype, object)
+            self.assertEqual(list(converted), exp)
+            self.assertTrue(all(v.tzinfo == dt.timezone.utc for v in converted))
+
+            converted64 = convert_datetime(array, as_datetime64=True)
+            self.assertEqual(converted64.dtype, np.dtype("datetime64[ns]"))
+            self.assertEqual(
+                list(converted64.astype("datetime64[us]").astype(object)),
+                [v.replace(tzinfo=None) for v in exp],
+            )
+
+    def test_convert_datetime_array_rounding(self):
+        rng = np.random.default_rng(0)
+        arrays = [
+            rng.uniform(0, 2e9, 2000),
+            rng.uniform(-1e6, 1e6, 2000),
+            np.array([1.5e-6, 2.5e-6, -1.5e-6, 0.9999995, -0.0000005]),
+            rng.integers(0, 2 * 10**18, 1000).astype("datetime64[ns]"),
+        ]
+
+        for array in arrays:
+            converted = convert_datetime(array)
+            exp = [convert_datetime(v) for v in array]
+            if array.dtype.kind == "f":
+                exp = [convert_datetime(v) for v in array.tolist()]
+
+            self.assertEqual(list(converted), exp)
+
+    def test_convert_datetime_array_2d(self):
+        array = np.array([[1655251800, 1655251801], [1655251802, 1655251803]])
+
+        converted = convert_datetime(array)
+
+        self.assertEqual(converted.shape, (2, 2))
+        self.assertEqual(
+            converted[1, 0], dt.datetime(2022, 6, 15, 0, 10, 2, tzinfo=dt.timezone.utc)
+        )
+
+    def test_convert_datetime_array_fallback(self):
+        # not converted in bulk - timezone offsets are ignored, as for str input
+        array = np.array(["2022-06-15T10:30:00+10:00", "2022-06-15T10:30:00"])
+
+        converted = convert_datetime(array)
+
+        self.assertEqual(list(converted), [convert_datetime(v) for v in array])
+        self.assertEqual(
+            list(convert_datetime(array, as_datetime64=True)),
+            [np.datetime64("2022-06-15T10:30:00", "ns")] * 2,
+        )
+
+    def test_convert_datetime_as_datetime64(self):
+        self.assertEqual(
+            convert_datetime("2022-06-15T10:30:00Z", as_datetime64=True),
+            np.datetime64("2022-06-15T10:30:00", "ns"),
+        )
+
+
+class TestTxtToDictMany(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = "tmp_" + "".join(random.choices(string.ascii_lowercase, k=6))
+        os.makedirs(self.tmp_dir)
+
+        self.paths = []
+        for i in range(5):
+            path = os.path.join(self.tmp_dir, "MTL_{}.txt".format(i))
+            with open(path, "w") as f:
+                f.write(
+                    "GROUP = METADATA\n  ID = {}\n  NAME = file_{}\nEND_GROUP = METADATA\nEND\n".format(
+                        i, i
+                    )
+                )
+            self.paths.append(path)
+
+        self.cache_path = os.path.join(self.tmp_dir, "cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_txt_to_dict_many(self):
+        stats = IngestStats()
+
+        results = list(txt_to_dict_many(self.paths, workers=1, stats=stats))
+
+        self.assertEqual(results, [(p, txt_to_dict(p)) for p in self.paths])
+        self.assertEqual(stats.n_files, 5)
+        self.assertEqual(stats.n_cached, 0)
+        self.assertEqual(stats.n_bytes, sum(os.path.getsize(p) for p in self.paths))
+        self.assertGreater(stats.files_per_second, 0)
+        self.assertGreater(stats.mb_per_second, 0)
+        self.assertIn("5 files (0 cached)", str(stats))
+
+    def test_txt_to_dict_many_processes(self):
+        results = list(
+            txt_to_dict_many(self.paths, workers=2, chunksize=1, convert=True)
+        )
+
+        self.assertEqual(
+            results, [(p, txt_to_dict(p, convert=True)) for p in self.paths]
+        )
+
+    def test_txt_to_dict_many_cache(self):
+        expected = {p: txt_to_dict(p) for p in self.paths}
+
+        list(txt_to_dict_many(self.paths, workers=1, cache_path=self.cache_path))
+
+        with open(self.paths[2], "a") as f:
+            f.write("GROUP = EXTRA\n  ID = 1\nEND_GROUP = EXTRA\n")
+        expected[self.paths[2]] = txt_to_dict(self.paths[2])
+
+        stats = IngestStats()
+        with mock.patch(
+            "processor_tools.utils.formatters.txt_to_dict", wraps=txt_to_dict
+        ) as mock_txt_to_dict:
+            results = list(
+                txt_to_dict_many(
+                    self.paths, workers=1, cache_path=self.cache_path, stats=stats
+                )
+            )
+
+        # only modified file re-read
+        mock_txt_to_dict.assert_called_once_with(
+            self.paths[2], convert=False, use_mmap=False
+        )
+        self.assertEqual(stats.n_cached, 4)
+        self.assertEqual(dict(results), expected)
+        self.assertEqual(results[-1][0], self.paths[2])
+
+    def test_txt_to_dict_many_cache_values(self):
+        path = os.path.join(self.tmp_dir, "MTL_values.txt")
+        with open(path, "w") as f:
+            f.write(
+                "GROUP = METADATA\n"
+                "  DATE = 2022-06-15\n"
+                "  TIME = 10:30:00.123456\n"
+                "  DATETIME = 2022-06-15T10:30:00+01:00\n"
+                "  LIST = 1 2.5 three\n"
+                "  $TAG = value\n"
+                "END_GROUP = METADATA\n"
+                "END\n"
+            )
+        expected = txt_to_dict(path, convert=True)
+
+        list(txt_to_dict_many([path], cache_path=self.cache_path, convert=True))
+        stats = IngestStats()
+        results = list(
+            txt_to_dict_many(
+                [path], cache_path=self.cache_path, convert=True, stats=stats
+            )
+        )
+
+        self.assertEqual(stats.n_cached, 1)
+        self.assertEqual(results, [(path, expected)])
+
+    def test_txt_to_dict_many_cache_processes(self):
+        list(txt_to_dict_many(self.paths[:2], cache_path=self.cache_path))
+
+        results = list(
+            txt_to_dict_many(
+                self.paths, workers=2, chunksize=1, cache_path=self.cache_path
+            )
+        )
+
+        self.assertEqual(results, [(p, txt_to_dict(p)) for p in self.paths])
+
+    def test_txt_to_dict_many_cache_convert(self):
+        list(txt_to_dict_many(self.paths, workers=1, cache_path=self.cache_path))
+
+        stats = IngestStats()
+        results = list(
+            txt_to_dict_many(
+                self.paths,
+                workers=1,
+                cache_path=self.cache_path,
+                convert=True,
+                stats=stats,
+            )
+        )
+
+        self.assertEqual(stats.n_cached, 0)
+        self.assertEqual(results[0][1], {"METADATA": {"ID": 0, "NAME": "file_0"}})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -25,7 +25,7 @@ setup(
     description="Tools to support the developing of processing pipelines",
     long_description=read("README.md"),
     packages=find_packages(exclude=("tests",)),
-    install_requires=["numpy", "pyyaml", "pydantic", "python-dateutil"],
+    install_requires=["numpy", "pyyaml", "python-dateutil"],
     extras_require={
         "dev": [
             "numpy",
@@ -38,7 +38,13 @@ setup(
             "ipython",
             "pickleshare",
             "types-PyYAML",
-        ]
+        ],
+        "formats": [
+            "orjson",
+            "tomli; python_version < '3.11'",
+            "tomli-w",
+            "msgpack",
+        ],
     },
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",